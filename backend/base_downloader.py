@@ -1,7 +1,8 @@
-import yt_dlp
 from pathlib import Path
 from abc import ABC, abstractmethod
 
+from .ydl_pool import ydl_pool
+
 
 class BaseDownloader(ABC):
     """Base class untuk semua downloader platform"""
@@ -27,7 +28,7 @@ class BaseDownloader(ABC):
             opts = self.ydl_opts.copy()
             opts['extract_flat'] = extract_flat
             
-            with yt_dlp.YoutubeDL(opts) as ydl:
+            with ydl_pool.acquire(opts) as ydl:
                 info = ydl.extract_info(url, download=False)
                 return info
         except Exception as e:
@@ -120,7 +121,7 @@ class BaseDownloader(ABC):
             if progress_callback:
                 opts['progress_hooks'] = [progress_callback]
             
-            with yt_dlp.YoutubeDL(opts) as ydl:
+            with ydl_pool.acquire(opts) as ydl:
                 info = ydl.extract_info(url, download=True)
                 
                 # Mendapatkan path file yang didownload
@@ -0,0 +1,271 @@
+"""
+Extraction Cache
+Cache hasil extract (metadata) per URL kanonik.
+- Memory tier: LRU (OrderedDict), jumlah entry dibatasi
+- Disk tier: satu file JSON per entry di ~/.media_downloader/cache/extract, total ukuran dibatasi
+- TTL per platform, dipotong oleh waktu expired signed media URL di dalam hasil
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# TTL default per platform (detik)
+PLATFORM_TTL = {
+    'YouTube': 3 * 3600,
+    'Instagram': 30 * 60,
+    'TikTok': 30 * 60,
+    'Facebook': 3600,
+}
+DEFAULT_TTL = 3600
+
+# Entry dianggap expired sedikit sebelum signed URL benar-benar expired
+EXPIRY_MARGIN = 5 * 60
+
+# Key yang hanya disimpan di memory (object Python, tidak bisa di-serialize)
+MEMORY_ONLY_KEYS = ('_yt',)
+
+# Query param yang tidak mempengaruhi hasil extract
+TRACKING_PARAMS = {
+    'si', 'feature', 'pp', 'ab_channel', 'igshid', 'igsh', 'img_index',
+    'fbclid', 'mibextid', 'ref', 'rdid', 'share_url', 'sfnsn',
+    'is_from_webapp', 'sender_device', 'web_id', 'lang',
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_content', 'utm_term',
+}
+
+# Query param yang menyimpan waktu expired pada signed media URL
+#   YouTube (googlevideo): expire=<unix>
+#   TikTok: x-expires=<unix>
+#   Instagram/Facebook (fbcdn): oe=<hex unix>
+#   CloudFront/S3: Expires=<unix>
+EXPIRY_PARAMS = {
+    'expire': 10,
+    'x-expires': 10,
+    'expires': 10,
+    'oe': 16,
+}
+
+
+def canonical_url(url):
+    """Normalisasi URL supaya variasi URL yang sama menghasilkan key yang sama"""
+    url = (url or '').strip()
+    if '://' not in url:
+        # Username / input non-URL
+        return url.lstrip('@').lower()
+
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    for prefix in ('www.', 'm.', 'mobile.', 'web.'):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+
+    path = parts.path.rstrip('/') or '/'
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k.lower() not in TRACKING_PARAMS]
+
+    if host == 'youtu.be':
+        host, query = 'youtube.com', [('v', path.strip('/'))] + query
+        path = '/watch'
+    elif host.endswith('youtube.com'):
+        host = 'youtube.com'
+        if path.startswith('/shorts/'):
+            query = [('v', path.split('/')[2])] + query
+            path = '/watch'
+        # Hanya v & list yang menentukan konten (t, index, dsb. diabaikan)
+        query = [(k, v) for k, v in query if k in ('v', 'list')]
+
+    return urlunsplit(('https', host, path, urlencode(sorted(query)), ''))
+
+
+def find_url_expiry(value):
+    """Cari waktu expired paling awal dari signed URL di dalam hasil extract"""
+    earliest = None
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif isinstance(item, str) and item.startswith('http') and '?' in item:
+            for k, v in parse_qsl(urlsplit(item).query):
+                base = EXPIRY_PARAMS.get(k.lower())
+                if not base:
+                    continue
+                try:
+                    ts = int(v, base)
+                except ValueError:
+                    continue
+                if earliest is None or ts < earliest:
+                    earliest = ts
+    return earliest
+
+
+class ExtractionCache:
+    """Cache 2 tingkat (memory LRU + disk) untuk hasil extract"""
+
+    def __init__(self, cache_dir=None, max_memory_entries=64, max_disk_bytes=64 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".media_downloader" / "cache" / "extract"
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> (expires_at, value)
+        self._disk_bytes = None  # dihitung saat pertama kali menulis
+        self._lock = threading.Lock()
+
+    def _key(self, platform, url, kind):
+        return f"{platform}|{kind}|{canonical_url(url)}"
+
+    def _path(self, key):
+        return self.cache_dir / (hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json')
+
+    def ttl_for(self, platform, value):
+        """TTL entry: TTL platform, dipotong oleh expired signed URL"""
+        ttl = PLATFORM_TTL.get(platform, DEFAULT_TTL)
+        expiry = find_url_expiry(value)
+        if expiry is not None:
+            ttl = min(ttl, expiry - time.time() - EXPIRY_MARGIN)
+        return ttl
+
+    def get(self, platform, url, kind='info'):
+        """Ambil hasil extract dari cache (None jika tidak ada/expired)
+
+        Return salinan dict (shallow): key yang ditambah/diganti pemanggil tidak
+        mengubah cache. Nilai di dalamnya (list/dict formats, dsb.) dipakai
+        bersama, perlakukan sebagai read-only.
+        """
+        key = self._key(platform, url, kind)
+        now = time.time()
+
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                if hit[0] > now:
+                    self._memory.move_to_end(key)
+                    return dict(hit[1])
+                del self._memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return None
+
+            if data.get('key') != key or data.get('expires_at', 0) <= now:
+                self._remove_file(path)
+                return None
+
+            self._remember(key, data['expires_at'], data['value'])
+            return dict(data['value'])
+
+    def set(self, platform, url, value, kind='info'):
+        """Simpan hasil extract ke memory + disk"""
+        if not isinstance(value, dict):
+            return
+        ttl = self.ttl_for(platform, value)
+        if ttl <= 0:
+            return
+
+        key = self._key(platform, url, kind)
+        expires_at = time.time() + ttl
+        disk_value = {k: v for k, v in value.items() if k not in MEMORY_ONLY_KEYS}
+
+        with self._lock:
+            # Salinan: perubahan pemanggil pada value setelah set() tidak masuk cache
+            self._remember(key, expires_at, dict(value))
+            try:
+                payload = json.dumps({'key': key, 'expires_at': expires_at, 'value': disk_value}, default=str)
+                self._write_file(self._path(key), payload.encode('utf-8'))
+            except Exception as e:
+                print(f"Extraction cache write error: {e}")
+
+    def invalidate(self, platform, url, kind='info'):
+        """Hapus satu entry dari cache"""
+        key = self._key(platform, url, kind)
+        with self._lock:
+            self._memory.pop(key, None)
+            self._remove_file(self._path(key))
+
+    def clear(self):
+        """Hapus semua entry"""
+        with self._lock:
+            self._memory.clear()
+            if self.cache_dir.exists():
+                for path in self.cache_dir.glob('*.json'):
+                    self._remove_file(path)
+            self._disk_bytes = 0
+
+    # -----------------------------
+    # Internal (dipanggil dengan lock)
+    # -----------------------------
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _scan_disk(self):
+        total = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob('*.json'):
+                try:
+                    total += path.stat().st_size
+                except OSError:
+                    pass
+        return total
+
+    def _write_file(self, path, payload):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if self._disk_bytes is None:
+            self._disk_bytes = self._scan_disk()
+
+        self._remove_file(path)
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        self._disk_bytes += len(payload)
+
+        if self._disk_bytes > self.max_disk_bytes:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Hapus file paling lama sampai total ukuran di bawah batas (target 80%)"""
+        files = []
+        for p in self.cache_dir.glob('*.json'):
+            try:
+                st = p.stat()
+                files.append((st.st_mtime, st.st_size, p))
+            except OSError:
+                pass
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        target = self.max_disk_bytes * 0.8
+        for _, size, p in files:
+            if total <= target:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+    def _remove_file(self, path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        if self._disk_bytes is not None:
+            self._disk_bytes = max(0, self._disk_bytes - size)
+
+
+# Instance bersama untuk semua backend
+extraction_cache = ExtractionCache()
@@ -0,0 +1,497 @@
+"""
+External Tools
+gallery-dl & you-get tanpa spawn interpreter per URL; hasil berupa data terstruktur.
+- gallery-dl: in-process lewat Python API-nya; extractor dibaca lazy (per message),
+  download lewat DownloadJob
+- you-get: di worker process yang dipakai ulang untuk banyak URL (youget_worker.py,
+  satu request/balasan JSON per baris). Bukan in-process karena you-get memakai
+  stdout & state global dan tidak punya socket timeout: worker yang macet di-kill
+  lalu diganti, download dilanjutkan dari file .download
+- Jika modul tidak bisa di-import, fallback ke CLI (subprocess); output JSON
+  CLI dibaca streaming dengan stall timeout (bukan timeout total)
+- Download diawasi watchdog (progress byte), tidak ada batas waktu total;
+  file yang sedang ditulis ada di folder per job (_job_dir), jadi yang diawasi
+  hanya transfer job itu, bukan seluruh folder output
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import queue
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from collections import deque
+
+from .hedge import run_subprocess
+from .watchdog import (POLL_INTERVAL, READ_BLOCK, StallError, TransferWatchdog, retry_stalled,
+                       run_watched, tree_size)
+
+
+# Proses CLI dihentikan jika tidak ada output selama N detik
+STALL_TIMEOUT = 60
+
+# you-get info: timeout per operasi socket & batas total per URL (detik)
+YOUGET_SOCKET_TIMEOUT = 15
+YOUGET_INFO_TIMEOUT = 30
+
+# Worker you-get yang disimpan untuk dipakai ulang (yang lebih dari ini dihentikan)
+YOUGET_IDLE_WORKERS = 2
+YOUGET_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'youget_worker.py')
+
+_gallerydl_lock = threading.Lock()
+_gallerydl_ready = False
+_youget_lock = threading.Lock()
+_youget_idle = []
+
+
+# -----------------------------
+# Streaming subprocess output
+# -----------------------------
+def iter_process_lines(cmd, stall_timeout=STALL_TIMEOUT, cancel=None):
+    """Generator baris stdout proses saat baris itu ditulis
+
+    Proses di-kill jika tidak ada output selama stall_timeout detik.
+    Exception jika exit code != 0 (pesan dari akhir stderr).
+    """
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, encoding='utf-8', errors='replace')
+    if cancel is not None:
+        cancel.register(proc)
+
+    lines = queue.Queue(maxsize=256)
+    stderr_tail = deque(maxlen=20)
+    done = object()
+    # Generator ditutup lebih awal: reader berhenti, tidak menunggu queue penuh selamanya
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                lines.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read_stdout():
+        for line in proc.stdout:
+            if not put(line):
+                return
+        put(done)
+
+    def read_stderr():
+        for line in proc.stderr:
+            stderr_tail.append(line)
+
+    threading.Thread(target=read_stdout, daemon=True).start()
+    threading.Thread(target=read_stderr, daemon=True).start()
+
+    try:
+        while True:
+            try:
+                line = lines.get(timeout=stall_timeout)
+            except queue.Empty:
+                raise Exception(f"{cmd[0]} tidak ada output selama {stall_timeout} detik (stall)")
+            if line is done:
+                break
+            yield line
+
+        proc.wait()
+        if cancel is not None:
+            cancel.check()
+        if proc.returncode != 0:
+            raise Exception(f"{cmd[0]} failed: {''.join(stderr_tail).strip()}")
+    finally:
+        stop.set()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        if cancel is not None:
+            cancel.unregister(proc)
+
+
+# Token yang mengubah kedalaman JSON; escape (\x) dicocokkan utuh supaya \" tidak menutup string
+_JSON_TOKEN = re.compile(r'\\.|["\[\]{}]')
+
+
+def iter_json_values(lines):
+    """Parse nilai JSON satu per satu dari aliran teks
+
+    Mendukung JSON lines maupun array JSON (pretty-printed): tiap elemen
+    di-yield segera setelah lengkap, tanpa menunggu seluruh output.
+    Array luar dikenali dari awal stream: '[' diikuti '[', '{' atau ']'.
+    Kedalaman kurung dihitung per baris baru, jadi decode hanya dicoba saat
+    sebuah nilai bisa sudah lengkap (bukan mengulang dari awal tiap baris).
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    started = False
+    in_array = False
+    depth = 0  # kedalaman kurung di akhir buf (termasuk array luar)
+    in_string = False
+
+    for line in lines:
+        buf += line
+        for match in _JSON_TOKEN.finditer(line):
+            token = match.group()
+            if token == '"':
+                in_string = not in_string
+            elif in_string or len(token) > 1:
+                continue
+            elif token in '[{':
+                depth += 1
+            else:
+                depth -= 1
+
+        while True:
+            buf = buf.lstrip()
+            if not started:
+                if buf.startswith('['):
+                    rest = buf[1:].lstrip()
+                    if not rest:
+                        break  # perlu data lagi untuk menentukan format
+                    if rest[0] in '[{]':
+                        # Array luar: baca elemen-elemennya satu per satu
+                        in_array = True
+                        buf = rest
+                if buf:
+                    started = True
+            if in_array and buf.startswith(','):
+                buf = buf[1:]
+                continue
+            if in_array and buf.startswith(']'):
+                in_array = False
+                buf = buf[1:]
+                continue
+            if not buf or in_string or depth > (1 if in_array else 0):
+                break
+            try:
+                value, end = decoder.raw_decode(buf)
+            except ValueError:
+                break  # elemen belum lengkap
+            yield value
+            buf = buf[end:]
+
+
+# -----------------------------
+# gallery-dl
+# -----------------------------
+def _gallerydl():
+    """Import gallery-dl + inisialisasi config sekali (None jika tidak ter-install)"""
+    global _gallerydl_ready
+    try:
+        from gallery_dl import config, extractor, job
+        from gallery_dl.extractor.message import Message
+    except ImportError:
+        return None
+
+    with _gallerydl_lock:
+        if not _gallerydl_ready:
+            config.load()  # file config user, seperti CLI
+            config.set(('output',), 'mode', 'null')
+            _gallerydl_ready = True
+    return config, extractor, job, Message
+
+
+def iter_gallerydl(url, cancel=None, max_depth=2):
+    """Generator record file dari gallery-dl: metadata (kwdict) + 'url' file"""
+    modules = _gallerydl()
+    if modules is None:
+        yield from _iter_gallerydl_cli(url, cancel)
+        return
+
+    _, extractor, _, Message = modules
+    yield from _iter_extractor(extractor, Message, extractor.find(url), url, cancel, max_depth)
+
+
+def _iter_extractor(extractor, Message, extr, url, cancel, depth):
+    if extr is None:
+        raise Exception(f"gallery-dl: URL tidak didukung: {url}")
+
+    for msg in extr:
+        if cancel is not None:
+            cancel.check()
+        if msg[0] == Message.Url:
+            yield {**msg[2], 'url': msg[1]}
+        elif msg[0] == Message.Queue and depth > 0:
+            # Mis. profil -> tab posts
+            cls = msg[2].get('_extractor')
+            child = cls.from_url(msg[1]) if cls else extractor.find(msg[1])
+            yield from _iter_extractor(extractor, Message, child, msg[1], cancel, depth - 1)
+
+
+def _iter_gallerydl_cli(url, cancel=None):
+    """Fallback CLI: --resolve-json, message [type, url, kwdict] dibaca streaming"""
+    cmd = ['gallery-dl', '-o', 'output.jsonl=true', '--resolve-json', url]
+
+    for msg in iter_json_values(iter_process_lines(cmd, cancel=cancel)):
+        if not isinstance(msg, list) or not msg:
+            continue
+        if msg[0] == 3 and len(msg) == 3:
+            yield {**msg[2], 'url': msg[1]}
+        elif msg[0] == -1:
+            error = msg[-1] if isinstance(msg[-1], dict) else {}
+            raise Exception(f"gallery-dl failed: {error.get('error')}: {error.get('message')}")
+
+
+def gallerydl_download(url, output_path, cancel=None):
+    """Download lewat gallery-dl ke output_path, return list path file"""
+    modules = _gallerydl()
+    if modules is None:
+        return _gallerydl_download_cli(url, output_path, cancel)
+
+    _, _, job, _ = modules
+    files = []
+
+    class _CollectJob(job.DownloadJob):
+        def get_downloader(self, scheme):
+            downloader = super().get_downloader(scheme)
+            if downloader is not None and not getattr(downloader, '_watched', False):
+                _watch_receive(downloader)
+            return downloader
+
+        def handle_url(self, url, kwdict):
+            if cancel is not None:
+                cancel.check()
+            super().handle_url(url, kwdict)
+            path = getattr(self.pathfmt, 'realpath', None)
+            if path and os.path.exists(path):
+                files.append(path)
+
+    download_job = _CollectJob(url)
+    # Base directory per job (bukan config global), diwariskan ke child job
+    download_job.extractor._parentdir = os.path.join(output_path, '')
+    status = download_job.run()
+
+    if cancel is not None:
+        cancel.check()
+    if status and not files:
+        raise Exception(f"gallery-dl failed (status {status})")
+    return files
+
+
+def _watch_receive(downloader):
+    """Pasang watchdog di loop baca downloader HTTP gallery-dl
+
+    Transfer macet dilempar sebagai error koneksi requests: gallery-dl
+    menanganinya seperti koneksi putus (retry, lanjut dari .part).
+    """
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+
+    receive = downloader.receive
+
+    def watched_receive(fp, content, bytes_total, bytes_start):
+        watchdog = TransferWatchdog()
+
+        def chunks():
+            done = bytes_start
+            for data in content:
+                done += len(data)
+                if watchdog.observe(done):
+                    raise RequestsConnectionError(watchdog.message())
+                yield data
+
+        return receive(fp, chunks(), bytes_total, bytes_start)
+
+    downloader.receive = watched_receive
+    downloader.chunk_size = min(downloader.chunk_size, READ_BLOCK)
+    downloader._watched = True
+
+
+def _job_dir(output_path, url):
+    """Folder kerja per URL di output_path: file yang sedang di-download ditulis di sini
+
+    Nama tetap untuk URL yang sama, jadi percobaan berikutnya (restart/retry)
+    melanjutkan file parsial yang sama.
+    """
+    key = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+    path = os.path.join(output_path, f'.job-{key}')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _gallerydl_download_cli(url, output_path, cancel=None):
+    # File selesai tetap ke output_path; hanya .part di folder job (yang diawasi)
+    job_dir = _job_dir(output_path, url)
+    cmd = ['gallery-dl', '--destination', output_path,
+           '-o', f'downloader.part-directory={job_dir}', url]
+    result = retry_stalled(lambda watchdog: run_watched(cmd, job_dir, watchdog, cancel))
+    if result.returncode != 0:
+        raise Exception(f"gallery-dl failed: {result.stderr}")
+    shutil.rmtree(job_dir, ignore_errors=True)
+
+    # gallery-dl menulis path tiap file ke stdout ('# ' = sudah ada)
+    files = []
+    for line in result.stdout.splitlines():
+        path = line[2:] if line.startswith('# ') else line
+        if path and os.path.exists(path):
+            files.append(path)
+    return files
+
+
+# -----------------------------
+# you-get
+# -----------------------------
+def _first_json_object(text):
+    start = text.find('{')
+    if start < 0:
+        raise Exception("you-get: output JSON tidak ditemukan")
+    obj, _ = json.JSONDecoder().raw_decode(text[start:])
+    return obj
+
+
+def _move_job_files(job_dir, output_path):
+    """Pindahkan file selesai dari folder job ke output_path, terbaru dulu"""
+    files = [e for e in os.scandir(job_dir)
+             if e.is_file() and not e.name.endswith(('.download', '.part'))]
+    files.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    moved = []
+    for entry in files:
+        target = os.path.join(output_path, entry.name)
+        os.replace(entry.path, target)
+        moved.append(target)
+    shutil.rmtree(job_dir, ignore_errors=True)
+    return moved
+
+
+class _YougetWorker:
+    """Satu proses youget_worker.py: request JSON per baris di stdin, balasan per baris di stdout"""
+
+    def __init__(self):
+        self.proc = subprocess.Popen([sys.executable, YOUGET_WORKER], stdin=subprocess.PIPE,
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     text=True, encoding='utf-8', errors='replace')
+        self.replies = queue.Queue()
+        self.stderr_tail = deque(maxlen=20)
+        self.activity = threading.Event()
+        threading.Thread(target=self._read_replies, daemon=True).start()
+        threading.Thread(target=self._read_stderr, daemon=True).start()
+
+    def _read_replies(self):
+        for line in self.proc.stdout:
+            self.replies.put(line)
+        self.replies.put(None)  # proses berhenti
+
+    def _read_stderr(self):
+        for line in self.proc.stderr:
+            self.stderr_tail.append(line)
+            self.activity.set()
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def kill(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+            self.proc.wait()
+
+    def call(self, request, timeout=None, watchdog=None, watch_path=None, cancel=None):
+        """Kirim satu request, tunggu balasannya
+
+        timeout: batas total (info); watchdog + watch_path: dihentikan jika file
+        di watch_path tidak bertambah (download). Proses di-kill jika macet/dibatalkan.
+        """
+        if cancel is not None:
+            cancel.register(self.proc)
+        try:
+            self.proc.stdin.write(json.dumps(request) + '\n')
+            self.proc.stdin.flush()
+
+            waited = 0.0
+            while True:
+                try:
+                    line = self.replies.get(timeout=POLL_INTERVAL)
+                    break
+                except queue.Empty:
+                    waited += POLL_INTERVAL
+                if timeout is not None and waited >= timeout:
+                    raise Exception(f"you-get tidak selesai dalam {timeout} detik")
+                if watchdog is not None:
+                    if self.activity.is_set():
+                        self.activity.clear()
+                        watchdog.reset()
+                    if watchdog.observe(tree_size(watch_path)):
+                        raise StallError(watchdog.message())
+        except BaseException:
+            self.kill()
+            raise
+        finally:
+            if cancel is not None:
+                cancel.unregister(self.proc)
+
+        if cancel is not None:
+            cancel.check()
+        if line is None:
+            raise Exception(f"you-get worker berhenti: {''.join(self.stderr_tail).strip()[-300:]}")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            raise Exception(f"you-get failed: {reply.get('error')}")
+        return reply.get('result')
+
+
+def _youget_call(request, **kwargs):
+    """Jalankan request di worker yang sedang idle (atau worker baru); worker sehat dipakai ulang"""
+    with _youget_lock:
+        worker = None
+        while _youget_idle and worker is None:
+            worker = _youget_idle.pop()
+            if not worker.alive():
+                worker = None
+    if worker is None:
+        worker = _YougetWorker()
+
+    try:
+        return worker.call(request, **kwargs)
+    finally:
+        with _youget_lock:
+            if worker.alive() and len(_youget_idle) < YOUGET_IDLE_WORKERS:
+                _youget_idle.append(worker)
+                worker = None
+        if worker is not None:
+            worker.kill()
+
+
+def _youget_available():
+    return importlib.util.find_spec('you_get') is not None
+
+
+def youget_info(url, cancel=None):
+    """Metadata JSON dari you-get (setara `you-get --json`) lewat worker yang dipakai ulang
+
+    Tanpa modul you_get di interpreter ini: CLI `you-get --json` per URL.
+    """
+    if not _youget_available():
+        cmd = ['you-get', '-t', str(YOUGET_SOCKET_TIMEOUT), '--json', url]
+        result = run_subprocess(cmd, timeout=YOUGET_INFO_TIMEOUT, cancel=cancel)
+        if result.returncode != 0:
+            raise Exception(f"you-get failed: {result.stderr[-300:]}")
+        return _first_json_object(result.stdout)
+
+    request = {'op': 'info', 'url': url, 'timeout': YOUGET_SOCKET_TIMEOUT}
+    return _youget_call(request, timeout=YOUGET_INFO_TIMEOUT, cancel=cancel)
+
+
+def youget_download(url, output_path, cancel=None):
+    """Download lewat you-get, return list path file baru di output_path
+
+    Lewat worker yang dipakai ulang (CLI jika modul tidak ada). Worker yang
+    macet di-kill (thread tidak bisa dihentikan, proses bisa); percobaan
+    berikutnya melanjutkan file .download di folder job yang sama.
+    """
+    job_dir = _job_dir(output_path, url)
+
+    def attempt(watchdog):
+        if not _youget_available():
+            cmd = ['you-get', '-t', str(watchdog.window), '-o', job_dir, url]
+            result = run_watched(cmd, job_dir, watchdog, cancel)
+            if result.returncode != 0:
+                raise Exception(f"you-get failed: {result.stderr[-300:]}")
+            return
+        request = {'op': 'download', 'url': url, 'output_dir': job_dir, 'timeout': watchdog.window}
+        _youget_call(request, watchdog=watchdog, watch_path=job_dir, cancel=cancel)
+
+    retry_stalled(attempt)
+    return _move_job_files(job_dir, output_path)
@@ -3,32 +3,112 @@ Facebook Downloader Backend
 Support: yt-dlp (primary), you-get (fallback)
 """
 import os
-import subprocess
 import re
 
+from .cache import extraction_cache
+from .external_tools import youget_download, youget_info
+from .formats import FormatIndex, ytdlp_format
+from .health import run_strategies
+from .hedge import run_hedged
+from .listing import PAGE_SIZE, collect_pages, entry_thumbnail, iter_ytdlp_pages
+from .postprocess import AUDIO_MP3, ytdlp_audio_options
+from .ydl_pool import downloaded_path, ydl_pool
+from .watchdog import watched_ydl
+
 
 class FacebookDownloader:
+    # Fetch Info hedged: fallback dijalankan paralel jika primary lambat (diatur dari config)
+    hedged = False
+    
+    # Output audio: AUDIO_MP3 (re-encode) / AUDIO_ORIGINAL (remux tanpa transcode)
+    audio_format = AUDIO_MP3
+    
     def __init__(self):
         self.platform = "Facebook"
     
-    def extract_video_info(self, url):
-        """Extract informasi video"""
+    def extract_video_info(self, url, on_batch=None):
+        """Extract informasi video
+        
+        on_batch: callback(list) opsional untuk tab videos/reels sebuah page;
+        menerima video per halaman.
+        """
+        cached = extraction_cache.get(self.platform, url)
+        if cached is not None:
+            return cached
+        
+        if self._is_listing_url(url):
+            return self._extract_video_list(url, on_batch)
+        
         try:
-            return self._extract_video_info_ytdlp(url)
+            run = run_hedged if self.hedged else run_strategies
+            info = run(self.platform, 'extract', [
+                ('yt-dlp', lambda cancel=None: self._extract_video_info_ytdlp(url)),
+                ('you-get', lambda cancel=None: self._extract_video_info_youget(url, cancel)),
+            ])
         except Exception as e:
-            print(f"yt-dlp error: {e}")
-            return self._extract_video_info_youget(url)
+            print(f"Extract error: {e}")
+            # Return default (tidak di-cache)
+            return {
+                'type': 'video',
+                'title': 'Facebook Video',
+                'thumbnail': None,
+                'duration': None,
+                'formats': {
+                    'video': ['720p', '480p', '360p'],
+                    'audio': ['128kbps']
+                }
+            }
+        
+        extraction_cache.set(self.platform, url, info)
+        return info
+    
+    def _is_listing_url(self, url):
+        """URL tab videos/reels dari page (bukan single video)"""
+        path = url.split('?', 1)[0].rstrip('/')
+        return bool(re.search(r'/(videos|reels)$', path))
+    
+    def _extract_video_list(self, url, on_batch=None):
+        """Extract daftar video dari page tanpa batas jumlah video"""
+        header = {}
+        videos, count, complete = collect_pages(self.iter_videos(url, header=header), on_batch)
+        
+        info = {
+            'type': 'playlist',
+            'title': header.get('title') or 'Facebook Videos',
+            'videos': videos,
+            'count': count,
+            'thumbnail': header.get('thumbnail') or (videos[0]['thumbnail'] if videos else None)
+        }
+        
+        if complete:
+            extraction_cache.set(self.platform, url, info)
+        return info
+    
+    def iter_videos(self, url, page_size=PAGE_SIZE, header=None):
+        """Generator halaman video dari page/playlist (yt-dlp lazy)"""
+        index = 0
+        for page in iter_ytdlp_pages(url, page_size, header):
+            videos = []
+            for entry in page:
+                videos.append({
+                    'index': index,
+                    'id': entry.get('id'),
+                    'title': entry.get('title') or 'Facebook Video',
+                    'thumbnail': entry_thumbnail(entry),
+                    'duration': entry.get('duration'),
+                    'url': entry.get('webpage_url') or entry.get('url')
+                })
+                index += 1
+            yield videos
     
     def _extract_video_info_ytdlp(self, url):
         """Extract menggunakan yt-dlp"""
-        import yt_dlp
-        
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with ydl_pool.acquire(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=False)
             
             return {
@@ -36,25 +116,14 @@ class FacebookDownloader:
                 'title': info.get('title', 'Facebook Video'),
                 'thumbnail': info.get('thumbnail'),
                 'duration': info.get('duration'),
-                'formats': self._get_available_formats(info)
+                'formats': self._get_available_formats(info),
+                '_ie_result': ydl.sanitize_info(info)  # dipakai ulang oleh download()
             }
     
-    def _extract_video_info_youget(self, url):
-        """Fallback: extract menggunakan you-get"""
+    def _extract_video_info_youget(self, url, cancel=None):
+        """Fallback: extract menggunakan you-get (worker process yang dipakai ulang)"""
         try:
-            result = subprocess.run(
-                ['you-get', '--json', url],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"you-get failed: {result.stderr}")
-            
-            # Parse JSON output dari you-get
-            import json
-            data = json.loads(result.stdout)
+            data = youget_info(url, cancel)
             
             return {
                 'type': 'video',
@@ -69,81 +138,38 @@ class FacebookDownloader:
         
         except Exception as e:
             print(f"you-get error: {e}")
-            # Return default
-            return {
-                'type': 'video',
-                'title': 'Facebook Video',
-                'thumbnail': None,
-                'duration': None,
-                'formats': {
-                    'video': ['720p', '480p', '360p'],
-                    'audio': ['128kbps']
-                }
-            }
+            raise Exception(f"you-get failed: {e}")
     
     def _get_available_formats(self, info):
-        """Ambil format video yang tersedia"""
-        formats = {
-            'video': [],
-            'audio': []
-        }
-        
-        for fmt in info.get('formats', []):
-            if fmt.get('vcodec') != 'none':
-                height = fmt.get('height')
-                if height:
-                    label = f"{height}p"
-                    if label not in formats['video']:
-                        formats['video'].append(label)
-            
-            if fmt.get('acodec') != 'none':
-                abr = fmt.get('abr')
-                if abr:
-                    label = f"{int(abr)}kbps"
-                    if label not in formats['audio']:
-                        formats['audio'].append(label)
-        
-        # Sort
-        if formats['video']:
-            formats['video'].sort(key=lambda x: int(x.replace('p', '')), reverse=True)
-        else:
-            formats['video'] = ['720p', '480p', '360p']
-        
-        if formats['audio']:
-            formats['audio'].sort(key=lambda x: int(x.replace('kbps', '')), reverse=True)
-        else:
-            formats['audio'] = ['128kbps', '64kbps']
-        
-        return formats
+        """Ambil format video dan audio yang tersedia (+ estimasi ukuran)"""
+        return FormatIndex.from_ytdlp(info).summary()
     
     def download(self, url, output_path, quality='720p', download_type='video',
-                 progress_callback=None):
-        """Download video/audio"""
-        try:
-            return self._download_ytdlp(url, output_path, quality, download_type, progress_callback)
-        except Exception as e:
-            print(f"yt-dlp download failed: {e}")
-            return self._download_youget(url, output_path, progress_callback)
+                 progress_callback=None, info=None):
+        """Download video/audio (info: hasil extract_video_info() untuk dipakai ulang)"""
+        info = info or {}
+        return run_strategies(self.platform, 'download', [
+            ('yt-dlp', lambda: self._download_ytdlp(url, output_path, quality, download_type, progress_callback,
+                                                    ie_result=info.get('_ie_result'))),
+            ('you-get', lambda: self._download_youget(url, output_path, progress_callback)),
+        ])
     
-    def _download_ytdlp(self, url, output_path, quality, download_type, progress_callback):
+    def _download_ytdlp(self, url, output_path, quality, download_type, progress_callback, ie_result=None):
         """Download menggunakan yt-dlp"""
         import yt_dlp
+        import copy
         
         output_template = os.path.join(output_path, '%(title)s.%(ext)s')
         
         if download_type == 'audio':
             ydl_opts = {
-                'format': 'bestaudio/best',
+                **ytdlp_audio_options(self.audio_format, quality.replace('kbps', '')),
                 'outtmpl': output_template,
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': quality.replace('kbps', ''),
-                }],
             }
+            ydl_opts['format'] = ytdlp_format(ie_result, 'audio', quality, ydl_opts['format'])
         else:
-            # Video
-            format_str = f'best[height<={quality.replace("p", "")}]'
+            # Video: format termurah yang memenuhi resolusi, lalu selector lama
+            format_str = ytdlp_format(ie_result, 'video', quality, f'best[height<={quality.replace("p", "")}]')
             ydl_opts = {
                 'format': format_str,
                 'outtmpl': output_template,
@@ -153,12 +179,19 @@ class FacebookDownloader:
         if progress_callback:
             ydl_opts['progress_hooks'] = [progress_callback]
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            filename = ydl.prepare_filename(info)
-            
-            if download_type == 'audio':
-                filename = os.path.splitext(filename)[0] + '.mp3'
+        def run(ydl):
+            info = None
+            if ie_result:
+                # Pakai ulang hasil Fetch Info (tanpa extract ulang)
+                try:
+                    info = ydl.process_ie_result(copy.deepcopy(ie_result), download=True)
+                except yt_dlp.utils.DownloadError as e:
+                    # Biasanya URL media sudah expired -> extract ulang
+                    print(f"Reuse info gagal: {e}, extract ulang...")
+            if info is None:
+                info = ydl.extract_info(url, download=True)
+            # Path setelah postprocessor (ekstensi audio mengikuti mp3/codec asli)
+            filename = downloaded_path(ydl, info)
             
             return {
                 'success': True,
@@ -166,31 +199,14 @@ class FacebookDownloader:
                 'title': info.get('title', 'Facebook Video'),
                 'thumbnail': info.get('thumbnail')
             }
+        
+        return watched_ydl(ydl_opts, run)
     
     def _download_youget(self, url, output_path, progress_callback):
-        """Fallback: download menggunakan you-get"""
+        """Fallback: download menggunakan you-get (worker process, diawasi watchdog)"""
         try:
-            result = subprocess.run(
-                ['you-get', '-o', output_path, url],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"you-get failed: {result.stderr}")
-            
-            # Parse output untuk mendapatkan filename
-            filename = None
-            for line in result.stdout.split('\n'):
-                if 'Saving' in line or output_path in line:
-                    match = re.search(r'Saving to: (.+)', line)
-                    if match:
-                        filename = match.group(1)
-                        break
-            
-            if not filename:
-                filename = os.path.join(output_path, 'facebook_video.mp4')
+            files = youget_download(url, output_path)
+            filename = files[0] if files else os.path.join(output_path, 'facebook_video.mp4')
             
             return {
                 'success': True,
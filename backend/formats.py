@@ -0,0 +1,203 @@
+"""
+Format Index
+Semua format satu video diindeks sekali: codec, bitrate, fps, ukuran.
+- Pemilihan: stream termurah (ukuran terkecil) yang memenuhi target kualitas,
+  bukan resolusi/bitrate tertinggi yang lalu dibuang saat convert
+- Estimasi ukuran per pilihan kualitas untuk ditampilkan di combo quality
+- Sumber: format yt-dlp (info dict) atau stream pytube (tanpa request tambahan)
+"""
+import re
+
+
+# Audio sedikit di bawah target masih dianggap memenuhi (mis. 129 vs 128 kbps, 125 vs 128)
+ABR_TOLERANCE = 0.9
+
+# Audio untuk merge adaptive: di-encode AAC (~128k) oleh ffmpeg, sumber lebih tinggi terbuang
+MERGE_AUDIO = '128kbps'
+
+DEFAULT_VIDEO = ['720p', '480p', '360p']
+DEFAULT_AUDIO = ['320kbps', '192kbps', '128kbps', '64kbps']
+
+
+def _number(value):
+    """'720p' / '128kbps' / 720 -> 720 (None jika tidak ada angka)"""
+    if isinstance(value, (int, float)):
+        return value
+    match = re.search(r'\d+(\.\d+)?', str(value or ''))
+    return float(match.group()) if match else None
+
+
+def format_size(size):
+    """Ukuran byte untuk label UI (mis. '~12.3 MB')"""
+    if not size:
+        return ''
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"~{size:.0f} {unit}" if unit in ('B', 'KB') else f"~{size:.1f} {unit}"
+        size /= 1024
+
+
+class FormatIndex:
+    """Format satu video: dict id, kind ('av'/'video'/'audio'), height, fps, vcodec,
+    acodec, abr (kbps), ext, filesize (byte, perkiraan) dan stream (objek pytube)"""
+
+    def __init__(self, formats):
+        self.formats = [f for f in formats if f.get('kind')]
+
+    @classmethod
+    def from_ytdlp(cls, info):
+        duration = info.get('duration')
+        formats = []
+        for fmt in info.get('formats') or []:
+            has_video = fmt.get('vcodec') not in (None, 'none')
+            has_audio = fmt.get('acodec') not in (None, 'none')
+            if not has_video and not has_audio:
+                continue  # storyboard dsb.
+            size = fmt.get('filesize') or fmt.get('filesize_approx')
+            if not size and fmt.get('tbr') and duration:
+                size = fmt['tbr'] * 1000 / 8 * duration
+            formats.append({
+                'id': fmt.get('format_id'),
+                'kind': 'av' if has_video and has_audio else ('video' if has_video else 'audio'),
+                'height': fmt.get('height'),
+                'fps': fmt.get('fps'),
+                'vcodec': fmt.get('vcodec') if has_video else None,
+                'acodec': fmt.get('acodec') if has_audio else None,
+                'abr': fmt.get('abr') if has_audio else None,
+                'ext': fmt.get('ext'),
+                'filesize': int(size) if size else None,
+            })
+        return cls(formats)
+
+    @classmethod
+    def from_pytube(cls, yt):
+        """Index stream pytube; ukuran dari contentLength / bitrate x durasi (tanpa HTTP)"""
+        duration = getattr(yt, 'length', None)
+        formats = []
+        for stream in yt.streams:
+            has_video = getattr(stream, 'includes_video_track', stream.type == 'video')
+            has_audio = getattr(stream, 'includes_audio_track', stream.type == 'audio')
+            size = getattr(stream, '_filesize', 0)
+            if not size and stream.bitrate and duration:
+                size = stream.bitrate * duration / 8
+            abr = _number(stream.abr) if has_audio and getattr(stream, 'abr', None) else None
+            if has_audio and not abr and not has_video and stream.bitrate:
+                abr = stream.bitrate / 1000
+            formats.append({
+                'id': str(stream.itag),
+                'kind': 'av' if has_video and has_audio else ('video' if has_video else 'audio'),
+                'height': _number(stream.resolution) if has_video else None,
+                'fps': getattr(stream, 'fps', None),
+                'vcodec': stream.video_codec,
+                'acodec': stream.audio_codec,
+                'abr': abr,
+                'ext': stream.subtype,
+                'filesize': int(size) if size else None,
+                'stream': stream,
+            })
+        return cls(formats)
+
+    def _of(self, *kinds):
+        return [f for f in self.formats if f['kind'] in kinds]
+
+    @staticmethod
+    def _size(*formats):
+        sizes = [f.get('filesize') for f in formats]
+        # Ukuran tidak diketahui dianggap mahal (dipilih paling akhir)
+        return sum(sizes) if all(sizes) else float('inf')
+
+    def video_qualities(self):
+        """Label resolusi yang tersedia ('1080p', ...), tertinggi dulu"""
+        heights = {int(f['height']) for f in self._of('av', 'video') if f.get('height')}
+        return [f"{h}p" for h in sorted(heights, reverse=True)] or list(DEFAULT_VIDEO)
+
+    def audio_qualities(self):
+        abrs = {int(f['abr']) for f in self._of('av', 'audio') if f.get('abr')}
+        return [f"{a}kbps" for a in sorted(abrs, reverse=True)] or list(DEFAULT_AUDIO)
+
+    def pick_audio(self, quality=None):
+        """Audio-only termurah dengan abr >= target (atau tertinggi jika tidak ada)"""
+        audios = [f for f in self._of('audio') if f.get('abr')]
+        if not audios:
+            return None
+
+        target = _number(quality)
+        if target:
+            enough = [f for f in audios if f['abr'] >= target * ABR_TOLERANCE]
+            if enough:
+                lowest = min(f['abr'] for f in enough)
+                # Bitrate terendah yang cukup; di antaranya ukuran terkecil (codec lebih efisien)
+                return min((f for f in enough if f['abr'] <= lowest / ABR_TOLERANCE),
+                           key=lambda f: (self._size(f), f['abr']))
+        return max(audios, key=lambda f: (f['abr'], -self._size(f)))
+
+    def pick_video(self, quality=None):
+        """Kombinasi termurah untuk resolusi target: [progressive] atau [video, audio]
+
+        Resolusi terendah yang >= target; jika tidak ada, tertinggi yang tersedia.
+        Pada resolusi itu dipilih total ukuran terkecil (progressive menang jika sama).
+        """
+        videos = [f for f in self._of('av', 'video') if f.get('height')]
+        if not videos:
+            return []
+
+        target = _number(quality)
+        heights = sorted({f['height'] for f in videos})
+        enough = [h for h in heights if target and h >= target]
+        height = enough[0] if enough else heights[-1]
+
+        audio = self.pick_audio(MERGE_AUDIO)
+        options = []
+        for f in videos:
+            if f['height'] != height:
+                continue
+            if f['kind'] == 'av':
+                options.append((self._size(f), 0, [f]))
+            elif audio is not None:
+                options.append((self._size(f, audio), 1, [f, audio]))
+        if not options:
+            return []
+        return min(options, key=lambda o: (o[0], o[1]))[2]
+
+    def pick(self, download_type, quality=None):
+        """Format yang didownload untuk pilihan user (list, kosong jika tidak ada)"""
+        if download_type == 'audio':
+            audio = self.pick_audio(quality)
+            return [audio] if audio else []
+        return self.pick_video(quality)
+
+    def estimate(self, download_type, quality):
+        """Perkiraan ukuran download untuk pilihan kualitas (None jika tidak diketahui)"""
+        chosen = self.pick(download_type, quality)
+        size = self._size(*chosen) if chosen else float('inf')
+        return None if size == float('inf') else int(size)
+
+    def summary(self):
+        """Label kualitas + estimasi ukuran untuk info['formats']"""
+        video = self.video_qualities()
+        audio = self.audio_qualities()
+        return {
+            'video': video,
+            'audio': audio,
+            'sizes': {
+                'video': {q: self.estimate('video', q) for q in video},
+                'audio': {q: self.estimate('audio', q) for q in audio},
+            },
+        }
+
+
+def ytdlp_format(info, download_type, quality, fallback):
+    """String format yt-dlp: id format termurah dari index, lalu fallback
+
+    Tanpa info (belum ada hasil Fetch Info) hanya fallback yang dipakai.
+    """
+    chosen = FormatIndex.from_ytdlp(info).pick(download_type, quality) if info else []
+    if not chosen:
+        return fallback
+    return '+'.join(f['id'] for f in chosen) + '/' + fallback
+
+
+def mp3_bitrate(quality, default='192k'):
+    """'128kbps' -> '128k' untuk encode mp3"""
+    kbps = _number(quality)
+    return f"{int(kbps)}k" if kbps else default
@@ -0,0 +1,203 @@
+"""
+Strategy Health
+Statistik per (platform, operasi, strategi): latency & success rate (EWMA) + circuit breaker.
+- Strategi diurutkan berdasarkan perkiraan waktu sampai berhasil (latency / success rate);
+  operasi di SUCCESS_ONLY (download) hanya berdasarkan success rate
+- Strategi yang gagal beruntun di-skip sementara (circuit open), lalu dicoba lagi setelah cooldown
+- Statistik disimpan di ~/.media_downloader/health.json
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+# Bobot sampel terbaru pada EWMA
+EWMA_ALPHA = 0.3
+
+# Circuit breaker: gagal beruntun sebelum di-skip, dan lama skip (berlipat ganda tiap trip)
+FAILURE_THRESHOLD = 3
+COOLDOWN = 5 * 60
+MAX_COOLDOWN = 3600
+
+# Strategi yang lama tidak dipakai dianggap belum ada data (diberi kesempatan lagi)
+PROBE_INTERVAL = 10 * 60
+
+# Simpan ke disk paling sering setiap N detik
+SAVE_INTERVAL = 5
+
+# Durasi operasi ini mengikuti ukuran file, bukan kesehatan strategi:
+# latency tidak dicatat, urutan hanya dari success rate
+SUCCESS_ONLY = {'download'}
+
+
+class HealthTracker:
+    """Catatan kesehatan strategi (thread-safe, persisten)"""
+
+    def __init__(self, stats_file=None):
+        self.stats_file = Path(stats_file) if stats_file else Path.home() / ".media_downloader" / "health.json"
+        self._lock = threading.Lock()
+        self._stats = self._load()
+        self._dirty = False
+        self._last_save = 0
+
+    def _key(self, platform, operation, strategy):
+        return f"{platform}|{operation}|{strategy}"
+
+    def _load(self):
+        try:
+            with open(self.stats_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = dict(self._stats)
+            self._dirty = False
+            self._last_save = time.time()
+        try:
+            self.stats_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.stats_file.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.stats_file)
+        except Exception as e:
+            print(f"Health stats save error: {e}")
+
+    def get(self, platform, operation, strategy):
+        with self._lock:
+            return dict(self._stats.get(self._key(platform, operation, strategy)) or {})
+
+    def record(self, platform, operation, strategy, ok, latency):
+        """Catat hasil satu percobaan strategi (latency None / operasi SUCCESS_ONLY: tidak dicatat)"""
+        key = self._key(platform, operation, strategy)
+        now = time.time()
+        if operation in SUCCESS_ONLY:
+            latency = None
+        with self._lock:
+            st = self._stats.setdefault(key, {
+                'success': 1.0 if ok else 0.0,
+                'calls': 0, 'failures': 0, 'trips': 0, 'open_until': 0,
+            })
+            if latency is not None:
+                prev = st.get('latency', latency)
+                st['latency'] = prev + EWMA_ALPHA * (latency - prev)
+            st['success'] += EWMA_ALPHA * ((1.0 if ok else 0.0) - st['success'])
+            st['calls'] += 1
+            st['last'] = now
+
+            if ok:
+                st['failures'] = 0
+                st['trips'] = 0
+                st['open_until'] = 0
+            else:
+                st['failures'] += 1
+                if st['failures'] >= FAILURE_THRESHOLD:
+                    cooldown = min(COOLDOWN * (2 ** st['trips']), MAX_COOLDOWN)
+                    st['open_until'] = now + cooldown
+                    st['trips'] += 1
+                    st['failures'] = 0
+
+            self._dirty = True
+            due = now - self._last_save >= SAVE_INTERVAL
+        if due:
+            self.save()
+
+    def is_open(self, platform, operation, strategy):
+        """True jika strategi sedang di-skip (circuit open)"""
+        st = self.get(platform, operation, strategy)
+        return st.get('open_until', 0) > time.time()
+
+    def score(self, platform, operation, strategy):
+        """Perkiraan detik sampai berhasil (None jika belum ada data)"""
+        st = self.get(platform, operation, strategy)
+        if not st.get('calls') or time.time() - st.get('last', 0) > PROBE_INTERVAL:
+            return None
+        if operation in SUCCESS_ONLY or st.get('latency') is None:
+            return 1.0 / max(st['success'], 0.05)
+        return st['latency'] / max(st['success'], 0.05)
+
+    def order(self, platform, operation, names):
+        """Urutkan nama strategi: (aktif, cadangan circuit-open)
+
+        Tanpa data (atau data sudah lama), urutan bawaan dipertahankan.
+        """
+        scores = {n: self.score(platform, operation, n) for n in names}
+        known = [s for s in scores.values() if s is not None]
+        best = min(known) if known else 0
+        # Strategi tanpa data dianggap setara strategi terbaik (urutan bawaan menentukan)
+        ranked = sorted(names, key=lambda n: (scores[n] if scores[n] is not None else best, names.index(n)))
+
+        active = [n for n in ranked if not self.is_open(platform, operation, n)]
+        skipped = [n for n in ranked if n not in active]
+        return active, skipped
+
+
+def run_strategies(platform, operation, strategies, tracker=None):
+    """Jalankan strategi (list of (nama, callable)) sesuai kesehatan; return hasil pertama yang berhasil
+
+    Strategi circuit-open hanya dicoba jika semua strategi lain gagal.
+    Untuk operasi SUCCESS_ONLY (download) hanya berhasil/gagal yang dicatat.
+    """
+    tracker = tracker or health_tracker
+    funcs = dict(strategies)
+    active, skipped = tracker.order(platform, operation, [name for name, _ in strategies])
+
+    last_error = None
+    for name in active + skipped:
+        started = time.monotonic()
+        try:
+            result = funcs[name]()
+        except Exception as e:
+            tracker.record(platform, operation, name, False, time.monotonic() - started)
+            print(f"{platform} {operation} via {name} failed: {e}")
+            last_error = e
+            continue
+        tracker.record(platform, operation, name, True, time.monotonic() - started)
+        return result
+
+    raise last_error if last_error else Exception(f"Tidak ada strategi untuk {operation}")
+
+
+def iter_strategies(platform, operation, strategies, tracker=None):
+    """Seperti run_strategies untuk generator halaman (listing)
+
+    Pindah ke strategi berikutnya hanya jika belum ada halaman yang dihasilkan;
+    latency yang dicatat adalah waktu sampai halaman pertama.
+    """
+    tracker = tracker or health_tracker
+    funcs = dict(strategies)
+    active, skipped = tracker.order(platform, operation, [name for name, _ in strategies])
+
+    last_error = None
+    for name in active + skipped:
+        started = time.monotonic()
+        yielded = False
+        try:
+            for page in funcs[name]():
+                if not yielded:
+                    yielded = True
+                    tracker.record(platform, operation, name, True, time.monotonic() - started)
+                yield page
+        except Exception as e:
+            if yielded:
+                raise
+            tracker.record(platform, operation, name, False, time.monotonic() - started)
+            print(f"{platform} {operation} via {name} failed: {e}")
+            last_error = e
+            continue
+        if not yielded:
+            tracker.record(platform, operation, name, True, time.monotonic() - started)
+        return
+
+    raise last_error if last_error else Exception(f"Tidak ada strategi untuk {operation}")
+
+
+# Instance bersama untuk semua backend
+health_tracker = HealthTracker()
+atexit.register(health_tracker.save)
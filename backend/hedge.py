@@ -0,0 +1,160 @@
+"""
+Hedged Strategies
+Mode "hedged" untuk Fetch Info: jika strategi utama belum selesai dalam latency budget,
+strategi cadangan dijalankan paralel. Hasil sukses pertama dipakai, sisanya dibatalkan.
+- Subprocess (gallery-dl / you-get) milik strategi yang kalah di-kill lewat CancelToken
+- Strategi in-process (pytube / yt-dlp) tidak bisa dihentikan paksa; hasilnya diabaikan
+"""
+import queue
+import subprocess
+import threading
+import time
+
+from .health import health_tracker
+
+
+# Latency budget: kelipatan latency rata-rata strategi utama, dibatasi min/max (detik)
+HEDGE_FACTOR = 2.0
+MIN_BUDGET = 1.5
+MAX_BUDGET = 10.0
+DEFAULT_BUDGET = 5.0
+
+
+class CancelledError(Exception):
+    pass
+
+
+class CancelToken:
+    """Penanda pembatalan + subprocess yang harus di-kill saat dibatalkan"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._procs = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        self._event.set()
+        with self._lock:
+            procs = list(self._procs)
+        for proc in procs:
+            _kill(proc)
+
+    def register(self, proc):
+        with self._lock:
+            self._procs.append(proc)
+        if self.cancelled:
+            _kill(proc)
+
+    def unregister(self, proc):
+        with self._lock:
+            if proc in self._procs:
+                self._procs.remove(proc)
+
+    def check(self):
+        if self.cancelled:
+            raise CancelledError("Dibatalkan")
+
+
+def _kill(proc):
+    try:
+        if proc.poll() is None:
+            proc.kill()
+    except Exception as e:
+        print(f"Kill process error: {e}")
+
+
+def run_subprocess(cmd, timeout=None, cancel=None):
+    """Seperti subprocess.run(capture_output=True, text=True) tapi bisa dibatalkan lewat CancelToken"""
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if cancel is not None:
+        cancel.register(proc)
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill(proc)
+        proc.communicate()
+        raise
+    finally:
+        if cancel is not None:
+            cancel.unregister(proc)
+
+    if cancel is not None:
+        cancel.check()
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
+def hedge_budget(platform, operation, strategy, tracker=None):
+    """Waktu tunggu sebelum strategi cadangan dijalankan"""
+    tracker = tracker or health_tracker
+    st = tracker.get(platform, operation, strategy)
+    if not st.get('calls') or st.get('success', 0) <= 0 or st.get('latency') is None:
+        return DEFAULT_BUDGET
+    return min(max(st['latency'] * HEDGE_FACTOR, MIN_BUDGET), MAX_BUDGET)
+
+
+def run_hedged(platform, operation, strategies, budget=None, tracker=None):
+    """Jalankan strategi (list of (nama, callable(cancel))) secara hedged
+
+    Strategi berikutnya dimulai setiap kali budget habis tanpa hasil, atau
+    langsung jika semua strategi yang berjalan sudah gagal.
+    """
+    tracker = tracker or health_tracker
+    funcs = dict(strategies)
+    active, skipped = tracker.order(platform, operation, [name for name, _ in strategies])
+    order = active + skipped
+    if budget is None:
+        budget = hedge_budget(platform, operation, order[0], tracker)
+
+    results = queue.Queue()
+    tokens = {}
+
+    def launch(name):
+        token = CancelToken()
+        tokens[name] = token
+
+        def worker():
+            started = time.monotonic()
+            try:
+                value = funcs[name](token)
+            except Exception as e:
+                if not token.cancelled:
+                    tracker.record(platform, operation, name, False, time.monotonic() - started)
+                    print(f"{platform} {operation} via {name} failed: {e}")
+                results.put((name, False, e))
+                return
+            tracker.record(platform, operation, name, True, time.monotonic() - started)
+            results.put((name, True, value))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    launch(order[0])
+    launched, finished = 1, 0
+    last_error = None
+
+    while finished < len(order):
+        timeout = budget if launched < len(order) else None
+        try:
+            name, ok, value = results.get(timeout=timeout)
+        except queue.Empty:
+            # Budget habis -> hedge dengan strategi berikutnya
+            launch(order[launched])
+            launched += 1
+            continue
+
+        finished += 1
+        if ok:
+            for other, token in tokens.items():
+                if other != name:
+                    token.cancel()
+            return value
+
+        last_error = value
+        if finished == launched and launched < len(order):
+            launch(order[launched])
+            launched += 1
+
+    raise last_error if last_error else Exception(f"Tidak ada strategi untuk {operation}")
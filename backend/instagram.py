@@ -3,115 +3,119 @@ Instagram Downloader Backend
 Support: yt-dlp (primary), gallery-dl (fallback)
 """
 import os
-import json
-import subprocess
+
+from .cache import extraction_cache
+from .external_tools import gallerydl_download, iter_gallerydl
+from .health import iter_strategies, run_strategies
+from .hedge import run_hedged
+from .listing import PAGE_SIZE, collect_pages, entry_thumbnail, iter_ytdlp_pages, paginate
+from .ydl_pool import ydl_pool
+from .watchdog import watched_ydl
 
 
 class InstagramDownloader:
+    # Fetch Info hedged: fallback dijalankan paralel jika primary lambat (diatur dari config)
+    hedged = False
+    
     def __init__(self):
         self.platform = "Instagram"
     
-    def extract_user_posts(self, username):
-        """Extract posts dari username"""
-        try:
-            return self._extract_user_posts_ytdlp(username)
-        except Exception as e:
-            print(f"yt-dlp error: {e}")
-            return self._extract_user_posts_gallerydl(username)
-    
-    def _extract_user_posts_ytdlp(self, username):
-        """Extract menggunakan yt-dlp"""
-        import yt_dlp
+    def extract_user_posts(self, username, on_batch=None):
+        """Extract posts dari username (tanpa batas jumlah post)
         
-        url = f"https://www.instagram.com/{username}/"
+        on_batch: callback(list) opsional, menerima post per halaman.
+        """
+        profile_url = f"https://www.instagram.com/{username}/"
+        cached = extraction_cache.get(self.platform, profile_url, 'user_posts')
+        if cached is not None:
+            return cached
         
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': True,
+        header = {}
+        posts, count, complete = collect_pages(self.iter_user_posts(username, header=header), on_batch)
+        
+        info = {
+            'username': username,
+            'profile_pic': header.get('thumbnail'),
+            'posts': posts,
+            'count': count
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            posts = []
-            entries = info.get('entries', [])
-            
-            for entry in entries[:20]:  # Limit 20 posts
-                if entry:
-                    posts.append({
-                        'id': entry.get('id'),
-                        'title': entry.get('title', 'Instagram Post'),
-                        'thumbnail': entry.get('thumbnail'),
-                        'url': entry.get('webpage_url') or entry.get('url'),
-                        'type': 'video' if entry.get('duration') else 'photo'
-                    })
-            
-            return {
-                'username': username,
-                'profile_pic': info.get('thumbnail'),
-                'posts': posts
-            }
+        if complete:
+            extraction_cache.set(self.platform, profile_url, info, 'user_posts')
+        return info
     
-    def _extract_user_posts_gallerydl(self, username):
-        """Fallback: extract menggunakan gallery-dl"""
-        try:
-            url = f"https://www.instagram.com/{username}/"
-            
-            # Gunakan gallery-dl untuk extract info
-            result = subprocess.run(
-                ['gallery-dl', '--dump-json', '--range', '1-20', url],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"gallery-dl failed: {result.stderr}")
-            
+    def iter_user_posts(self, username, page_size=PAGE_SIZE, header=None):
+        """Generator halaman post dari username (yt-dlp lazy, fallback gallery-dl)"""
+        yield from iter_strategies(self.platform, 'listing', [
+            ('yt-dlp', lambda: self._iter_user_posts_ytdlp(username, page_size, header)),
+            ('gallery-dl', lambda: self._iter_user_posts_gallerydl(username, page_size)),
+        ])
+    
+    def _iter_user_posts_ytdlp(self, username, page_size, header):
+        """Listing menggunakan yt-dlp (flat, lazy)"""
+        url = f"https://www.instagram.com/{username}/"
+        
+        for page in iter_ytdlp_pages(url, page_size, header):
             posts = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        data = json.loads(line)
-                        posts.append({
-                            'id': data.get('post_id'),
-                            'title': data.get('description', 'Instagram Post')[:50],
-                            'thumbnail': data.get('thumbnail') or data.get('url'),
-                            'url': data.get('post_url'),
-                            'type': data.get('type', 'photo')
-                        })
-                    except:
-                        pass
-            
-            return {
-                'username': username,
-                'profile_pic': None,
-                'posts': posts
-            }
+            for entry in page:
+                posts.append({
+                    'id': entry.get('id'),
+                    'title': entry.get('title', 'Instagram Post'),
+                    'thumbnail': entry_thumbnail(entry),
+                    'url': entry.get('webpage_url') or entry.get('url'),
+                    'type': 'video' if entry.get('duration') else 'photo'
+                })
+            yield posts
+    
+    def _iter_user_posts_gallerydl(self, username, page_size):
+        """Fallback: listing menggunakan gallery-dl (in-process, lazy)"""
+        url = f"https://www.instagram.com/{username}/"
+        
+        def posts():
+            seen = set()
+            for data in iter_gallerydl(url):
+                # Satu post carousel = beberapa file dengan post_id yang sama
+                post_id = data.get('post_id') or data.get('post_shortcode')
+                if post_id in seen:
+                    continue
+                seen.add(post_id)
+                yield {
+                    'id': post_id,
+                    'title': (data.get('description') or 'Instagram Post')[:50],
+                    'thumbnail': data.get('display_url') or data.get('url'),
+                    'url': data.get('post_url') or f"https://www.instagram.com/p/{data.get('post_shortcode')}/",
+                    'type': 'video' if data.get('video_url') else 'photo'
+                }
         
+        try:
+            yield from paginate(posts(), page_size)
         except Exception as e:
             print(f"gallery-dl error: {e}")
             raise Exception(f"Failed to extract user posts: {e}")
     
     def extract_post_info(self, url):
         """Extract informasi dari single post"""
-        try:
-            return self._extract_post_info_ytdlp(url)
-        except Exception as e:
-            print(f"yt-dlp error: {e}")
-            return self._extract_post_info_gallerydl(url)
+        cached = extraction_cache.get(self.platform, url)
+        if cached is not None:
+            return cached
+        
+        run = run_hedged if self.hedged else run_strategies
+        info = run(self.platform, 'extract', [
+            ('yt-dlp', lambda cancel=None: self._extract_post_info_ytdlp(url)),
+            ('gallery-dl', lambda cancel=None: self._extract_post_info_gallerydl(url, cancel)),
+        ])
+        
+        extraction_cache.set(self.platform, url, info)
+        return info
     
     def _extract_post_info_ytdlp(self, url):
         """Extract post info menggunakan yt-dlp"""
-        import yt_dlp
-        
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with ydl_pool.acquire(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=False)
             
             # Cek apakah galeri (multiple photos/videos)
@@ -130,7 +134,8 @@ class InstagramDownloader:
                     'title': info.get('title', 'Instagram Post'),
                     'thumbnail': info.get('thumbnail'),
                     'items': items,
-                    'count': len(items)
+                    'count': len(items),
+                    '_ie_result': ydl.sanitize_info(info),  # dipakai ulang oleh download()
                 }
             else:
                 return {
@@ -138,33 +143,19 @@ class InstagramDownloader:
                     'title': info.get('title', 'Instagram Post'),
                     'thumbnail': info.get('thumbnail'),
                     'duration': info.get('duration'),
+                    '_ie_result': ydl.sanitize_info(info),
                 }
     
-    def _extract_post_info_gallerydl(self, url):
-        """Fallback: extract post info menggunakan gallery-dl"""
+    def _extract_post_info_gallerydl(self, url, cancel=None):
+        """Fallback: extract post info menggunakan gallery-dl (in-process)"""
         try:
-            result = subprocess.run(
-                ['gallery-dl', '--dump-json', url],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"gallery-dl failed: {result.stderr}")
-            
             items = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        data = json.loads(line)
-                        items.append({
-                            'thumbnail': data.get('thumbnail') or data.get('url'),
-                            'url': data.get('url'),
-                            'type': data.get('type', 'photo')
-                        })
-                    except:
-                        pass
+            for data in iter_gallerydl(url, cancel):
+                items.append({
+                    'thumbnail': data.get('display_url') or data.get('url'),
+                    'url': data.get('url'),
+                    'type': 'video' if data.get('video_url') else 'photo'
+                })
             
             if len(items) > 1:
                 return {
@@ -190,8 +181,6 @@ class InstagramDownloader:
     def extract_story(self, username):
         """Extract story dari username (tanpa login)"""
         try:
-            import yt_dlp
-            
             url = f"https://www.instagram.com/stories/{username}/"
             
             ydl_opts = {
@@ -199,7 +188,7 @@ class InstagramDownloader:
                 'no_warnings': True,
             }
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with ydl_pool.acquire(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
                 
                 stories = []
@@ -223,17 +212,19 @@ class InstagramDownloader:
             print(f"Failed to extract story: {e}")
             return {'username': username, 'stories': []}
     
-    def download(self, url, output_path, progress_callback=None):
-        """Download post (foto/video)"""
-        try:
-            return self._download_ytdlp(url, output_path, progress_callback)
-        except Exception as e:
-            print(f"yt-dlp download failed: {e}")
-            return self._download_gallerydl(url, output_path, progress_callback)
+    def download(self, url, output_path, progress_callback=None, info=None):
+        """Download post (foto/video) (info: hasil extract_post_info() untuk dipakai ulang)"""
+        info = info or {}
+        return run_strategies(self.platform, 'download', [
+            ('yt-dlp', lambda: self._download_ytdlp(url, output_path, progress_callback,
+                                                    ie_result=info.get('_ie_result'))),
+            ('gallery-dl', lambda: self._download_gallerydl(url, output_path, progress_callback)),
+        ])
     
-    def _download_ytdlp(self, url, output_path, progress_callback):
+    def _download_ytdlp(self, url, output_path, progress_callback, ie_result=None):
         """Download menggunakan yt-dlp"""
         import yt_dlp
+        import copy
         
         output_template = os.path.join(output_path, '%(title)s.%(ext)s')
         
@@ -245,8 +236,17 @@ class InstagramDownloader:
         if progress_callback:
             ydl_opts['progress_hooks'] = [progress_callback]
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
+        def run(ydl):
+            info = None
+            if ie_result:
+                # Pakai ulang hasil Fetch Info (tanpa extract ulang)
+                try:
+                    info = ydl.process_ie_result(copy.deepcopy(ie_result), download=True)
+                except yt_dlp.utils.DownloadError as e:
+                    # Biasanya URL media sudah expired -> extract ulang
+                    print(f"Reuse info gagal: {e}, extract ulang...")
+            if info is None:
+                info = ydl.extract_info(url, download=True)
             
             files = []
             
@@ -267,30 +267,18 @@ class InstagramDownloader:
                 'thumbnail': info.get('thumbnail'),
                 'count': len(files)
             }
+        
+        return watched_ydl(ydl_opts, run)
     
     def _download_gallerydl(self, url, output_path, progress_callback):
-        """Fallback: download menggunakan gallery-dl"""
+        """Fallback: download menggunakan gallery-dl (in-process)"""
         try:
-            result = subprocess.run(
-                ['gallery-dl', '--destination', output_path, url],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"gallery-dl failed: {result.stderr}")
-            
-            # Parse output untuk mendapatkan files yang didownload
-            files = []
-            for line in result.stdout.split('\n'):
-                if 'Downloading' in line or output_path in line:
-                    # Extract filename dari output
-                    pass
+            files = gallerydl_download(url, output_path)
             
             return {
                 'success': True,
                 'files': files or ['downloaded'],
+                'file_path': files[0] if files else output_path,
                 'title': 'Instagram Post',
                 'count': len(files) or 1
             }
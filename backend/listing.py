@@ -0,0 +1,103 @@
+"""
+Listing Helpers
+Enumerasi playlist/channel/profil secara bertahap (per halaman) tanpa batas jumlah item.
+- yt-dlp: extract_flat + process=False -> entries dibaca lazy dari extractor
+- Hasil dikirim per batch ke callback (UI) tanpa menahan seluruh listing di memory
+"""
+from itertools import islice
+
+from .ydl_pool import ydl_pool
+
+
+# Jumlah item per halaman/batch
+PAGE_SIZE = 50
+
+# Listing sampai jumlah ini disimpan utuh (untuk cache & hasil akhir);
+# lebih besar dari ini hanya di-stream lewat callback
+LISTING_CACHE_LIMIT = 1000
+
+
+def paginate(iterable, page_size=PAGE_SIZE):
+    """Pecah iterable menjadi list berukuran page_size"""
+    it = iter(iterable)
+    while True:
+        page = list(islice(it, page_size))
+        if not page:
+            return
+        yield page
+
+
+def entry_thumbnail(entry):
+    """Thumbnail dari entry flat yt-dlp ('thumbnail' atau item terakhir 'thumbnails')"""
+    if entry.get('thumbnail'):
+        return entry['thumbnail']
+    thumbs = entry.get('thumbnails') or []
+    for thumb in reversed(thumbs):
+        if thumb.get('url'):
+            return thumb['url']
+    return None
+
+
+def iter_ytdlp_pages(url, page_size=PAGE_SIZE, header=None, start=0):
+    """Generator halaman entry flat dari yt-dlp (lazy)
+
+    header: dict opsional, diisi title/thumbnail/uploader listing saat dibuka.
+    start: jumlah entry awal yang dilewati.
+    """
+    opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',
+        'lazy_playlist': True,
+    }
+
+    with ydl_pool.acquire(opts) as ydl:
+        info = ydl.extract_info(url, download=False, process=False)
+
+        # Ikuti redirect (mis. profil -> tab videos)
+        for _ in range(3):
+            if info.get('_type') not in ('url', 'url_transparent'):
+                break
+            info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+
+        if header is not None:
+            header.update({
+                'title': info.get('title'),
+                'thumbnail': entry_thumbnail(info),
+                'uploader': info.get('uploader') or info.get('channel'),
+            })
+
+        entries = info.get('entries')
+        if entries is None:
+            raise Exception("URL bukan playlist/profil")
+
+        entries = (e for e in entries if e)
+        if start:
+            entries = islice(entries, start, None)
+
+        for page in paginate(entries, page_size):
+            yield page
+
+
+def collect_pages(pages, on_batch=None, limit=LISTING_CACHE_LIMIT):
+    """Konsumsi generator halaman; kirim tiap halaman ke on_batch
+
+    Return (items, count, complete). Tanpa on_batch semua item dikumpulkan.
+    Dengan on_batch, item hanya dikumpulkan selama jumlahnya <= limit
+    (complete=False jika listing lebih besar dan tidak disimpan utuh).
+    """
+    items = []
+    count = 0
+    complete = True
+
+    for page in pages:
+        count += len(page)
+        if on_batch:
+            on_batch(page)
+            if complete and count > limit:
+                complete = False
+                items = []
+        if complete:
+            items.extend(page)
+
+    return items, count, complete
@@ -0,0 +1,223 @@
+"""
+Post-processing
+Tahap ffmpeg (convert mp3, merge video+audio, trim) terpisah dari download.
+- Worker pool sendiri: download item N+1 berjalan selagi item N di-convert,
+  jadi waktu batch mendekati max(network, CPU), bukan jumlah keduanya
+- Hand-off queue dibatasi: jika ffmpeg tertinggal, submit() menunggu
+  (download berikutnya tertahan, file mentah tidak menumpuk di disk)
+- Hasil dikembalikan sebagai Future; caller sync cukup memanggil .result()
+- Mode audio 'original': stream audio di-remux (m4a/opus/ogg) tanpa transcode;
+  re-encode ke mp3 hanya jika mode 'mp3' dipilih
+- mux_pipes: ffmpeg membaca input langsung dari pipe selagi download berjalan
+  (tanpa file sementara per stream)
+"""
+import atexit
+import os
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# ffmpeg multi-thread sendiri -> separuh core cukup, sisanya untuk download/UI
+WORKERS = max(1, (os.cpu_count() or 2) // 2)
+
+# Input ffmpeg dari pipe butuh fd yang diwariskan ke child process (pass_fds)
+PIPE_INPUTS = os.name == 'posix'
+
+# Mode output audio
+AUDIO_MP3 = 'mp3'
+AUDIO_ORIGINAL = 'original'
+
+# Task yang boleh antre (di luar yang sedang berjalan) sebelum submit() menunggu
+QUEUE_SIZE = 2
+
+
+class PostProcessor:
+    """Pool ffmpeg dengan hand-off queue terbatas"""
+
+    def __init__(self, workers=WORKERS, queue_size=QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self._slots = threading.BoundedSemaphore(self.workers + max(0, queue_size))
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='postprocess')
+
+    def submit(self, func, *args, **kwargs):
+        """Jadwalkan func di pool, return Future (blocking jika queue penuh)"""
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+
+
+postprocessor = PostProcessor()
+atexit.register(postprocessor.shutdown)
+
+
+def run_ffmpeg(args):
+    """Jalankan ffmpeg (tanpa output), CalledProcessError jika gagal"""
+    subprocess.run(['ffmpeg', *args, '-y'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                   check=True)
+
+
+def convert_to_mp3(input_file, bitrate='192k'):
+    """Convert audio ke mp3; return path hasil (file original jika ffmpeg gagal)"""
+    mp3_file = os.path.splitext(input_file)[0] + '.mp3'
+    try:
+        run_ffmpeg(['-i', input_file, '-vn', '-ar', '44100', '-ac', '2', '-b:a', bitrate, mp3_file])
+    except (subprocess.CalledProcessError, OSError):
+        # Jika ffmpeg gagal, tetap gunakan file original
+        return input_file
+
+    if os.path.exists(mp3_file):
+        os.remove(input_file)
+        return mp3_file
+    return input_file
+
+
+def audio_extension(codec):
+    """Container untuk codec audio tanpa transcode (None jika tidak dikenal)"""
+    codec = (codec or '').lower()
+    if codec.startswith(('mp4a', 'aac')):
+        return '.m4a'
+    if codec.startswith('opus'):
+        return '.opus'
+    if codec.startswith('vorbis'):
+        return '.ogg'
+    if codec.startswith('mp3'):
+        return '.mp3'
+    return None
+
+
+def remux_audio(input_file, codec):
+    """Pindahkan stream audio ke container yang sesuai tanpa re-encode
+
+    Return path hasil (file original jika codec tidak dikenal / ffmpeg gagal).
+    """
+    ext = audio_extension(codec)
+    base, current = os.path.splitext(input_file)
+    if ext is None or current.lower() == ext:
+        return input_file
+
+    output_file = base + ext
+    if current.lower() == '.mp4' and ext == '.m4a':
+        # MP4 audio-only sudah M4A: cukup ganti nama
+        os.replace(input_file, output_file)
+        return output_file
+
+    try:
+        run_ffmpeg(['-i', input_file, '-vn', '-c:a', 'copy', output_file])
+    except (subprocess.CalledProcessError, OSError):
+        return input_file
+
+    if os.path.exists(output_file):
+        os.remove(input_file)
+        return output_file
+    return input_file
+
+
+def ytdlp_audio_options(audio_format, quality='192'):
+    """format + postprocessor yt-dlp untuk download audio
+
+    'original': audio terbaik diekstrak apa adanya (preferredcodec 'best' = tanpa
+    transcode jika codec-nya bisa disimpan langsung).
+    """
+    if audio_format == AUDIO_ORIGINAL:
+        return {
+            'format': 'bestaudio/best',
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'best',
+            }],
+        }
+    return {
+        'format': 'bestaudio/best',
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': quality,
+        }],
+    }
+
+
+def merge_video_audio(video_file, audio_file, output_file):
+    """Gabung stream adaptive; return path hasil (video only jika merge gagal)"""
+    try:
+        run_ffmpeg(['-i', video_file, '-i', audio_file, '-c:v', 'copy', '-c:a', 'aac', output_file])
+    except (subprocess.CalledProcessError, OSError):
+        if os.path.exists(audio_file):
+            os.remove(audio_file)
+        return video_file
+
+    # Hapus temp files
+    os.remove(video_file)
+    os.remove(audio_file)
+    return output_file
+
+
+def mux_pipes(writers, output_args, output_file):
+    """ffmpeg dengan satu input pipe per writer; writer(file) menulis data input itu
+
+    Setiap writer berjalan di thread sendiri, jadi semua input mengalir paralel
+    dan output ditulis sekali. Writer yang gagal menghentikan ffmpeg (output
+    tidak boleh selesai dengan input terpotong). Hanya POSIX (PIPE_INPUTS).
+    """
+    pipes = [os.pipe() for _ in writers]
+    cmd = ['ffmpeg', '-nostdin']
+    for read_fd, _ in pipes:
+        cmd.extend(['-i', f'pipe:{read_fd}'])
+    cmd.extend([*output_args, output_file, '-y'])
+
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                pass_fds=[read_fd for read_fd, _ in pipes])
+    except Exception:
+        for read_fd, write_fd in pipes:
+            os.close(read_fd)
+            os.close(write_fd)
+        raise
+    for read_fd, _ in pipes:
+        os.close(read_fd)
+
+    errors = []
+    stderr_tail = deque(maxlen=20)
+
+    def feed(writer, write_fd):
+        f = open(write_fd, 'wb')
+        try:
+            writer(f)
+        except Exception as e:
+            # Kill sebelum pipe ditutup: EOF dari input terpotong tidak boleh jadi output "sukses"
+            errors.append(e)
+            proc.kill()
+        finally:
+            try:
+                f.close()
+            except OSError:
+                pass
+
+    def read_stderr():
+        for line in proc.stderr:
+            stderr_tail.append(line.decode('utf-8', 'replace'))
+
+    threads = [threading.Thread(target=feed, args=(writer, write_fd), daemon=True)
+               for writer, (_, write_fd) in zip(writers, pipes)]
+    threads.append(threading.Thread(target=read_stderr, daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    proc.wait()
+
+    # returncode > 0: ffmpeg keluar sendiri (pesan dari stderr lebih berguna)
+    if errors and proc.returncode <= 0:
+        raise errors[0]
+    if proc.returncode != 0:
+        raise Exception(f"ffmpeg failed: {''.join(stderr_tail).strip()[-300:]}")
+    return output_file
@@ -0,0 +1,251 @@
+"""
+Resumable Download
+Download HTTP ke file .part yang bisa dilanjutkan (Range request).
+- Retry / fallback / restart aplikasi melanjutkan dari ukuran .part, bukan dari byte 0
+- Registry partial: stream mana (format/itag) yang sedang didownload ke path mana,
+  supaya tool fallback (yt-dlp) bisa melanjutkan file .part yang sama
+- Koneksi yang macet (watchdog) diputus lalu disambung ulang dari offset terakhir
+"""
+import json
+import os
+import socket
+import threading
+import time
+import urllib.request
+from contextlib import nullcontext
+from http.client import HTTPException
+from urllib.error import HTTPError, URLError
+from pathlib import Path
+
+from .cache import canonical_url
+from .watchdog import StallError, TransferWatchdog
+
+
+# Ukuran satu Range request (seperti pytube; request besar sering di-throttle)
+SEGMENT_SIZE = 9 * 1024 * 1024
+READ_SIZE = 64 * 1024
+
+# Percobaan ulang berturut-turut tanpa progress sebelum menyerah
+MAX_RETRIES = 10
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/120.0 Safari/537.36"
+}
+
+
+def part_path(path):
+    return path + '.part'
+
+
+def _total_from_response(resp, offset):
+    """Ukuran total file dari Content-Range / Content-Length"""
+    content_range = resp.headers.get('Content-Range')
+    if content_range and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        if total.isdigit():
+            return int(total)
+    length = resp.headers.get('Content-Length')
+    if length and length.isdigit():
+        return int(length) + (offset if resp.status == 206 else 0)
+    return None
+
+
+def _transfer(url, offset, total_size, open_sink, on_progress, headers, retries, timeout):
+    """Loop Range request: tulis data mulai offset ke sink, sambung ulang jika putus/macet
+
+    open_sink(mode) -> context manager file ('ab' lanjut, 'wb' mulai ulang dari 0).
+    on_progress(offset, total_size) dipanggil setiap chunk. Return (offset, total_size).
+    """
+    failures = 0
+    while not (total_size and offset >= total_size):
+        if total_size:
+            end = min(offset + SEGMENT_SIZE, total_size) - 1
+            byte_range = f"bytes={offset}-{end}"
+        else:
+            byte_range = f"bytes={offset}-"
+        req = urllib.request.Request(url, headers={**DEFAULT_HEADERS, **(headers or {}), 'Range': byte_range})
+
+        watchdog = TransferWatchdog()
+        try:
+            with urllib.request.urlopen(req, timeout=min(timeout, watchdog.window)) as resp:
+                mode = 'ab'
+                if resp.status == 200 and offset:
+                    # Server mengabaikan Range -> mulai ulang
+                    offset = 0
+                    mode = 'wb'
+                if total_size is None:
+                    total_size = _total_from_response(resp, offset)
+
+                received = 0
+                with open_sink(mode) as f:
+                    while True:
+                        chunk = resp.read1(READ_SIZE)  # data yang sudah ada, tanpa menunggu blok penuh
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        offset += len(chunk)
+                        received += len(chunk)
+                        on_progress(offset, total_size)
+                        watchdog.check(offset)
+
+            failures = 0
+            if not total_size and not received:
+                break  # ukuran tidak diketahui: EOF = selesai
+            if not total_size and resp.status == 200:
+                break
+        except HTTPError as e:
+            if e.code == 416 and offset:
+                # Range di luar ukuran file -> .part sudah lengkap
+                break
+            if e.code < 500:
+                raise Exception(f"HTTP {e.code} saat download (partial {offset} byte disimpan)")
+            failures += 1
+            if failures > retries:
+                raise Exception(f"Download gagal di byte {offset}: {e}")
+            time.sleep(min(2 ** failures, 30))
+        except (URLError, HTTPException, socket.timeout, ConnectionError, StallError) as e:
+            failures += 1
+            if failures > retries:
+                raise Exception(f"Download terputus di byte {offset}: {e}")
+            time.sleep(min(2 ** failures, 30))
+
+    return offset, total_size
+
+
+def download_resumable(url, path, total_size=None, progress_callback=None, headers=None,
+                       retries=MAX_RETRIES, timeout=30):
+    """Download url ke path lewat path.part, melanjutkan .part yang sudah ada
+
+    progress_callback menerima dict seperti progress hook yt-dlp
+    (status, downloaded_bytes, total_bytes, filename).
+    timeout = batas satu operasi baca; koneksi yang masih mengalir tapi di bawah
+    ambang watchdog juga diputus dan disambung ulang.
+    """
+    part = part_path(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    offset = os.path.getsize(part) if os.path.exists(part) else 0
+    if total_size and offset > total_size:
+        offset = 0
+        open(part, 'wb').close()
+
+    def report(status, done, total):
+        if progress_callback:
+            progress_callback({
+                'status': status,
+                'downloaded_bytes': done,
+                'total_bytes': total,
+                'filename': path,
+            })
+
+    offset, total_size = _transfer(url, offset, total_size, lambda mode: open(part, mode),
+                                   lambda done, total: report('downloading', done, total),
+                                   headers, retries, timeout)
+
+    os.replace(part, path)
+    report('finished', offset, total_size)
+    return path
+
+
+class _PipeSink:
+    """Tulis ke pipe; pipe yang ditutup pembacanya bukan error jaringan (tidak di-retry)
+
+    tee: file yang menerima salinan data yang sama (.part untuk resume).
+    """
+
+    def __init__(self, out, tee=None):
+        self.out = out
+        self.tee = tee
+
+    def write(self, data):
+        if self.tee is not None:
+            self.tee.write(data)
+        try:
+            self.out.write(data)
+        except BrokenPipeError:
+            raise Exception("Pipe ditutup oleh pembaca")
+
+
+def stream_resumable(url, out, total_size=None, progress_callback=None, headers=None,
+                     retries=MAX_RETRIES, timeout=30, tee_path=None):
+    """Seperti download_resumable, tapi data ditulis ke file object (mis. pipe ke ffmpeg)
+
+    Koneksi yang putus/macet disambung dari offset terakhir. tee_path: data juga
+    ditulis ke file ini (mis. .part), jadi stream yang berhenti di tengah
+    (restart, ffmpeg gagal) bisa dilanjutkan download_resumable dari offset itu.
+    """
+    tee = open(tee_path, 'wb') if tee_path else None
+
+    def open_sink(mode):
+        if mode == 'wb':
+            raise Exception("Server mengabaikan Range, stream tidak bisa dilanjutkan")
+        return nullcontext(_PipeSink(out, tee))
+
+    def report(done, total):
+        if progress_callback:
+            progress_callback({'status': 'downloading', 'downloaded_bytes': done, 'total_bytes': total})
+
+    try:
+        offset, _ = _transfer(url, 0, total_size, open_sink, report, headers, retries, timeout)
+    finally:
+        if tee is not None:
+            tee.close()
+    return offset
+
+
+class PartialRegistry:
+    """Catatan download yang belum selesai: (platform, url) -> path + format"""
+
+    def __init__(self, registry_file=None):
+        self.registry_file = Path(registry_file) if registry_file else Path.home() / ".media_downloader" / "partials.json"
+        self._lock = threading.Lock()
+
+    def _key(self, platform, url):
+        return f"{platform}|{canonical_url(url)}"
+
+    def _load(self):
+        try:
+            with open(self.registry_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, data):
+        try:
+            self.registry_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.registry_file.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.registry_file)
+        except Exception as e:
+            print(f"Partial registry save error: {e}")
+
+    def get(self, platform, url):
+        """Partial yang .part-nya masih ada (None jika tidak ada)"""
+        with self._lock:
+            entry = self._load().get(self._key(platform, url))
+        if entry and os.path.exists(part_path(entry.get('path', ''))):
+            return entry
+        return None
+
+    def set(self, platform, url, path, format_id=None):
+        with self._lock:
+            data = self._load()
+            data[self._key(platform, url)] = {
+                'path': path,
+                'format_id': format_id,
+                'updated': time.time(),
+            }
+            self._save(data)
+
+    def remove(self, platform, url):
+        with self._lock:
+            data = self._load()
+            if data.pop(self._key(platform, url), None) is not None:
+                self._save(data)
+
+
+# Instance bersama untuk semua backend
+partial_registry = PartialRegistry()
@@ -3,115 +3,127 @@ TikTok Downloader Backend
 Support: yt-dlp (primary), gallery-dl (fallback)
 """
 import os
-import json
-import subprocess
+
+from .cache import extraction_cache
+from .external_tools import gallerydl_download, iter_gallerydl
+from .health import iter_strategies, run_strategies
+from .hedge import run_hedged
+from .listing import PAGE_SIZE, collect_pages, entry_thumbnail, iter_ytdlp_pages, paginate
+from .ydl_pool import ydl_pool
+from .watchdog import watched_ydl
 
 
 class TikTokDownloader:
+    # Fetch Info hedged: fallback dijalankan paralel jika primary lambat (diatur dari config)
+    hedged = False
+    
     def __init__(self):
         self.platform = "TikTok"
     
-    def extract_user_posts(self, username):
-        """Extract posts dari username"""
-        try:
-            return self._extract_user_posts_ytdlp(username)
-        except Exception as e:
-            print(f"yt-dlp error: {e}")
-            return self._extract_user_posts_gallerydl(username)
-    
-    def _extract_user_posts_ytdlp(self, username):
-        """Extract menggunakan yt-dlp"""
-        import yt_dlp
+    def extract_user_posts(self, username, on_batch=None):
+        """Extract posts dari username (tanpa batas jumlah post)
         
-        # TikTok user URL format
-        url = f"https://www.tiktok.com/@{username}"
+        on_batch: callback(list) opsional, menerima post per halaman.
+        """
+        profile_url = f"https://www.tiktok.com/@{username}"
+        cached = extraction_cache.get(self.platform, profile_url, 'user_posts')
+        if cached is not None:
+            return cached
         
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': True,
+        header = {}
+        posts, count, complete = collect_pages(self.iter_user_posts(username, header=header), on_batch)
+        
+        info = {
+            'username': username,
+            'profile_pic': header.get('thumbnail'),
+            'posts': posts,
+            'count': count
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            
-            posts = []
-            entries = info.get('entries', [])
-            
-            for entry in entries[:20]:  # Limit 20 posts
-                if entry:
-                    posts.append({
-                        'id': entry.get('id'),
-                        'title': entry.get('title', 'TikTok Video')[:50],
-                        'thumbnail': entry.get('thumbnail'),
-                        'url': entry.get('webpage_url') or entry.get('url'),
-                        'duration': entry.get('duration')
-                    })
-            
-            return {
-                'username': username,
-                'profile_pic': info.get('thumbnail'),
-                'posts': posts
-            }
+        if complete:
+            extraction_cache.set(self.platform, profile_url, info, 'user_posts')
+        return info
     
-    def _extract_user_posts_gallerydl(self, username):
-        """Fallback: extract menggunakan gallery-dl"""
-        try:
-            url = f"https://www.tiktok.com/@{username}"
-            
-            result = subprocess.run(
-                ['gallery-dl', '--dump-json', '--range', '1-20', url],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"gallery-dl failed: {result.stderr}")
-            
+    def iter_user_posts(self, username, page_size=PAGE_SIZE, header=None):
+        """Generator halaman post dari username (yt-dlp lazy, fallback gallery-dl)"""
+        yield from iter_strategies(self.platform, 'listing', [
+            ('yt-dlp', lambda: self._iter_user_posts_ytdlp(username, page_size, header)),
+            ('gallery-dl', lambda: self._iter_user_posts_gallerydl(username, page_size)),
+        ])
+    
+    def _iter_user_posts_ytdlp(self, username, page_size, header):
+        """Listing menggunakan yt-dlp (flat, lazy)"""
+        # TikTok user URL format
+        url = f"https://www.tiktok.com/@{username}"
+        
+        for page in iter_ytdlp_pages(url, page_size, header):
             posts = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        data = json.loads(line)
-                        posts.append({
-                            'id': data.get('id'),
-                            'title': data.get('description', 'TikTok Video')[:50],
-                            'thumbnail': data.get('thumbnail'),
-                            'url': f"https://www.tiktok.com/@{username}/video/{data.get('id')}",
-                            'duration': data.get('duration')
-                        })
-                    except:
-                        pass
-            
-            return {
-                'username': username,
-                'profile_pic': None,
-                'posts': posts
-            }
+            for entry in page:
+                posts.append({
+                    'id': entry.get('id'),
+                    'title': (entry.get('title') or 'TikTok Video')[:50],
+                    'thumbnail': entry_thumbnail(entry),
+                    'url': entry.get('webpage_url') or entry.get('url'),
+                    'duration': entry.get('duration')
+                })
+            yield posts
+    
+    def _iter_user_posts_gallerydl(self, username, page_size):
+        """Fallback: listing menggunakan gallery-dl (in-process, lazy)"""
+        url = f"https://www.tiktok.com/@{username}"
+        
+        def posts():
+            seen = set()
+            for data in iter_gallerydl(url):
+                # Post foto (slideshow) = beberapa file dengan id yang sama
+                if data.get('id') in seen:
+                    continue
+                seen.add(data.get('id'))
+                yield self._gallerydl_entry(data, username)
         
+        try:
+            yield from paginate(posts(), page_size)
         except Exception as e:
             print(f"gallery-dl error: {e}")
             raise Exception(f"Failed to extract user posts: {e}")
     
+    def _gallerydl_entry(self, data, username=None):
+        """Record gallery-dl -> entry video"""
+        video = data.get('video') if isinstance(data.get('video'), dict) else {}
+        author = data.get('author') if isinstance(data.get('author'), dict) else {}
+        username = username or author.get('uniqueId')
+        return {
+            'id': data.get('id'),
+            'title': (data.get('desc') or data.get('description') or 'TikTok Video')[:50],
+            'thumbnail': data.get('thumbnail') or video.get('cover'),
+            'url': f"https://www.tiktok.com/@{username}/video/{data.get('id')}",
+            'duration': data.get('duration') or video.get('duration'),
+            'author': author.get('nickname'),
+        }
+    
     def extract_video_info(self, url):
         """Extract informasi dari single video"""
-        try:
-            return self._extract_video_info_ytdlp(url)
-        except Exception as e:
-            print(f"yt-dlp error: {e}")
-            return self._extract_video_info_gallerydl(url)
+        cached = extraction_cache.get(self.platform, url)
+        if cached is not None:
+            return cached
+        
+        run = run_hedged if self.hedged else run_strategies
+        info = run(self.platform, 'extract', [
+            ('yt-dlp', lambda cancel=None: self._extract_video_info_ytdlp(url)),
+            ('gallery-dl', lambda cancel=None: self._extract_video_info_gallerydl(url, cancel)),
+        ])
+        
+        extraction_cache.set(self.platform, url, info)
+        return info
     
     def _extract_video_info_ytdlp(self, url):
         """Extract video info menggunakan yt-dlp"""
-        import yt_dlp
-        
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
         }
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with ydl_pool.acquire(ydl_opts) as ydl:
             info = ydl.extract_info(url, download=False)
             
             return {
@@ -120,34 +132,21 @@ class TikTokDownloader:
                 'thumbnail': info.get('thumbnail'),
                 'duration': info.get('duration'),
                 'author': info.get('uploader'),
+                '_ie_result': ydl.sanitize_info(info),  # dipakai ulang oleh download()
             }
     
-    def _extract_video_info_gallerydl(self, url):
-        """Fallback: extract video info menggunakan gallery-dl"""
+    def _extract_video_info_gallerydl(self, url, cancel=None):
+        """Fallback: extract video info menggunakan gallery-dl (in-process)"""
         try:
-            result = subprocess.run(
-                ['gallery-dl', '--dump-json', url],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"gallery-dl failed: {result.stderr}")
-            
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    try:
-                        data = json.loads(line)
-                        return {
-                            'type': 'video',
-                            'title': data.get('description', 'TikTok Video')[:50],
-                            'thumbnail': data.get('thumbnail'),
-                            'duration': data.get('duration'),
-                            'author': data.get('author', {}).get('nickname'),
-                        }
-                    except:
-                        pass
+            for data in iter_gallerydl(url, cancel):
+                entry = self._gallerydl_entry(data)
+                return {
+                    'type': 'video',
+                    'title': entry['title'],
+                    'thumbnail': entry['thumbnail'],
+                    'duration': entry['duration'],
+                    'author': entry['author'],
+                }
             
             raise Exception("Failed to parse video info")
         
@@ -155,17 +154,19 @@ class TikTokDownloader:
             print(f"gallery-dl error: {e}")
             raise Exception(f"Failed to extract video info: {e}")
     
-    def download(self, url, output_path, quality='best', progress_callback=None):
-        """Download video"""
-        try:
-            return self._download_ytdlp(url, output_path, quality, progress_callback)
-        except Exception as e:
-            print(f"yt-dlp download failed: {e}")
-            return self._download_gallerydl(url, output_path, progress_callback)
+    def download(self, url, output_path, quality='best', progress_callback=None, info=None):
+        """Download video (info: hasil extract_video_info() untuk dipakai ulang)"""
+        info = info or {}
+        return run_strategies(self.platform, 'download', [
+            ('yt-dlp', lambda: self._download_ytdlp(url, output_path, quality, progress_callback,
+                                                    ie_result=info.get('_ie_result'))),
+            ('gallery-dl', lambda: self._download_gallerydl(url, output_path, progress_callback)),
+        ])
     
-    def _download_ytdlp(self, url, output_path, quality, progress_callback):
+    def _download_ytdlp(self, url, output_path, quality, progress_callback, ie_result=None):
         """Download menggunakan yt-dlp"""
         import yt_dlp
+        import copy
         
         output_template = os.path.join(output_path, '%(title)s.%(ext)s')
         
@@ -177,8 +178,17 @@ class TikTokDownloader:
         if progress_callback:
             ydl_opts['progress_hooks'] = [progress_callback]
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
+        def run(ydl):
+            info = None
+            if ie_result:
+                # Pakai ulang hasil Fetch Info (tanpa extract ulang)
+                try:
+                    info = ydl.process_ie_result(copy.deepcopy(ie_result), download=True)
+                except yt_dlp.utils.DownloadError as e:
+                    # Biasanya URL media sudah expired -> extract ulang
+                    print(f"Reuse info gagal: {e}, extract ulang...")
+            if info is None:
+                info = ydl.extract_info(url, download=True)
             filename = ydl.prepare_filename(info)
             
             return {
@@ -187,23 +197,17 @@ class TikTokDownloader:
                 'title': info.get('title', 'TikTok Video'),
                 'thumbnail': info.get('thumbnail')
             }
+        
+        return watched_ydl(ydl_opts, run)
     
     def _download_gallerydl(self, url, output_path, progress_callback):
-        """Fallback: download menggunakan gallery-dl"""
+        """Fallback: download menggunakan gallery-dl (in-process)"""
         try:
-            result = subprocess.run(
-                ['gallery-dl', '--destination', output_path, url],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode != 0:
-                raise Exception(f"gallery-dl failed: {result.stderr}")
+            files = gallerydl_download(url, output_path)
             
             return {
                 'success': True,
-                'file_path': output_path,
+                'file_path': files[0] if files else output_path,
                 'title': 'TikTok Video',
             }
         
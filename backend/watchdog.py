@@ -0,0 +1,201 @@
+"""
+Transfer Watchdog
+Deteksi transfer macet berdasarkan progress byte, bukan timeout total.
+- Transfer di-abort jika throughput di bawah min_speed selama satu window penuh
+- Transfer lambat tapi masih jalan dibiarkan selesai, berapa pun lamanya
+- Sumber progress: progress hook yt-dlp, download_resumable (pytube),
+  dan pertumbuhan file output untuk tool eksternal (subprocess)
+- Transfer yang di-abort dilanjutkan dari file .part (bukan dari byte 0)
+"""
+import os
+import subprocess
+import threading
+import time
+from collections import deque
+
+from .ydl_pool import ydl_pool
+
+
+# Default: macet jika < 10 KB/s selama 60 detik; dilanjutkan ulang maksimal 3x.
+# min_speed x window sebaiknya lebih besar dari blok tulis tool eksternal
+# (you-get menulis per 256 KB), kalau tidak file terlihat diam di antara blok.
+MIN_SPEED = 10 * 1024
+STALL_WINDOW = 60
+STALL_RETRIES = 3
+
+# Interval cek pertumbuhan file output (detik)
+POLL_INTERVAL = 1.0
+
+# Ukuran blok baca maksimal saat diawasi: progress baru terlihat per blok, jadi
+# blok besar (yt-dlp bisa membesarkannya sampai MB) menunda deteksi koneksi
+# yang hanya menetes
+READ_BLOCK = 64 * 1024
+
+_settings = {'min_speed': MIN_SPEED, 'window': STALL_WINDOW}
+
+
+def configure(min_speed=None, window=None):
+    """Ubah ambang default (dari Settings)"""
+    if min_speed is not None:
+        _settings['min_speed'] = max(0, int(min_speed))
+    if window is not None:
+        _settings['window'] = max(5, int(window))
+
+
+class StallError(Exception):
+    pass
+
+
+class TransferWatchdog:
+    """Sampel (waktu, byte) dalam satu window; macet jika rata-rata < min_speed"""
+
+    def __init__(self, min_speed=None, window=None):
+        self.min_speed = _settings['min_speed'] if min_speed is None else min_speed
+        self.window = _settings['window'] if window is None else window
+        self.tripped = False
+        self._samples = deque()
+        self._lock = threading.Lock()
+
+    def reset(self):
+        """Mulai window baru (mis. file berikutnya / ada aktivitas lain)"""
+        with self._lock:
+            self._samples.clear()
+
+    def observe(self, done):
+        """Catat total byte saat ini, return True jika transfer macet"""
+        now = time.monotonic()
+        with self._lock:
+            if self._samples and done < self._samples[-1][1]:
+                # Counter mulai dari 0 lagi (file/format berikutnya)
+                self._samples.clear()
+            self._samples.append((now, done))
+            # Simpan satu sampel tepat sebelum batas window sebagai titik awal
+            while len(self._samples) > 1 and now - self._samples[1][0] >= self.window:
+                self._samples.popleft()
+
+            start, start_bytes = self._samples[0]
+            elapsed = now - start
+            if elapsed < self.window:
+                return False
+            if (done - start_bytes) / elapsed >= self.min_speed:
+                return False
+            self.tripped = True
+            return True
+
+    def message(self):
+        return f"transfer macet: di bawah {self.min_speed // 1024} KB/s selama {self.window} detik"
+
+    def check(self, done):
+        if self.observe(done):
+            raise StallError(self.message())
+
+    def hook(self, d):
+        """Progress hook gaya yt-dlp (dict status/downloaded_bytes)"""
+        if d.get('status') == 'downloading' and d.get('downloaded_bytes') is not None:
+            self.check(d['downloaded_bytes'])
+        elif d.get('status') == 'finished':
+            self.reset()
+
+
+def retry_stalled(run, retries=STALL_RETRIES):
+    """Jalankan run(watchdog); jika macet, ulangi (lanjut dari .part) sampai retries kali
+
+    Error selain macet langsung diteruskan.
+    """
+    for attempt in range(retries + 1):
+        watchdog = TransferWatchdog()
+        try:
+            return run(watchdog)
+        except Exception as e:
+            if not watchdog.tripped or attempt >= retries:
+                raise
+            print(f"{e}, dilanjutkan ulang ({attempt + 1}/{retries})...")
+
+
+def watched_ydl(ydl_opts, run):
+    """Download yt-dlp dengan watchdog: `return watched_ydl(ydl_opts, lambda ydl: ...)`
+
+    Koneksi yang diam lebih lama dari window diputus lewat socket_timeout
+    (yt-dlp retry sendiri); yang masih mengalir tapi terlalu lambat di-abort
+    lewat progress hook lalu dilanjutkan dari .part.
+    """
+    def attempt(watchdog):
+        opts = {
+            **ydl_opts,
+            'socket_timeout': watchdog.window,
+            'continuedl': True,
+            'buffersize': READ_BLOCK,
+            'noresizebuffer': True,
+            'progress_hooks': [watchdog.hook, *(ydl_opts.get('progress_hooks') or [])],
+        }
+        with ydl_pool.acquire(opts) as ydl:
+            return run(ydl)
+
+    return retry_stalled(attempt)
+
+
+def tree_size(path):
+    """Total ukuran file di bawah path (file atau folder, rekursif)"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def run_watched(cmd, watch_path, watchdog=None, cancel=None):
+    """Seperti subprocess.run(capture_output=True, text=True) tanpa timeout total
+
+    Progress = pertumbuhan file di watch_path; setiap baris output dianggap
+    aktivitas. Proses di-kill (StallError) jika macet selama satu window.
+    watch_path di-scan tiap POLL_INTERVAL: pakai file/folder milik job ini
+    saja (bukan folder output bersama yang juga diisi download lain).
+    """
+    watchdog = watchdog or TransferWatchdog()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, encoding='utf-8', errors='replace')
+    if cancel is not None:
+        cancel.register(proc)
+
+    stdout, stderr = [], []
+    activity = threading.Event()
+
+    def read(stream, lines):
+        for line in stream:
+            lines.append(line)
+            activity.set()
+
+    readers = [threading.Thread(target=read, args=(proc.stdout, stdout), daemon=True),
+               threading.Thread(target=read, args=(proc.stderr, stderr), daemon=True)]
+    for reader in readers:
+        reader.start()
+
+    try:
+        while True:
+            try:
+                proc.wait(timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if activity.is_set():
+                activity.clear()
+                watchdog.reset()
+            if watchdog.observe(tree_size(watch_path)):
+                raise StallError(watchdog.message())
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        for reader in readers:
+            reader.join(timeout=5)
+        if cancel is not None:
+            cancel.unregister(proc)
+
+    if cancel is not None:
+        cancel.check()
+    return subprocess.CompletedProcess(cmd, proc.returncode, ''.join(stdout), ''.join(stderr))
@@ -0,0 +1,166 @@
+"""
+YoutubeDL Pool
+Instance yt_dlp.YoutubeDL yang sudah "warm" (extractor, cookie jar, HTTP opener)
+dipakai ulang antar pemanggilan, dikelompokkan per set opsi.
+- Satu instance hanya dipakai satu thread dalam satu waktu (checkout/release)
+- Opsi per download (PER_CALL_OPTIONS: hook, format, outtmpl, download_ranges, ...)
+  tidak ikut menjadi key pool; dipasang ke instance saat checkout, dikembalikan saat release
+- Opsi yang tidak bisa diserialisasi (callable, objek) -> instance sekali pakai, tanpa pool
+"""
+import atexit
+import copy
+import json
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+# Opsi yang berbeda per panggilan dan dipasang saat checkout (dibaca yt-dlp per download,
+# bukan saat YoutubeDL dibuat). socket_timeout tidak termasuk: dipakai saat opener dibuat.
+PER_CALL_OPTIONS = ('progress_hooks', 'format', 'outtmpl', 'download_ranges',
+                    'buffersize', 'noresizebuffer', 'continuedl')
+
+_MISSING = object()
+
+
+def _options_key(opts):
+    """Key pool; None jika ada opsi yang tidak bisa diserialisasi (repr per objek = key unik)"""
+    try:
+        return json.dumps(opts, sort_keys=True)
+    except (TypeError, ValueError):
+        return None
+
+
+class _PooledYDL:
+    """YoutubeDL + opsi per panggilan (hook, format, outtmpl, ...) yang bisa diganti per checkout"""
+
+    def __init__(self, opts):
+        import yt_dlp
+
+        self.hooks = []
+        self.ydl = yt_dlp.YoutubeDL(opts)
+        self.ydl.add_progress_hook(self._dispatch)
+        self._base = {k: copy.deepcopy(self.ydl.params[k]) if k in self.ydl.params else _MISSING
+                      for k in PER_CALL_OPTIONS if k != 'progress_hooks'}
+        self._base_selector = self.ydl.format_selector
+
+    def _dispatch(self, d):
+        for hook in list(self.hooks):
+            hook(d)
+
+    def _format_selector(self, spec):
+        if spec in (None, '-') or callable(spec):
+            return spec
+        return self.ydl.build_format_selector(spec)
+
+    def apply(self, opts):
+        """Pasang opsi per panggilan"""
+        params = self.ydl.params
+        self.hooks = list(opts.get('progress_hooks') or [])
+        for key in self._base:
+            if key in opts:
+                params[key] = opts[key]
+        if 'outtmpl' in opts:
+            self.ydl._parse_outtmpl()
+        if 'format' in opts:
+            self.ydl.format_selector = self._format_selector(opts['format'])
+
+    def reset(self):
+        """Kembalikan opsi per panggilan ke nilai saat instance dibuat"""
+        params = self.ydl.params
+        self.hooks = []
+        for key, value in self._base.items():
+            if value is _MISSING:
+                params.pop(key, None)
+            else:
+                params[key] = copy.deepcopy(value)
+        self.ydl.format_selector = self._base_selector
+
+    def close(self):
+        try:
+            self.ydl.close()
+        except Exception as e:
+            print(f"YoutubeDL close error: {e}")
+
+
+class YDLPool:
+    """Pool instance YoutubeDL per set opsi (thread-safe)"""
+
+    def __init__(self, max_idle_per_key=2, max_keys=8):
+        self.max_idle_per_key = max_idle_per_key
+        self.max_keys = max_keys
+        self._idle = OrderedDict()  # key -> [_PooledYDL, ...]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, opts):
+        """Checkout instance untuk satu operasi: `with ydl_pool.acquire(opts) as ydl:`"""
+        base_opts = {k: v for k, v in opts.items() if k not in PER_CALL_OPTIONS}
+        key = _options_key(base_opts)
+
+        item = self._checkout(key) if key is not None else None
+        if item is None:
+            item = _PooledYDL(base_opts)
+
+        ok = False
+        try:
+            item.apply(opts)
+            yield item.ydl
+            ok = True
+        except GeneratorExit:
+            # Generator pemakai berhenti lebih awal (mis. listing tidak dibaca habis)
+            ok = True
+            raise
+        finally:
+            item.reset()
+            if ok and key is not None:
+                self._release(key, item)
+            else:
+                # Instance yang error / sekali pakai (opsi tidak bisa diserialisasi) tidak dipakai ulang
+                item.close()
+
+    def close_all(self):
+        """Tutup semua instance idle (simpan cookie, tutup koneksi)"""
+        with self._lock:
+            items = [item for bucket in self._idle.values() for item in bucket]
+            self._idle.clear()
+        for item in items:
+            item.close()
+
+    def _checkout(self, key):
+        with self._lock:
+            bucket = self._idle.get(key)
+            if bucket:
+                self._idle.move_to_end(key)
+                return bucket.pop()
+        return None
+
+    def _release(self, key, item):
+        to_close = []
+        with self._lock:
+            bucket = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            if len(bucket) < self.max_idle_per_key:
+                bucket.append(item)
+            else:
+                to_close.append(item)
+
+            while len(self._idle) > self.max_keys:
+                _, old_bucket = self._idle.popitem(last=False)
+                to_close.extend(old_bucket)
+
+        for old in to_close:
+            old.close()
+
+
+def downloaded_path(ydl, info):
+    """Path file final hasil download (setelah postprocessor, mis. ekstrak audio)"""
+    for item in info.get('requested_downloads') or []:
+        if item.get('filepath'):
+            return item['filepath']
+    return ydl.prepare_filename(info)
+
+
+# Instance bersama untuk semua backend
+ydl_pool = YDLPool()
+atexit.register(ydl_pool.close_all)
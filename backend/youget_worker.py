@@ -0,0 +1,60 @@
+"""
+you-get Worker
+Proses yang dipakai ulang untuk banyak URL (dijalankan oleh external_tools, bukan di-import).
+- Request: satu baris JSON per URL di stdin
+  {"op": "info" | "download", "url": ..., "output_dir": ..., "timeout": detik}
+- Balasan: satu baris JSON per request {"ok": true, "result": ...} / {"ok": false, "error": ...}
+- fd 1 diarahkan ke stderr: print you-get/ffmpeg tidak tercampur dengan balasan
+"""
+import io
+import json
+import os
+import socket
+import sys
+from contextlib import redirect_stdout
+
+
+def _first_json_object(text):
+    start = text.find('{')
+    if start < 0:
+        raise Exception("output JSON tidak ditemukan")
+    obj, _ = json.JSONDecoder().raw_decode(text[start:])
+    return obj
+
+
+def _run(common, request):
+    socket.setdefaulttimeout(request.get('timeout') or None)
+    buf = io.StringIO()
+    common.json_output = request['op'] == 'info'
+    try:
+        with redirect_stdout(buf):
+            common.any_download(request['url'], merge=True, info_only=False,
+                                output_dir=request.get('output_dir') or '.')
+    except SystemExit as e:
+        # you-get memanggil sys.exit() saat error
+        raise Exception(f"exit {e.code}: {buf.getvalue()[-300:]}")
+    if request['op'] == 'info':
+        return _first_json_object(buf.getvalue())
+    return None
+
+
+def main():
+    replies = os.fdopen(os.dup(1), 'w', encoding='utf-8')
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+
+    from you_get import common
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            reply = {'ok': True, 'result': _run(common, json.loads(line))}
+        except Exception as e:
+            reply = {'ok': False, 'error': str(e) or type(e).__name__}
+        replies.write(json.dumps(reply) + '\n')
+        replies.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,59 +3,149 @@ YouTube Downloader Backend
 Support: pytube (primary), yt-dlp (fallback)
 """
 import os
-import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
 from pathlib import Path
 
+from .cache import extraction_cache
+from .formats import FormatIndex, mp3_bitrate, ytdlp_format
+from .health import iter_strategies, run_strategies
+from .hedge import run_hedged
+from .listing import PAGE_SIZE, collect_pages, entry_thumbnail, iter_ytdlp_pages, paginate
+from .postprocess import (AUDIO_MP3, AUDIO_ORIGINAL, PIPE_INPUTS, audio_extension, convert_to_mp3,
+                          merge_video_audio, mux_pipes, postprocessor, remux_audio, ytdlp_audio_options)
+from .resume import download_resumable, part_path, partial_registry, stream_resumable
+from .ydl_pool import downloaded_path, ydl_pool
+from .watchdog import retry_stalled, run_watched, watched_ydl
+
 
 class YouTubeDownloader:
+    # Jumlah request metadata playlist yang berjalan paralel
+    PLAYLIST_WORKERS = 8
+    
+    # Fetch Info hedged: fallback dijalankan paralel jika primary lambat (diatur dari config)
+    hedged = False
+    
+    # ffmpeg tidak ditunggu di download(): hasil membawa Future 'postprocess'
+    # (diaktifkan oleh caller yang menanganinya, mis. JobScheduler)
+    defer_postprocess = False
+    
+    # Output audio: AUDIO_MP3 (re-encode) / AUDIO_ORIGINAL (remux tanpa transcode)
+    audio_format = AUDIO_MP3
+    
     def __init__(self):
         self.platform = "YouTube"
     
-    def extract_info(self, url):
-        """Extract informasi video menggunakan pytube (primary)"""
+    def extract_info(self, url, on_batch=None):
+        """Extract informasi video menggunakan pytube (primary)
+        
+        on_batch: callback(list) opsional untuk playlist/channel; menerima
+        entry secara bertahap (entry membawa 'index' posisi di playlist).
+        """
+        cached = extraction_cache.get(self.platform, url)
+        if cached is not None:
+            return cached
+        
+        if self._is_listing_url(url):
+            return self._extract_playlist(url, on_batch)
+        
+        # pytube (primary) / yt-dlp, urutan menyesuaikan kesehatan masing-masing
+        run = run_hedged if self.hedged else run_strategies
+        info = run(self.platform, 'extract', [
+            ('pytube', lambda cancel=None: self._extract_info_pytube(url)),
+            ('yt-dlp', lambda cancel=None: self._extract_info_ytdlp(url)),
+        ])
+        
+        extraction_cache.set(self.platform, url, info)
+        return info
+    
+    def _is_listing_url(self, url):
+        """URL playlist / channel (bukan single video)"""
+        lowered = url.lower()
+        if 'playlist' in lowered:
+            return True
+        return any(marker in lowered for marker in ('/@', '/channel/', '/c/', '/user/'))
+    
+    def _extract_playlist(self, url, on_batch=None):
+        """Extract playlist/channel tanpa batas jumlah video"""
+        header = {}
+        videos, count, complete = collect_pages(self.iter_playlist(url, header=header), on_batch)
+        
+        info = {
+            'type': 'playlist',
+            'title': header.get('title') or 'Playlist',
+            'videos': videos,
+            'count': count,
+            'thumbnail': header.get('thumbnail') or (videos[0]['thumbnail'] if videos else None)
+        }
+        
+        if complete:
+            extraction_cache.set(self.platform, url, info)
+        return info
+    
+    def iter_playlist(self, url, page_size=PAGE_SIZE, header=None, start=0):
+        """Generator batch video dari playlist/channel (yt-dlp lazy, fallback pytube)
+        
+        start: jumlah video awal yang dilewati ('index' tetap posisi di playlist).
+        """
+        yield from iter_strategies(self.platform, 'listing', [
+            ('yt-dlp', lambda: self._iter_playlist_ytdlp(url, page_size, header, start)),
+            ('pytube', lambda: self._iter_playlist_pytube(url, page_size, header, start)),
+        ])
+    
+    def _iter_playlist_ytdlp(self, url, page_size, header, start=0):
+        """Listing flat yt-dlp, dibaca per halaman"""
+        index = start
+        for page in iter_ytdlp_pages(url, page_size, header, start):
+            videos = []
+            for entry in page:
+                videos.append({
+                    'index': index,
+                    'id': entry.get('id'),
+                    'title': entry.get('title', 'Unknown'),
+                    'thumbnail': entry_thumbnail(entry),
+                    'duration': entry.get('duration'),
+                    'channel': entry.get('uploader') or entry.get('channel', 'Unknown'),
+                    'url': entry.get('url') or f"https://www.youtube.com/watch?v={entry.get('id')}"
+                })
+                index += 1
+            yield videos
+    
+    def _iter_playlist_pytube(self, url, page_size, header, start=0):
+        """Listing pytube; metadata tiap video di-resolve paralel
+        
+        Batch dikirim segera setelah video selesai di-resolve (bisa tidak urut,
+        gunakan 'index' untuk urutan playlist).
+        """
         try:
-            return self._extract_info_pytube(url)
-        except Exception as e:
-            print(f"pytube error: {e}, trying yt-dlp...")
-            # Fallback ke yt-dlp
-            return self._extract_info_ytdlp(url)
+            from pytube import Playlist
+        except ImportError:
+            raise Exception("pytube not installed. Install with: pip install pytube")
+        
+        playlist = Playlist(url)
+        if header is not None:
+            header['title'] = playlist.title
+        
+        index = start
+        with ThreadPoolExecutor(max_workers=self.PLAYLIST_WORKERS) as pool:
+            for video_urls in paginate(islice(playlist.url_generator(), start, None), page_size):
+                futures = [pool.submit(self._pytube_playlist_entry, index + i, video_url)
+                           for i, video_url in enumerate(video_urls)]
+                index += len(video_urls)
+                for future in as_completed(futures):
+                    video = future.result()
+                    if video is not None:
+                        yield [video]
     
     def _extract_info_pytube(self, url):
         """Extract info menggunakan pytube - PRIMARY METHOD"""
         try:
-            from pytube import YouTube, Playlist
+            from pytube import YouTube
         except ImportError:
             raise Exception("pytube not installed. Install with: pip install pytube")
         
         try:
-            # Cek apakah playlist
-            if 'playlist' in url.lower() or '/playlist?' in url:
-                try:
-                    playlist = Playlist(url)
-                    videos = []
-                    for video_url in playlist.video_urls[:20]:  # Limit 20 video
-                        try:
-                            yt = YouTube(video_url)
-                            videos.append({
-                                'id': yt.video_id,
-                                'title': yt.title,
-                                'thumbnail': yt.thumbnail_url,
-                                'duration': yt.length,
-                                'channel': yt.author,
-                                'url': video_url
-                            })
-                        except:
-                            pass
-                    
-                    return {
-                        'type': 'playlist',
-                        'title': playlist.title or 'Playlist',
-                        'videos': videos,
-                        'thumbnail': videos[0]['thumbnail'] if videos else None
-                    }
-                except:
-                    pass
-            
             # Single video
             yt = YouTube(url)
             
@@ -70,24 +160,42 @@ class YouTubeDownloader:
                 'channel': yt.author,
                 'view_count': yt.views,
                 'formats': formats,
-                'description': yt.description[:200] if yt.description else ''
+                'description': yt.description[:200] if yt.description else '',
+                '_yt': yt  # dipakai ulang oleh download() agar tidak fetch ulang
             }
         
         except Exception as e:
             raise Exception(f"pytube extraction failed: {str(e)}")
     
+    def _pytube_playlist_entry(self, index, video_url):
+        """Metadata satu video playlist (None jika gagal)"""
+        from pytube import YouTube
+        
+        try:
+            yt = YouTube(video_url)
+            return {
+                'index': index,
+                'id': yt.video_id,
+                'title': yt.title,
+                'thumbnail': yt.thumbnail_url,
+                'duration': yt.length,
+                'channel': yt.author,
+                'url': video_url
+            }
+        except Exception as e:
+            print(f"pytube playlist item error ({video_url}): {e}")
+            return None
+    
     def _extract_info_ytdlp(self, url):
         """Fallback: Extract menggunakan yt-dlp"""
         try:
-            import yt_dlp
-            
             ydl_opts = {
                 'quiet': True,
                 'no_warnings': True,
                 'extract_flat': 'in_playlist'
             }
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with ydl_pool.acquire(ydl_opts) as ydl:
                 info = ydl.extract_info(url, download=False)
                 
                 # Cek apakah playlist
@@ -120,7 +228,8 @@ class YouTubeDownloader:
                         'duration': info.get('duration'),
                         'channel': info.get('uploader', 'Unknown'),
                         'view_count': info.get('view_count', 0),
-                        'formats': self._get_available_formats(info)
+                        'formats': self._get_available_formats(info),
+                        '_ie_result': ydl.sanitize_info(info)  # dipakai ulang oleh download()
                     }
         
         except Exception as e:
@@ -128,251 +237,347 @@ class YouTubeDownloader:
             raise Exception(f"Failed to extract info: {e}")
     
     def _get_pytube_formats(self, yt):
-        """Ambil format dari pytube - semua resolusi"""
-        formats = {
-            'video': [],
-            'audio': ['128kbps']
-        }
+        """Ambil format dari pytube - semua resolusi + estimasi ukuran"""
+        return FormatIndex.from_pytube(yt).summary()
+    
+    def _get_available_formats(self, info):
+        """Ambil format video dan audio yang tersedia dari yt-dlp (+ estimasi ukuran)"""
+        return FormatIndex.from_ytdlp(info).summary()
+    
+    def download(self, url, output_path, quality='720p', download_type='video', 
+                 progress_callback=None, start_time=None, end_time=None, info=None, defer_postprocess=None):
+        """Download video/audio - pytube primary
         
-        # Get all progressive streams (video+audio)
-        progressive_streams = yt.streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc()
+        info: hasil extract_info() untuk url yang sama (opsional). Jika ada,
+        metadata tersebut dipakai ulang sehingga tidak perlu extract ulang.
         
-        for stream in progressive_streams:
-            if stream.resolution and stream.resolution not in formats['video']:
-                formats['video'].append(stream.resolution)
+        defer_postprocess: jika True, langkah ffmpeg (convert/merge/trim) tidak
+        ditunggu; hasil berisi 'postprocess' (Future hasil akhir) sehingga caller
+        bisa langsung download item berikutnya. Default: atribut defer_postprocess.
+        """
+        info = info or {}
+        if defer_postprocess is None:
+            defer_postprocess = self.defer_postprocess
         
-        # Jika tidak ada progressive, get adaptive video streams
-        if not formats['video']:
-            video_streams = yt.streams.filter(adaptive=True, type='video').order_by('resolution').desc()
-            for stream in video_streams:
-                if stream.resolution and stream.resolution not in formats['video']:
-                    formats['video'].append(stream.resolution)
+        trim = start_time is not None or end_time is not None
+        if trim and start_time is not None and end_time is not None and end_time <= start_time:
+            raise Exception("Trim: end time harus lebih besar dari start time")
         
-        # Default jika kosong
-        if not formats['video']:
-            formats['video'] = ['720p', '480p', '360p']
+        def pytube_download():
+            # Jika ada trim request, hanya rentang itu yang didownload
+            if trim:
+                return self._download_pytube_range(url, output_path, quality, download_type, start_time, end_time,
+                                                   progress_callback, yt=info.get('_yt'))
+            
+            result, steps = self._download_pytube(url, output_path, quality, download_type, progress_callback,
+                                                  yt=info.get('_yt'))
+            return self._postprocess(result, steps, defer_postprocess)
         
-        return formats
+        return run_strategies(self.platform, 'download', [
+            ('pytube', pytube_download),
+            ('yt-dlp', lambda: self._download_ytdlp(url, output_path, quality, download_type, progress_callback,
+                                                    ie_result=info.get('_ie_result'),
+                                                    start_time=start_time, end_time=end_time)),
+        ])
     
-    def _get_available_formats(self, info):
-        """Ambil format video dan audio yang tersedia dari yt-dlp"""
-        formats = {
-            'video': [],
-            'audio': []
-        }
+    def _postprocess(self, result, steps, defer=False):
+        """Jalankan langkah ffmpeg (step(result) -> result) di pool post-processing"""
+        if not steps:
+            return result
         
-        for fmt in info.get('formats', []):
-            if fmt.get('vcodec') != 'none' and fmt.get('acodec') != 'none':
-                # Video dengan audio
-                height = fmt.get('height')
-                if height:
-                    label = f"{height}p"
-                    if label not in formats['video']:
-                        formats['video'].append(label)
-            elif fmt.get('acodec') != 'none' and fmt.get('vcodec') == 'none':
-                # Audio only
-                abr = fmt.get('abr')
-                if abr:
-                    label = f"{int(abr)}kbps"
-                    if label not in formats['audio']:
-                        formats['audio'].append(label)
-        
-        # Sort
-        if formats['video']:
-            formats['video'].sort(key=lambda x: int(x.replace('p', '')), reverse=True)
-        else:
-            formats['video'] = ['720p', '480p', '360p']
-            
-        if formats['audio']:
-            formats['audio'].sort(key=lambda x: int(x.replace('kbps', '')), reverse=True)
-        else:
-            formats['audio'] = ['320kbps', '192kbps', '128kbps', '64kbps']
+        def run():
+            final = result
+            for step in steps:
+                final = step(final)
+            return final
         
-        return formats
+        future = postprocessor.submit(run)
+        if defer:
+            return {**result, 'postprocess': future}
+        return future.result()
     
-    def download(self, url, output_path, quality='720p', download_type='video', 
-                 progress_callback=None, start_time=None, end_time=None):
-        """Download video/audio - pytube primary"""
-        try:
-            result = self._download_pytube(url, output_path, quality, download_type, progress_callback)
-            
-            # Jika ada trim request, cut video
-            if start_time is not None or end_time is not None:
-                result = self._trim_video(result['file_path'], start_time, end_time, output_path)
-            
-            return result
-        except Exception as e:
-            print(f"pytube download failed: {e}, trying yt-dlp...")
-            # Fallback ke yt-dlp
-            return self._download_ytdlp(url, output_path, quality, download_type, progress_callback)
+    def _download_stream(self, stream, output_path, progress_callback, filename_prefix='', url=None):
+        """Download satu stream pytube secara resumable (.part + Range request)
+        
+        Jika url diberikan, partial dicatat di registry supaya fallback yt-dlp
+        melanjutkan file .part yang sama (format/itag yang sama).
+        """
+        filename = self._stream_path(stream, output_path, filename_prefix)
+        total = stream.filesize
+        
+        # Sudah lengkap (seperti skip_existing pytube)
+        if os.path.exists(filename) and os.path.getsize(filename) == total:
+            return filename
+        
+        if url:
+            partial_registry.set(self.platform, url, filename, format_id=str(stream.itag))
+        download_resumable(stream.url, filename, total, progress_callback)
+        if url:
+            partial_registry.remove(self.platform, url)
+        return filename
     
-    def _download_pytube(self, url, output_path, quality, download_type, progress_callback):
-        """Download menggunakan pytube - PRIMARY METHOD"""
+    def _stream_path(self, stream, output_path, filename_prefix=''):
+        return os.path.join(output_path, filename_prefix + stream.default_filename)
+    
+    def _select_streams(self, yt, quality, download_type):
+        """Stream pytube termurah yang memenuhi kualitas: [audio], [progressive] atau [video, audio]"""
+        chosen = FormatIndex.from_pytube(yt).pick(download_type, quality)
+        if chosen:
+            return [f['stream'] for f in chosen]
+        return [yt.streams.first()]
+    
+    def _download_pytube(self, url, output_path, quality, download_type, progress_callback, yt=None):
+        """Download menggunakan pytube - PRIMARY METHOD
+        
+        Return (hasil, steps): steps = langkah ffmpeg yang belum dijalankan.
+        """
         try:
             from pytube import YouTube
         except ImportError:
             raise Exception("pytube not installed. Please install: pip install pytube")
         
         try:
-            yt = YouTube(url)
+            if yt is None:
+                yt = YouTube(url)
             
-            if download_type == 'audio':
-                # Audio only
-                stream = yt.streams.filter(only_audio=True).first()
-                if not stream:
-                    stream = yt.streams.get_audio_only()
-                
-                filename = stream.download(output_path=output_path)
+            streams = self._select_streams(yt, quality, download_type)
+            steps = []
+            if len(streams) == 2:
+                video_stream, audio_stream = streams
+                output_file = os.path.join(output_path, f"{yt.title}.mp4")
+                temp_files = [self._stream_path(video_stream, output_path, 'video_'),
+                              self._stream_path(audio_stream, output_path, 'audio_')]
+                # Sisa percobaan sebelumnya (restart / retry): lanjutkan .part lewat file
+                # sementara, bukan streaming ulang dari byte 0
+                resuming = any(os.path.exists(f) or os.path.exists(part_path(f)) for f in temp_files)
                 
-                # Convert to mp3 menggunakan ffmpeg
-                mp3_file = os.path.splitext(filename)[0] + '.mp3'
-                try:
-                    subprocess.run(['ffmpeg', '-i', filename, '-vn', '-ar', '44100', 
-                                  '-ac', '2', '-b:a', '192k', 
-                                  mp3_file, '-y'], 
-                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                                 check=True)
+                if not resuming and self._merge_streaming(video_stream, audio_stream, output_file,
+                                                          progress_callback, temp_files):
+                    filename = output_file
+                else:
+                    # Download both
+                    video_file = self._download_stream(video_stream, output_path, progress_callback,
+                                                       filename_prefix='video_')
+                    audio_file = self._download_stream(audio_stream, output_path, progress_callback,
+                                                       filename_prefix='audio_')
                     
-                    if os.path.exists(mp3_file):
-                        os.remove(filename)
-                        filename = mp3_file
-                except subprocess.CalledProcessError:
-                    # Jika ffmpeg gagal, tetap gunakan file original
-                    pass
+                    # Merge dengan ffmpeg (tahap post-processing)
+                    filename = video_file
+                    steps.append(lambda r: {**r, 'file_path': merge_video_audio(video_file, audio_file,
+                                                                                output_file)})
             else:
-                # Video
-                # Coba progressive (video+audio) dulu
-                stream = yt.streams.filter(progressive=True, resolution=quality, file_extension='mp4').first()
-                
-                if not stream:
-                    # Fallback ke resolusi terdekat
-                    stream = yt.streams.filter(progressive=True, file_extension='mp4').order_by('resolution').desc().first()
+                filename = self._download_stream(streams[0], output_path, progress_callback, url=url)
                 
-                if not stream:
-                    # Last resort: adaptive video + merge dengan audio
-                    video_stream = yt.streams.filter(adaptive=True, resolution=quality, type='video').first()
-                    if not video_stream:
-                        video_stream = yt.streams.filter(adaptive=True, type='video').order_by('resolution').desc().first()
-                    
-                    audio_stream = yt.streams.filter(only_audio=True).first()
-                    
-                    if video_stream and audio_stream:
-                        # Download both
-                        video_file = video_stream.download(output_path=output_path, filename_prefix='video_')
-                        audio_file = audio_stream.download(output_path=output_path, filename_prefix='audio_')
-                        
-                        # Merge dengan ffmpeg
-                        output_file = os.path.join(output_path, f"{yt.title}.mp4")
-                        try:
-                            subprocess.run([
-                                'ffmpeg', '-i', video_file, '-i', audio_file,
-                                '-c:v', 'copy', '-c:a', 'aac', output_file, '-y'
-                            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-                            
-                            # Hapus temp files
-                            os.remove(video_file)
-                            os.remove(audio_file)
-                            filename = output_file
-                        except:
-                            # Jika merge gagal, gunakan video only
-                            filename = video_file
-                            if os.path.exists(audio_file):
-                                os.remove(audio_file)
-                    else:
-                        stream = yt.streams.first()
-                        filename = stream.download(output_path=output_path)
-                else:
-                    filename = stream.download(output_path=output_path)
+                if download_type == 'audio' and self.audio_format == AUDIO_ORIGINAL:
+                    # Remux ke container yang sesuai codec, tanpa transcode
+                    codec = getattr(streams[0], 'audio_codec', None)
+                    steps.append(lambda r: {**r, 'file_path': remux_audio(r['file_path'], codec)})
+                elif download_type == 'audio':
+                    # Convert to mp3 menggunakan ffmpeg (tahap post-processing)
+                    bitrate = mp3_bitrate(quality)
+                    steps.append(lambda r: {**r, 'file_path': convert_to_mp3(r['file_path'], bitrate)})
             
             return {
                 'success': True,
                 'file_path': filename,
                 'title': yt.title,
                 'thumbnail': yt.thumbnail_url
-            }
+            }, steps
         except Exception as e:
             raise Exception(f"pytube download failed: {str(e)}")
     
-    def _trim_video(self, input_file, start_time, end_time, output_path):
-        """Cut/trim video menggunakan ffmpeg"""
-        if not os.path.exists(input_file):
-            raise Exception("Input file not found")
-        
-        # Generate output filename
-        base_name = os.path.splitext(os.path.basename(input_file))[0]
-        ext = os.path.splitext(input_file)[1]
-        output_file = os.path.join(output_path, f"{base_name}_trimmed{ext}")
-        
-        # Build ffmpeg command
-        cmd = ['ffmpeg', '-i', input_file]
-        
-        if start_time is not None:
-            cmd.extend(['-ss', str(start_time)])
-        
-        if end_time is not None:
-            if start_time is not None:
-                duration = end_time - start_time
-                cmd.extend(['-t', str(duration)])
-            else:
-                cmd.extend(['-to', str(end_time)])
+    def _merge_streaming(self, video_stream, audio_stream, output_file, progress_callback, temp_files):
+        """Download video+audio adaptive paralel langsung ke ffmpeg lewat pipe
+        
+        Output di-mux sekali selama download. Data setiap stream juga ditulis ke
+        .part file sementaranya (temp_files: path video_, audio_): jika download
+        berhenti di tengah, percobaan berikutnya melanjutkan .part itu. .part
+        dihapus setelah mux berhasil.
+        Return False jika tidak didukung atau gagal (caller fallback ke file sementara).
+        """
+        if not PIPE_INPUTS:
+            return False
         
-        cmd.extend(['-c', 'copy', output_file, '-y'])
+        total = (video_stream.filesize or 0) + (audio_stream.filesize or 0)
+        done = {}
+        lock = threading.Lock()
         
+        def tracker(key):
+            def report(d):
+                if not progress_callback:
+                    return
+                with lock:
+                    done[key] = d.get('downloaded_bytes') or 0
+                    progress_callback({
+                        'status': 'downloading',
+                        'downloaded_bytes': sum(done.values()),
+                        'total_bytes': total or None,
+                        'filename': output_file,
+                    })
+            return report
+        
+        video_file, audio_file = temp_files
+        writers = [
+            lambda f: stream_resumable(video_stream.url, f, video_stream.filesize, tracker('video'),
+                                       tee_path=part_path(video_file)),
+            lambda f: stream_resumable(audio_stream.url, f, audio_stream.filesize, tracker('audio'),
+                                       tee_path=part_path(audio_file)),
+        ]
         try:
-            subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
-            
-            # Hapus file original jika trim sukses
+            mux_pipes(writers, ['-map', '0:v:0', '-map', '1:a:0', '-c:v', 'copy', '-c:a', 'aac'], output_file)
+        except Exception as e:
+            # .part tetap ada: fallback melanjutkan dari byte terakhir, bukan download ulang
+            print(f"Streaming merge gagal: {e}, fallback ke file sementara...")
             if os.path.exists(output_file):
-                os.remove(input_file)
-                return {
-                    'success': True,
-                    'file_path': output_file,
-                    'title': base_name + '_trimmed',
-                    'thumbnail': None
-                }
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Video trimming failed: {str(e)}")
+                os.remove(output_file)
+            return False
+        
+        for path in temp_files:
+            if os.path.exists(part_path(path)):
+                os.remove(part_path(path))
+        
+        if progress_callback:
+            size = os.path.getsize(output_file)
+            progress_callback({'status': 'finished', 'downloaded_bytes': size, 'total_bytes': size,
+                               'filename': output_file})
+        return True
     
-    def _download_ytdlp(self, url, output_path, quality, download_type, progress_callback):
-        """Fallback: Download menggunakan yt-dlp"""
+    def _download_pytube_range(self, url, output_path, quality, download_type, start_time, end_time,
+                               progress_callback, yt=None):
+        """Trim: hanya rentang start_time..end_time yang diambil dari stream
+        
+        ffmpeg seek langsung di URL stream (HTTP Range), jadi bandwidth dan disk
+        sebanding panjang klip, bukan panjang video.
+        """
+        try:
+            from pytube import YouTube
+        except ImportError:
+            raise Exception("pytube not installed. Please install: pip install pytube")
+        
+        try:
+            if yt is None:
+                yt = YouTube(url)
+            
+            streams = self._select_streams(yt, quality, download_type)
+            base_name = os.path.splitext(streams[0].default_filename)[0]
+            ext = '.mp4'
+            copy_audio = False
+            if download_type == 'audio':
+                ext = '.mp3'
+                if self.audio_format == AUDIO_ORIGINAL:
+                    codec_ext = audio_extension(getattr(streams[0], 'audio_codec', None))
+                    copy_audio = codec_ext is not None
+                    ext = codec_ext or ext
+            output_file = os.path.join(output_path, f"{base_name}_trimmed{ext}")
+            
+            # Input seeking (-ss sebelum -i) per stream; durasi sebagai opsi output
+            cmd = ['ffmpeg', '-nostdin']
+            for stream in streams:
+                if start_time is not None:
+                    cmd.extend(['-ss', str(start_time)])
+                cmd.extend(['-i', stream.url])
+            
+            if end_time is not None:
+                cmd.extend(['-t', str(end_time - (start_time or 0))])
+            
+            if copy_audio:
+                cmd.extend(['-vn', '-c:a', 'copy'])
+            elif download_type == 'audio':
+                cmd.extend(['-vn', '-ar', '44100', '-ac', '2', '-b:a', mp3_bitrate(quality)])
+            elif len(streams) == 2:
+                cmd.extend(['-map', '0:v:0', '-map', '1:a:0', '-c:v', 'copy', '-c:a', 'aac'])
+            else:
+                cmd.extend(['-c', 'copy'])
+            cmd.extend([output_file, '-y'])
+            
+            # ffmpeg yang macet di-kill lalu diulang (klip pendek, tanpa resume)
+            result = retry_stalled(lambda watchdog: run_watched(cmd, output_file, watchdog))
+            if result.returncode != 0 or not os.path.exists(output_file):
+                raise Exception(f"ffmpeg failed: {result.stderr.strip()[-300:]}")
+            
+            if progress_callback:
+                size = os.path.getsize(output_file)
+                progress_callback({'status': 'finished', 'downloaded_bytes': size, 'total_bytes': size,
+                                   'filename': output_file})
+            
+            return {
+                'success': True,
+                'file_path': output_file,
+                'title': base_name + '_trimmed',
+                'thumbnail': yt.thumbnail_url
+            }
+        except Exception as e:
+            raise Exception(f"pytube trim download failed: {str(e)}")
+    
+    def _download_ytdlp(self, url, output_path, quality, download_type, progress_callback, ie_result=None,
+                        start_time=None, end_time=None):
+        """Fallback: Download menggunakan yt-dlp
+        
+        start_time/end_time: hanya rentang itu yang didownload (download sections).
+        """
         import yt_dlp
+        import copy
         
-        output_template = os.path.join(output_path, '%(title)s.%(ext)s')
+        trim = start_time is not None or end_time is not None
+        output_template = os.path.join(output_path, '%(title)s_trimmed.%(ext)s' if trim else '%(title)s.%(ext)s')
         
         # Base options
         base_opts = {
             'outtmpl': output_template,
             'nocheckcertificate': True,
+            'continuedl': True,
         }
         
+        # Format termurah yang memenuhi kualitas (dari hasil Fetch Info), lalu selector lama
         if download_type == 'audio':
             ydl_opts = {
                 **base_opts,
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
+                **ytdlp_audio_options(self.audio_format, mp3_bitrate(quality).rstrip('k')),
             }
+            ydl_opts['format'] = ytdlp_format(ie_result, 'audio', quality, ydl_opts['format'])
         else:
             # Video
             height = quality.replace('p', '')
             ydl_opts = {
                 **base_opts,
-                'format': f'best[height<={height}]',
+                'format': ytdlp_format(ie_result, 'video', quality, f'best[height<={height}]'),
+                'merge_output_format': 'mp4',
             }
         
+        if trim:
+            ydl_opts['download_ranges'] = yt_dlp.utils.download_range_func(
+                None, [(start_time or 0, end_time if end_time is not None else float('inf'))])
+        
+        # Lanjutkan .part dari pytube: format (itag) & path yang sama
+        partial = None if trim else partial_registry.get(self.platform, url)
+        if partial and partial.get('format_id'):
+            if ie_result is None:
+                with ydl_pool.acquire({'quiet': True, 'nocheckcertificate': True}) as ydl:
+                    ie_result = ydl.sanitize_info(ydl.extract_info(url, download=False, process=False))
+            format_ids = {f.get('format_id') for f in (ie_result.get('formats') or [])}
+            if partial['format_id'] in format_ids:
+                ydl_opts['format'] = partial['format_id']
+                ydl_opts['outtmpl'] = partial['path'].replace('%', '%%')
+        
         if progress_callback:
             ydl_opts['progress_hooks'] = [progress_callback]
         
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            filename = ydl.prepare_filename(info)
+        def run(ydl):
+            info = None
+            if ie_result:
+                # Pakai ulang hasil Fetch Info (tanpa extract ulang halaman/player/format)
+                try:
+                    info = ydl.process_ie_result(copy.deepcopy(ie_result), download=True)
+                except yt_dlp.utils.DownloadError as e:
+                    # Biasanya URL media sudah expired -> extract ulang
+                    print(f"Reuse info gagal: {e}, extract ulang...")
+            if info is None:
+                info = ydl.extract_info(url, download=True)
+            # Path setelah postprocessor (ekstensi audio mengikuti mp3/codec asli)
+            filename = downloaded_path(ydl, info)
             
-            # Untuk audio, ganti ekstensi ke mp3
-            if download_type == 'audio':
-                filename = os.path.splitext(filename)[0] + '.mp3'
+            if partial:
+                partial_registry.remove(self.platform, url)
             
             return {
                 'success': True,
@@ -380,22 +585,5 @@ class YouTubeDownloader:
                 'title': info.get('title', 'Unknown'),
                 'thumbnail': info.get('thumbnail')
             }
-    
-    def download_playlist(self, urls, output_path, quality='720p', download_type='video',
-                         progress_callback=None):
-        """Download multiple videos dari playlist"""
-        results = []
-        
-        for i, url in enumerate(urls):
-            try:
-                if progress_callback:
-                    progress_callback({'status': 'downloading', 'current': i + 1, 'total': len(urls)})
-                
-                result = self.download(url, output_path, quality, download_type, None)
-                results.append(result)
-            
-            except Exception as e:
-                print(f"Error downloading {url}: {e}")
-                results.append({'success': False, 'error': str(e), 'url': url})
         
-        return results
\ No newline at end of file
+        return watched_ydl(ydl_opts, run)
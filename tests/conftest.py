@@ -0,0 +1,14 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Database aplikasi (utils.db) di folder sementara"""
+    from utils import db
+    monkeypatch.setattr(db, 'DATA_DIR', tmp_path)
+    return tmp_path
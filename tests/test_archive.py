@@ -0,0 +1,31 @@
+from utils.archive import DownloadArchive, media_id_from_url
+
+
+def test_pattern_ids():
+    assert media_id_from_url('YouTube', 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1') == 'dQw4w9WgXcQ'
+    assert media_id_from_url('Instagram', 'https://www.instagram.com/reel/Cx1_ab/?igsh=x') == 'Cx1_ab'
+
+
+def test_fallback_keeps_query_params():
+    a = media_id_from_url('YouTube', 'https://www.youtube.com/playlist?list=PLaaa')
+    b = media_id_from_url('YouTube', 'https://www.youtube.com/playlist?list=PLbbb')
+    assert a == 'youtube.com/playlist?list=PLaaa'
+    assert a != b
+
+
+def test_fallback_query_order_and_tracking_ignored():
+    a = media_id_from_url('Facebook', 'https://facebook.com/photo.php?fbid=1&set=a.2&utm_source=x')
+    b = media_id_from_url('Facebook', 'https://www.facebook.com/photo.php/?set=a.2&fbid=1&fbclid=abc')
+    assert a == b == 'facebook.com/photo.php?fbid=1&set=a.2'
+
+
+def test_fallback_without_query():
+    assert media_id_from_url('TikTok', 'https://www.tiktok.com/@user/') == 'tiktok.com/@user'
+
+
+def test_playlists_do_not_collide_in_archive(data_dir):
+    archive = DownloadArchive()
+    archive.add('YouTube', 'https://www.youtube.com/playlist?list=PLaaa', '/tmp/a', 'A')
+
+    assert archive.contains('YouTube', 'https://youtube.com/playlist?list=PLaaa&si=share')
+    assert not archive.contains('YouTube', 'https://www.youtube.com/playlist?list=PLbbb')
@@ -0,0 +1,29 @@
+from backend.cache import ExtractionCache
+
+URL = 'https://www.youtube.com/watch?v=dQw4w9WgXcQ'
+
+
+def test_hits_are_copies(tmp_path):
+    cache = ExtractionCache(cache_dir=tmp_path)
+    value = {'title': 'a', '_yt': object()}
+    cache.set('YouTube', URL, value)
+    value['title'] = 'changed after set'
+
+    first = cache.get('YouTube', URL)
+    first['title'] = 'changed by caller'
+    first['postprocess'] = 'added by caller'
+
+    second = cache.get('YouTube', URL)
+    assert second['title'] == 'a'
+    assert 'postprocess' not in second
+    assert second['_yt'] is value['_yt']
+
+
+def test_disk_hits_are_copies(tmp_path):
+    ExtractionCache(cache_dir=tmp_path).set('YouTube', URL, {'title': 'a', '_yt': object()})
+    cache = ExtractionCache(cache_dir=tmp_path)
+
+    first = cache.get('YouTube', URL)
+    assert first == {'title': 'a'}
+    first['title'] = 'changed by caller'
+    assert cache.get('YouTube', URL)['title'] == 'a'
@@ -0,0 +1,80 @@
+import json
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from backend import external_tools
+from backend.external_tools import iter_json_values, iter_process_lines
+
+
+def lines_of(text):
+    return text.splitlines(keepends=True)
+
+
+def test_json_lines():
+    text = '{"a": 1}\n[3, {"b": 2}]\n"x"\n'
+    assert list(iter_json_values(lines_of(text))) == [{'a': 1}, [3, {'b': 2}], 'x']
+
+
+def test_pretty_array_yields_elements():
+    data = [[3, 'https://example.com/1', {'id': 1}], [3, 'https://example.com/2', {'id': 2}]]
+    assert list(iter_json_values(lines_of(json.dumps(data, indent=2)))) == data
+
+
+def test_brackets_and_escapes_inside_strings():
+    data = [{'title': 'a ] b } c [ {', 'q': 'say \\"hi\\" ['}, {'title': '"]'}]
+    assert list(iter_json_values(lines_of(json.dumps(data, indent=4)))) == data
+
+
+def test_value_yielded_before_stream_ends():
+    def stream():
+        yield '[\n'
+        yield '  {"id": 1},\n'
+        raise AssertionError("elemen pertama harus sudah di-yield")
+
+    assert next(iter_json_values(stream())) == {'id': 1}
+
+
+def test_closing_early_stops_reader_thread():
+    before = threading.active_count()
+    cmd = [sys.executable, '-c', 'import sys\nfor i in range(100000): sys.stdout.write("%d\\n" % i)']
+    lines = iter_process_lines(cmd)
+    assert next(lines) == '0\n'
+    time.sleep(0.5)  # reader mengisi queue sampai penuh
+    lines.close()
+
+    deadline = time.monotonic() + 5
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert threading.active_count() == before
+
+
+@pytest.fixture
+def hanging_url():
+    """URL yang menerima koneksi tapi tidak pernah membalas"""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(5)
+    yield f'http://127.0.0.1:{server.getsockname()[1]}/video'
+    server.close()
+
+
+def test_youget_worker_reused_and_replaced_after_stall(hanging_url, monkeypatch):
+    pytest.importorskip('you_get')
+    monkeypatch.setattr(external_tools, 'YOUGET_INFO_TIMEOUT', 1)
+    monkeypatch.setattr(external_tools, '_youget_idle', [])
+
+    with pytest.raises(Exception, match='tidak selesai'):
+        external_tools.youget_info(hanging_url)
+    assert external_tools._youget_idle == []  # worker macet di-kill, tidak dipakai ulang
+
+    with pytest.raises(Exception, match='you-get failed'):
+        external_tools.youget_info('http://127.0.0.1:1/video')
+    worker, = external_tools._youget_idle
+    with pytest.raises(Exception, match='you-get failed'):
+        external_tools.youget_info('http://127.0.0.1:1/other')
+    assert external_tools._youget_idle == [worker]
+    worker.kill()
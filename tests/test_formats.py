@@ -0,0 +1,112 @@
+from backend.formats import FormatIndex, format_size, mp3_bitrate, ytdlp_format
+
+
+def video(format_id, height, size, acodec='none', tbr=None):
+    return {'format_id': format_id, 'height': height, 'vcodec': 'avc1', 'acodec': acodec,
+            'ext': 'mp4', 'filesize': size, 'tbr': tbr}
+
+
+def audio(format_id, abr, size):
+    return {'format_id': format_id, 'vcodec': 'none', 'acodec': 'mp4a', 'abr': abr,
+            'ext': 'm4a', 'filesize': size}
+
+
+def info(*formats, duration=None):
+    return {'formats': list(formats), 'duration': duration}
+
+
+def ids(chosen):
+    return [f['id'] for f in chosen]
+
+
+def test_lowest_height_at_or_above_target():
+    index = FormatIndex.from_ytdlp(info(
+        video('360', 360, 1_000), video('720', 720, 5_000), video('1080', 1080, 9_000),
+        audio('140', 128, 500),
+    ))
+    assert ids(index.pick_video('720p')) == ['720', '140']
+    assert ids(index.pick_video('480p')) == ['720', '140']
+
+
+def test_highest_height_when_target_unavailable():
+    index = FormatIndex.from_ytdlp(info(video('360', 360, 1_000), video('720', 720, 5_000),
+                                        audio('140', 128, 500)))
+    assert ids(index.pick_video('2160p')) == ['720', '140']
+
+
+def test_progressive_wins_tie_with_adaptive():
+    index = FormatIndex.from_ytdlp(info(
+        video('22', 720, 5_500, acodec='mp4a'), video('136', 720, 5_000), audio('140', 128, 500),
+    ))
+    assert ids(index.pick_video('720p')) == ['22']
+
+
+def test_cheaper_adaptive_beats_progressive():
+    index = FormatIndex.from_ytdlp(info(
+        video('22', 720, 8_000, acodec='mp4a'), video('136', 720, 5_000), audio('140', 128, 500),
+    ))
+    assert ids(index.pick_video('720p')) == ['136', '140']
+
+
+def test_unknown_size_is_picked_last():
+    index = FormatIndex.from_ytdlp(info(
+        video('22', 720, None, acodec='mp4a'), video('136', 720, 50_000), audio('140', 128, 500),
+    ))
+    assert ids(index.pick_video('720p')) == ['136', '140']
+    assert index.estimate('video', '720p') == 50_500
+
+
+def test_estimate_none_when_size_unknown():
+    index = FormatIndex.from_ytdlp(info(video('22', 720, None, acodec='mp4a')))
+    assert index.estimate('video', '720p') is None
+
+
+def test_size_from_tbr_and_duration():
+    index = FormatIndex.from_ytdlp(info(video('22', 720, None, acodec='mp4a', tbr=800), duration=10))
+    assert index.estimate('video', '720p') == 1_000_000
+
+
+def test_abr_tolerance_accepts_slightly_lower_bitrate():
+    index = FormatIndex.from_ytdlp(info(audio('140', 125, 1_000), audio('251', 160, 1_200)))
+    assert index.pick_audio('128kbps')['id'] == '140'
+
+
+def test_abr_prefers_smaller_file_among_equivalent_bitrates():
+    index = FormatIndex.from_ytdlp(info(audio('140', 129, 1_300), audio('251', 128, 1_000),
+                                        audio('256', 192, 1_500)))
+    assert index.pick_audio('128kbps')['id'] == '251'
+
+
+def test_abr_below_tolerance_falls_back_to_highest():
+    index = FormatIndex.from_ytdlp(info(audio('139', 48, 300), audio('140', 110, 700)))
+    assert index.pick_audio('128kbps')['id'] == '140'
+    assert index.pick_audio('320kbps')['id'] == '140'
+
+
+def test_summary_labels_and_sizes():
+    index = FormatIndex.from_ytdlp(info(video('136', 720, 5_000), video('135', 480, 3_000),
+                                        audio('140', 128, 500)))
+    summary = index.summary()
+    assert summary['video'] == ['720p', '480p']
+    assert summary['audio'] == ['128kbps']
+    assert summary['sizes']['video'] == {'720p': 5_500, '480p': 3_500}
+    assert summary['sizes']['audio'] == {'128kbps': 500}
+
+
+def test_ytdlp_format_chosen_ids_then_fallback():
+    data = info(video('136', 720, 5_000), audio('140', 128, 500))
+    assert ytdlp_format(data, 'video', '720p', 'best') == '136+140/best'
+    assert ytdlp_format(data, 'audio', '128kbps', 'bestaudio') == '140/bestaudio'
+
+
+def test_ytdlp_format_fallback_only():
+    assert ytdlp_format(None, 'video', '720p', 'best[height<=720]') == 'best[height<=720]'
+    assert ytdlp_format(info(), 'video', '720p', 'best') == 'best'
+
+
+def test_labels():
+    assert format_size(1536) == '~2 KB'
+    assert format_size(5 * 1024 * 1024) == '~5.0 MB'
+    assert format_size(None) == ''
+    assert mp3_bitrate('128kbps') == '128k'
+    assert mp3_bitrate(None) == '192k'
@@ -0,0 +1,24 @@
+from backend.health import HealthTracker
+
+
+def test_download_ranked_by_success_rate_only(tmp_path):
+    tracker = HealthTracker(tmp_path / 'health.json')
+    # Download besar via yt-dlp (lama tapi berhasil) vs strategi cepat yang sering gagal
+    for _ in range(3):
+        tracker.record('YouTube', 'download', 'yt-dlp', True, 300.0)
+    tracker.record('YouTube', 'download', 'pytube', True, 2.0)
+    tracker.record('YouTube', 'download', 'pytube', False, 1.0)
+
+    assert 'latency' not in tracker.get('YouTube', 'download', 'yt-dlp')
+    active, _ = tracker.order('YouTube', 'download', ['pytube', 'yt-dlp'])
+    assert active == ['yt-dlp', 'pytube']
+
+
+def test_info_ranked_by_latency_and_success(tmp_path):
+    tracker = HealthTracker(tmp_path / 'health.json')
+    tracker.record('YouTube', 'info', 'yt-dlp', True, 4.0)
+    tracker.record('YouTube', 'info', 'pytube', True, 1.0)
+
+    assert tracker.get('YouTube', 'info', 'pytube')['latency'] == 1.0
+    active, _ = tracker.order('YouTube', 'info', ['yt-dlp', 'pytube'])
+    assert active == ['pytube', 'yt-dlp']
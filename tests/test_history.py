@@ -0,0 +1,110 @@
+import json
+
+import pytest
+
+from utils.history import HistoryManager, quality_label
+
+
+def entry(title, platform='YouTube', timestamp='2024-05-10T12:00:00', url='https://example.com/v', quality='720p'):
+    return {'title': title, 'platform': platform, 'timestamp': timestamp, 'url': url, 'quality': quality}
+
+
+@pytest.fixture(params=[True, False], ids=['fts', 'like'])
+def history(request, data_dir):
+    manager = HistoryManager()
+    if not request.param:
+        manager.fts = False
+    return manager
+
+
+def titles(rows):
+    return [row['title'] for row in rows]
+
+
+def test_search_matches_words_and_prefix_of_last_word(history):
+    history.add_entries([entry('python tutorial'), entry('music video'), entry('python music')])
+    assert titles(history.search('python')) == ['python music', 'python tutorial']
+    assert titles(history.search('python mus')) == ['python music']
+
+
+def test_search_covers_url_quality_platform_and_date(history):
+    history.add_entries([
+        entry('a', url='https://www.tiktok.com/@x/video/1', platform='TikTok', quality='1080p',
+              timestamp='2023-01-02T10:00:00'),
+        entry('b'),
+    ])
+    assert titles(history.search('tiktok.com')) == ['a']
+    assert titles(history.search('1080p')) == ['a']
+    assert titles(history.search('TikTok')) == ['a']
+    assert titles(history.search('2023-01')) == ['a']
+
+
+def test_search_by_download_quality(history):
+    history.add_entries([
+        entry('clip', quality=quality_label('720p', 'video')),
+        entry('song', quality=quality_label('128kbps', 'audio')),
+        entry('post', quality=quality_label(None, 'video')),
+    ])
+    assert titles(history.search('720p')) == ['clip']
+    assert titles(history.search('128kbps')) == ['song']
+    assert titles(history.search('audio')) == ['song']
+    assert history.search('post')[0]['quality'] is None
+
+
+def test_search_tokenizes_like_fts(data_dir):
+    history = HistoryManager()
+    history.add_entries([entry('Café au lait'), entry('my_video clip')])
+    assert titles(history.search('cafe')) == ['Café au lait']
+    assert titles(history.search('my vid')) == ['my_video clip']
+
+
+def test_platform_and_date_facets(history):
+    history.add_entries([
+        entry('music a', platform='TikTok', timestamp='2024-03-01T08:00:00'),
+        entry('music b', platform='YouTube', timestamp='2024-03-15T08:00:00'),
+        entry('music c', platform='TikTok', timestamp='2024-03-31T23:59:00'),
+        entry('music d', platform='TikTok', timestamp='2024-04-01T00:00:00'),
+    ])
+    assert titles(history.search('music', platform='TikTok')) == ['music d', 'music c', 'music a']
+    assert titles(history.search('music', platform='TikTok', date_from='2024-03-01', date_to='2024-03-31')) == [
+        'music c', 'music a']
+    assert titles(history.search(platform='YouTube')) == ['music b']
+    assert titles(history.search('music', date_from='2024-05-01')) == []
+
+
+def test_search_pages_and_ids(history):
+    added = history.add_entries([entry(f'clip {i}', timestamp=f'2024-01-{i + 1:02d}T00:00:00') for i in range(5)])
+    assert titles(history.search('clip', limit=2)) == ['clip 4', 'clip 3']
+    assert titles(history.search('clip', limit=2, offset=2)) == ['clip 2', 'clip 1']
+    ids = [row['id'] for row in added]
+    assert titles(history.search('clip', ids=ids[:2])) == ['clip 1', 'clip 0']
+    assert history.search('clip', ids=[]) == []
+
+
+def test_deleted_entries_leave_search_index(data_dir):
+    history = HistoryManager()
+    added = history.add_entries([entry('keep me'), entry('drop me')])
+    history.delete_entries([added[1]['id']])
+    assert titles(history.search('me')) == ['keep me']
+    history.clear_history()
+    assert history.search('keep') == []
+
+
+def test_migrated_history_has_one_order(data_dir, monkeypatch):
+    from utils import history as history_module
+    monkeypatch.setattr(history_module, 'DATA_DIR', data_dir)
+    # history.json lama: terbaru di depan, tapi tidak selalu urut waktu
+    (data_dir / 'history.json').write_text(json.dumps([
+        entry('clip b', timestamp='2024-03-02T08:00:00'),
+        entry('clip c', timestamp='2024-03-03T08:00:00'),
+        entry('clip a', timestamp='2024-03-01T08:00:00'),
+    ]))
+    expected = ['clip c', 'clip b', 'clip a']
+
+    for fts in (True, False):
+        manager = HistoryManager()
+        manager.fts = fts
+        assert titles(manager.get_history()) == expected
+        assert titles(manager.search()) == expected
+        assert titles(manager.search('clip')) == expected
+        assert titles(manager.search('c')) == expected
@@ -0,0 +1,72 @@
+import pytest
+
+from utils import job_queue
+from utils.job_queue import DONE, FAILED, PENDING, JobQueue, JobScheduler, retry_delay
+
+
+@pytest.fixture
+def queue(data_dir):
+    return JobQueue()
+
+
+def test_retry_delay_grows_and_is_capped():
+    assert [retry_delay(n) for n in (1, 2, 3)] == [10, 20, 40]
+    assert retry_delay(20) == job_queue.RETRY_DELAY_MAX
+
+
+def test_failed_job_waits_before_next_claim(queue):
+    job_id = queue.enqueue('YouTube', 'https://example.com/a', '/tmp')
+    job = queue.claim_next('YouTube')
+    queue.mark_failed(job['id'], 'boom', retry=True, delay=60)
+
+    assert queue.get_job(job_id)['state'] == PENDING
+    assert queue.claim_next('YouTube') is None
+    assert 55 < queue.next_retry_in('YouTube') <= 60
+
+    queue.mark_failed(job_id, 'boom', retry=True, delay=0)
+    assert queue.claim_next('YouTube')['id'] == job_id
+
+
+def test_next_retry_in_without_pending(queue):
+    assert queue.next_retry_in('YouTube') is None
+
+
+def test_clear_finished_keeps_pending(queue):
+    done, failed, pending = queue.enqueue_many('YouTube', ['a', 'b', 'c'], '/tmp')
+    queue.mark_done(done)
+    queue.mark_failed(failed, 'boom')
+
+    assert queue.clear_finished() == 2
+    assert [j['id'] for j in queue.get_jobs()] == [pending]
+
+
+def test_scheduler_retries_after_backoff(queue, monkeypatch):
+    monkeypatch.setattr(job_queue, 'retry_delay', lambda attempts: 0.2)
+    queue.enqueue('YouTube', 'https://example.com/a', '/tmp', '720p', 'video')
+    calls = []
+
+    def run_job(job):
+        calls.append(job['attempts'])
+        if len(calls) == 1:
+            raise Exception('network')
+        return {'success': True}
+
+    results = JobScheduler(queue, 'YouTube', run_job).run()
+
+    assert calls == [1, 2]
+    assert results[0]['success']
+    assert (results[0]['quality'], results[0]['download_type']) == ('720p', 'video')
+    assert queue.get_jobs(states=[DONE])
+
+
+def test_scheduler_gives_up_after_max_attempts(queue, monkeypatch):
+    monkeypatch.setattr(job_queue, 'retry_delay', lambda attempts: 0)
+    job_id = queue.enqueue('YouTube', 'https://example.com/a', '/tmp')
+
+    def run_job(job):
+        raise Exception('gone')
+
+    results = JobScheduler(queue, 'YouTube', run_job, max_attempts=2).run()
+
+    assert not results[0]['success']
+    assert queue.get_job(job_id)['state'] == FAILED
@@ -0,0 +1,109 @@
+from utils.subscriptions import PROFILE, SubscriptionStore, _scan_newest_first, sync_subscription
+
+
+class FakeDownloader:
+    def __init__(self, posts):
+        self.posts = posts
+
+    def iter_user_posts(self, username, page_size=10):
+        for i in range(0, len(self.posts), page_size):
+            yield self.posts[i:i + page_size]
+
+
+class FakeQueue:
+    def __init__(self):
+        self.urls = []
+
+    def enqueue_many(self, platform, urls, output_path, quality, download_type, priority=None):
+        self.urls.extend(urls)
+
+
+def post(post_id, pinned=False):
+    item = {'id': post_id, 'url': f'https://example.com/{post_id}'}
+    if pinned:
+        item['pinned'] = True
+    return item
+
+
+def pages(posts, size=10):
+    return (posts[i:i + size] for i in range(0, len(posts), size))
+
+
+def test_scan_stops_at_first_known_id():
+    posts = [post(i) for i in ('n2', 'n1', 'a', 'b', 'c', 'd')]
+    new, seen, found = _scan_newest_first(pages(posts), ['a', 'b', 'c', 'd'], 200)
+    assert found
+    assert [p['id'] for p in new] == ['n2', 'n1']
+    assert seen == ['n2', 'n1', 'a', 'b']
+
+
+def test_scan_skips_pinned_known_posts_at_top():
+    posts = [post('pin1'), post('pin2'), post('new'), post('a'), post('b')]
+    new, _, found = _scan_newest_first(pages(posts), ['pin1', 'pin2', 'a', 'b'], 200)
+    assert found
+    assert [p['id'] for p in new] == ['new']
+
+
+def test_scan_skips_posts_flagged_pinned():
+    posts = [post('old', pinned=True), post('new'), post('a'), post('b'), post('c'), post('d')]
+    new, _, _ = _scan_newest_first(pages(posts), ['a', 'b', 'c', 'd'], 200)
+    assert [p['id'] for p in new] == ['new']
+
+
+def test_scan_without_known_id_reports_not_found():
+    posts = [post(i) for i in range(20)]
+    new, _, found = _scan_newest_first(pages(posts), ['gone'], 5)
+    assert not found
+    assert len(new) == 5
+
+
+def test_pinned_profile_picks_up_new_posts(data_dir):
+    store = SubscriptionStore()
+    pinned = post('pinned')
+    old = [post(f'old{i}') for i in range(5)]
+    sub_id = store.subscribe('TikTok', 'creator', PROFILE,
+                             known_ids=[p['id'] for p in [pinned] + old], cursor_id='pinned', cursor_count=6)
+
+    queue = FakeQueue()
+    downloader = FakeDownloader([pinned, post('new2'), post('new1')] + old)
+    assert sync_subscription(store, store.get('TikTok', 'creator'), downloader, queue) == 2
+    assert queue.urls == ['https://example.com/new1', 'https://example.com/new2']
+
+    # Sync berikutnya tanpa post baru: tidak ada yang masuk antrian lagi
+    queue = FakeQueue()
+    assert sync_subscription(store, store.get('TikTok', 'creator'), downloader, queue) == 0
+    assert store.get('TikTok', 'creator')['known_ids'][:3] == ['pinned', 'new2', 'new1']
+    assert store.get_all()[0]['id'] == sub_id
+
+
+def test_deleted_cursor_post_does_not_requeue_old_posts(data_dir):
+    store = SubscriptionStore()
+    old = [post(f'old{i}') for i in range(30)]
+    store.subscribe('Instagram', 'creator', PROFILE, known_ids=['deleted'] + [p['id'] for p in old],
+                    cursor_id='deleted', cursor_count=31)
+
+    queue = FakeQueue()
+    downloader = FakeDownloader([post('new')] + old)
+    assert sync_subscription(store, store.get('Instagram', 'creator'), downloader, queue) == 1
+    assert queue.urls == ['https://example.com/new']
+
+
+def test_cursor_not_found_resets_instead_of_queueing_history(data_dir):
+    store = SubscriptionStore()
+    store.subscribe('TikTok', 'creator', PROFILE, known_ids=['gone'], cursor_id='gone', cursor_count=1)
+
+    queue = FakeQueue()
+    downloader = FakeDownloader([post(i) for i in range(300)])
+    assert sync_subscription(store, store.get('TikTok', 'creator'), downloader, queue, max_scan=50) == 0
+    assert queue.urls == []
+    assert store.get('TikTok', 'creator')['known_ids'][0] == 0
+
+
+def test_first_sync_only_records_known_ids(data_dir):
+    store = SubscriptionStore()
+    store.subscribe('TikTok', 'creator', PROFILE)
+
+    queue = FakeQueue()
+    downloader = FakeDownloader([post(i) for i in range(25)])
+    assert sync_subscription(store, store.get('TikTok', 'creator'), downloader, queue) == 0
+    assert store.get('TikTok', 'creator')['known_ids'] == list(range(10))
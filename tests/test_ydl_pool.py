@@ -0,0 +1,50 @@
+import pytest
+
+from backend.ydl_pool import YDLPool
+
+yt_dlp = pytest.importorskip('yt_dlp')
+
+
+@pytest.fixture
+def pool():
+    pool = YDLPool()
+    yield pool
+    pool.close_all()
+
+
+BASE = {'quiet': True, 'no_warnings': True}
+
+
+def test_per_download_options_share_one_instance(pool):
+    ranges = yt_dlp.utils.download_range_func(None, [(0, 10)])
+    with pool.acquire({**BASE, 'format': '136+140/best', 'outtmpl': '/tmp/a/%(title)s.%(ext)s',
+                       'download_ranges': ranges, 'progress_hooks': [print]}) as first:
+        assert first.params['outtmpl']['default'] == '/tmp/a/%(title)s.%(ext)s'
+        assert first.params['download_ranges'] is ranges
+        assert first.format_selector is not None
+
+    with pool.acquire({**BASE, 'format': '22/best', 'outtmpl': '/tmp/b/%(id)s.%(ext)s',
+                       'download_ranges': yt_dlp.utils.download_range_func(None, [(5, 9)])}) as second:
+        assert second is first
+        assert second.params['outtmpl']['default'] == '/tmp/b/%(id)s.%(ext)s'
+
+
+def test_options_restored_on_release(pool):
+    with pool.acquire({**BASE, 'format': '22', 'outtmpl': '/tmp/x.%(ext)s',
+                       'download_ranges': lambda info, ydl: []}) as ydl:
+        pass
+    with pool.acquire(BASE) as again:
+        assert again is ydl
+        assert 'download_ranges' not in again.params
+        assert 'format' not in again.params
+        assert again.format_selector is None
+        assert again.params['outtmpl']['default'] != '/tmp/x.%(ext)s'
+
+
+def test_unserializable_options_are_not_pooled(pool):
+    logger = object()
+    with pool.acquire({**BASE, 'logger': logger}) as first:
+        pass
+    with pool.acquire({**BASE, 'logger': logger}) as second:
+        assert second is not first
+    assert not pool._idle
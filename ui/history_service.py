@@ -0,0 +1,63 @@
+"""
+History Service
+Satu HistoryManager bersama untuk semua PlatformWidget dan tab History.
+- Setiap perubahan dikirim sebagai delta lewat signal Qt (entry baru / id terhapus / clear),
+  jadi view cukup menerapkan delta itu tanpa membaca ulang histori
+- Baca (get_history / search / count) langsung diteruskan ke HistoryManager
+"""
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from utils import HistoryManager
+
+
+class HistoryService(QObject):
+    entries_added = pyqtSignal(list)    # entry baru (dengan id), terbaru dulu
+    entries_removed = pyqtSignal(list)  # id entry yang dihapus
+    cleared = pyqtSignal()
+
+    def __init__(self, manager=None, parent=None):
+        super().__init__(parent)
+        self.manager = manager if manager is not None else HistoryManager()
+
+    def add_entries(self, entries):
+        """Simpan entry (satu transaksi) lalu emit entries_added; return entry tersimpan"""
+        added = self.manager.add_entries(entries)
+        if added:
+            self.entries_added.emit(added[::-1])
+        return added
+
+    def add_entry(self, platform, title, url, file_path, thumbnail=None,
+                  duration=None, item_count=1, quality=None):
+        return self.add_entries([{
+            'platform': platform,
+            'title': title,
+            'url': url,
+            'file_path': file_path,
+            'thumbnail': thumbnail,
+            'duration': duration,
+            'item_count': item_count,
+            'quality': quality
+        }])
+
+    def delete_entries(self, entry_ids):
+        removed = self.manager.delete_entries(entry_ids)
+        if removed:
+            self.entries_removed.emit(removed)
+        return removed
+
+    def clear_history(self):
+        self.manager.clear_history()
+        self.cleared.emit()
+
+    def get_history(self, limit=None, offset=0):
+        return self.manager.get_history(limit, offset)
+
+    def search(self, query=None, platform=None, date_from=None, date_to=None, limit=None, offset=0,
+               ids=None):
+        return self.manager.search(query, platform, date_from, date_to, limit, offset, ids)
+
+    def platforms(self):
+        return self.manager.platforms()
+
+    def count(self):
+        return self.manager.count()
@@ -1,227 +1,469 @@
 """
 History Widget - Menampilkan riwayat download
+- Model/view (QListView + delegate): hanya baris yang terlihat yang di-paint,
+  tidak ada widget per entry
+- Histori dibaca per halaman (fetchMore) saat di-scroll, bukan sekaligus
+- Thumbnail diminta saat baris pertama kali di-paint (terlihat), lewat
+  ThumbnailService bersama (cache memory + disk: scroll ulang tanpa network)
+- Download selesai / hapus entry: model menerapkan delta dari HistoryService
+  (insert di atas / remove baris), tanpa reload
+- Search box (full-text judul/URL/platform/kualitas/tanggal) + filter platform
+  dan rentang tanggal; query dijalankan di database per halaman
 """
-from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QScrollArea, 
-                             QLabel, QPushButton, QFrame, QGridLayout, QMessageBox)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
-from PyQt5.QtNetwork import QNetworkAccessManager, QNetworkRequest
-from PyQt5.QtCore import QUrl
 import os
-from datetime import datetime
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
 
-from utils import HistoryManager
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QMessageBox, QListView, QMenu, QStyle, QStyledItemDelegate,
+                             QStyleOptionViewItem, QApplication, QLineEdit, QComboBox)
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, QTimer
+from PyQt5.QtGui import QColor, QFont, QPixmap, QPen
 
+from .history_service import HistoryService
+from .thumbnail_service import ThumbnailService
+
+
+# Entry yang dibaca dari database per fetchMore
+PAGE_SIZE = 100
+
+ROW_HEIGHT = 110
+THUMB_WIDTH = 120
+THUMB_HEIGHT = 90
+
+# Pixmap thumbnail ukuran baris yang disimpan (LRU, ~40 KB per thumbnail)
+THUMB_CACHE = 300
+
+# Jeda setelah mengetik sebelum search dijalankan
+SEARCH_DELAY_MS = 100
+
+# Filter tanggal: (label, jumlah hari ke belakang selain hari ini; None = semua)
+DATE_RANGES = [
+    ("Semua waktu", None),
+    ("Hari ini", 0),
+    ("7 hari terakhir", 6),
+    ("30 hari terakhir", 29),
+    ("1 tahun terakhir", 364),
+]
+
+EntryRole = Qt.UserRole
+ThumbnailRole = Qt.UserRole + 1
+
+
+def format_date(timestamp):
+    try:
+        return datetime.fromisoformat(timestamp).strftime("%d %b %Y, %H:%M")
+    except (TypeError, ValueError):
+        return "Unknown date"
+
+
+def format_details(entry):
+    """Durasi / jumlah item / kualitas untuk baris detail"""
+    details = []
+    if entry.get('duration'):
+        minutes, seconds = divmod(int(entry['duration']), 60)
+        details.append(f"⏱️ {minutes}:{seconds:02d}")
+
+    item_count = entry.get('item_count') or 1
+    if item_count > 1:
+        details.append(f"📦 {item_count} items")
+
+    if entry.get('quality'):
+        details.append(f"🎥 {entry['quality']}")
+    return " | ".join(details)
+
+
+def open_file(entry, parent=None):
+    """Buka file yang didownload"""
+    file_path = entry.get('file_path', '')
+    if file_path and os.path.exists(file_path):
+        os.startfile(file_path) if os.name == 'nt' else os.system(f'xdg-open "{file_path}"')
+    else:
+        QMessageBox.warning(parent, "Error", "File tidak ditemukan")
+
+
+def open_folder(entry, parent=None):
+    """Buka folder tempat file disimpan"""
+    file_path = entry.get('file_path', '')
+    if file_path:
+        folder = os.path.dirname(file_path)
+        if os.path.exists(folder):
+            os.startfile(folder) if os.name == 'nt' else os.system(f'xdg-open "{folder}"')
+        else:
+            QMessageBox.warning(parent, "Error", "Folder tidak ditemukan")
+
+
+class HistoryModel(QAbstractListModel):
+    """Entry histori (terbaru dulu), dimuat per halaman dari HistoryService"""
+
+    def __init__(self, history, thumbnails, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self.entries = []
+        self.filters = {}  # argumen search(): query, platform, date_from, date_to
+        self._more = True
+        history.entries_added.connect(self.insert_entries)
+        history.entries_removed.connect(self.remove_entries)
+        history.cleared.connect(self.clear)
+
+        self.thumbnail_service = thumbnails
+        self.thumbnails = OrderedDict()  # url -> QPixmap ukuran baris (null = gagal)
+        self._wanted = set()             # url yang pernah di-paint model ini
+        thumbnails.ready.connect(self._on_thumbnail_ready)
+        thumbnails.failed.connect(self._on_thumbnail_failed)
+
+    def reload(self):
+        """Baca ulang dari halaman pertama"""
+        self.beginResetModel()
+        self.entries = []
+        self._more = True
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def set_filters(self, **filters):
+        """Ganti filter search lalu muat ulang dari halaman pertama"""
+        self.filters = {key: value for key, value in filters.items() if value}
+        self.reload()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self.history.search(limit=PAGE_SIZE, offset=len(self.entries), **self.filters)
+        self._more = len(page) == PAGE_SIZE
+        if not page:
+            return
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self.entries.extend(page)
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        entry = self.entries[index.row()]
+        if role == EntryRole:
+            return entry
+        if role == Qt.DisplayRole:
+            return entry.get('title') or 'Unknown'
+        if role == Qt.ToolTipRole:
+            return f"{entry.get('title') or 'Unknown'}\n{entry.get('file_path') or ''}"
+        if role == ThumbnailRole:
+            return self.thumbnail(entry.get('thumbnail'))
+        return None
+
+    def thumbnail(self, url):
+        """Pixmap thumbnail jika sudah ada; jika belum, diminta ke ThumbnailService (return None)"""
+        if not url:
+            return None
+        pixmap = self.thumbnails.get(url)
+        if pixmap is not None:
+            self.thumbnails.move_to_end(url)
+            return pixmap
+        self._wanted.add(url)
+        image = self.thumbnail_service.request(url)
+        return self._store_thumbnail(url, image) if image is not None else None
+
+    def _store_thumbnail(self, url, image):
+        pixmap = QPixmap()
+        if image is not None:
+            pixmap = QPixmap.fromImage(image.scaled(
+                THUMB_WIDTH, THUMB_HEIGHT, Qt.KeepAspectRatio, Qt.SmoothTransformation
+            ))
+        self.thumbnails[url] = pixmap
+        while len(self.thumbnails) > THUMB_CACHE:
+            self.thumbnails.popitem(last=False)
+        return pixmap
+
+    def _on_thumbnail_ready(self, url, image):
+        if url in self._wanted:
+            self._store_thumbnail(url, image)
+            self._thumbnails_changed()
+
+    def _on_thumbnail_failed(self, url, error):
+        if url in self._wanted:
+            self._store_thumbnail(url, None)
+            self._thumbnails_changed()
+
+    def _thumbnails_changed(self):
+        # Satu sinyal untuk semua baris: view hanya repaint yang terlihat
+        if self.entries:
+            self.dataChanged.emit(self.index(0), self.index(len(self.entries) - 1), [ThumbnailRole])
+
+    def insert_entries(self, entries):
+        """Delta entries_added: entry terbaru (yang lolos filter) masuk di baris paling atas"""
+        if self.filters:
+            # Query yang sama dengan fetchMore (FTS), dibatasi ke id entry baru
+            matching = {e['id'] for e in self.history.search(ids=[e['id'] for e in entries], **self.filters)}
+            entries = [entry for entry in entries if entry['id'] in matching]
+        if not entries:
+            return
+        # Offset fetchMore tetap benar: entry ini juga ada di database
+        self.beginInsertRows(QModelIndex(), 0, len(entries) - 1)
+        self.entries[0:0] = entries
+        self.endInsertRows()
+
+    def remove_entries(self, entry_ids):
+        """Delta entries_removed: hapus baris yang sudah dimuat"""
+        entry_ids = set(entry_ids)
+        rows = [row for row, entry in enumerate(self.entries) if entry.get('id') in entry_ids]
+        for row in reversed(rows):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.entries[row]
+            self.endRemoveRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.entries = []
+        self._more = False
+        self.endResetModel()
+
+
+class HistoryDelegate(QStyledItemDelegate):
+    """Paint satu baris histori: thumbnail, judul, platform/tanggal, detail"""
+
+    PADDING = 10
+    SPACING = 15
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        entry = index.data(EntryRole)
+        if entry is None:
+            return
+
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ''
+        widget = option.widget
+        style = widget.style() if widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, opt, painter, widget)
+
+        painter.save()
+        rect = option.rect.adjusted(self.PADDING, self.PADDING, -self.PADDING, -self.PADDING)
+        selected = option.state & QStyle.State_Selected
+        text_color = option.palette.highlightedText().color() if selected else option.palette.text().color()
 
-class HistoryItemWidget(QFrame):
-    """Widget untuk satu item history"""
-    
-    def __init__(self, entry):
-        super().__init__()
-        self.entry = entry
-        self.network_manager = QNetworkAccessManager()
-        self.init_ui()
-    
-    def init_ui(self):
-        """Inisialisasi UI"""
-        self.setFrameStyle(QFrame.StyledPanel | QFrame.Raised)
-        self.setMaximumHeight(150)
-        
-        layout = QHBoxLayout(self)
-        layout.setSpacing(15)
-        
         # Thumbnail
-        self.thumbnail_label = QLabel()
-        self.thumbnail_label.setFixedSize(120, 90)
-        self.thumbnail_label.setScaledContents(True)
-        self.thumbnail_label.setStyleSheet("border: 1px solid #3d3d3d; border-radius: 4px;")
-        
-        if self.entry.get('thumbnail'):
-            self.load_thumbnail(self.entry['thumbnail'])
+        thumb_rect = QRect(rect.left(), rect.top() + (rect.height() - THUMB_HEIGHT) // 2,
+                           THUMB_WIDTH, THUMB_HEIGHT)
+        pixmap = index.data(ThumbnailRole)
+        if pixmap is not None and not pixmap.isNull():
+            target = pixmap.rect()
+            target.moveCenter(thumb_rect.center())
+            painter.drawPixmap(target, pixmap)
         else:
-            self.thumbnail_label.setText("No\nPreview")
-            self.thumbnail_label.setAlignment(Qt.AlignCenter)
-        
-        layout.addWidget(self.thumbnail_label)
-        
+            painter.setPen(QPen(QColor('#3d3d3d')))
+            painter.drawRoundedRect(thumb_rect, 4, 4)
+            painter.setPen(QColor('gray'))
+            painter.drawText(thumb_rect, Qt.AlignCenter, "No\nPreview")
+
         # Info section
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(5)
-        
-        # Title
-        title = self.entry.get('title', 'Unknown')
-        if len(title) > 60:
-            title = title[:60] + "..."
-        title_label = QLabel(title)
-        title_label.setStyleSheet("font-size: 11pt; font-weight: bold;")
-        title_label.setWordWrap(True)
-        info_layout.addWidget(title_label)
-        
-        # Platform & Date
-        platform = self.entry.get('platform', 'Unknown')
-        timestamp = self.entry.get('timestamp', '')
-        try:
-            date_obj = datetime.fromisoformat(timestamp)
-            date_str = date_obj.strftime("%d %b %Y, %H:%M")
-        except:
-            date_str = "Unknown date"
-        
-        meta_label = QLabel(f"📁 {platform} | 📅 {date_str}")
-        meta_label.setStyleSheet("color: gray; font-size: 9pt;")
-        info_layout.addWidget(meta_label)
-        
-        # Duration / Item count
-        details = []
-        if self.entry.get('duration'):
-            duration = self.entry['duration']
-            minutes = duration // 60
-            seconds = duration % 60
-            details.append(f"⏱️ {minutes}:{seconds:02d}")
-        
-        item_count = self.entry.get('item_count', 1)
-        if item_count > 1:
-            details.append(f"📦 {item_count} items")
-        
-        if self.entry.get('quality'):
-            details.append(f"🎥 {self.entry['quality']}")
-        
+        text_rect = QRect(thumb_rect.right() + self.SPACING, rect.top(),
+                          rect.right() - thumb_rect.right() - self.SPACING, rect.height())
+        base_font = QFont(option.font)
+
+        title_font = QFont(base_font)
+        title_font.setPointSize(11)
+        title_font.setBold(True)
+        painter.setFont(title_font)
+        painter.setPen(text_color)
+        title = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, text_rect.width())
+        line_height = painter.fontMetrics().height()
+        painter.drawText(QRect(text_rect.left(), text_rect.top(), text_rect.width(), line_height),
+                         Qt.AlignLeft | Qt.AlignVCenter, title)
+        top = text_rect.top() + line_height + 5
+
+        small_font = QFont(base_font)
+        small_font.setPointSize(9)
+        painter.setFont(small_font)
+        small_height = painter.fontMetrics().height()
+
+        meta = f"📁 {entry.get('platform') or 'Unknown'} | 📅 {format_date(entry.get('timestamp'))}"
+        painter.setPen(QColor('gray'))
+        painter.drawText(QRect(text_rect.left(), top, text_rect.width(), small_height),
+                         Qt.AlignLeft | Qt.AlignVCenter,
+                         painter.fontMetrics().elidedText(meta, Qt.ElideRight, text_rect.width()))
+        top += small_height + 5
+
+        details = format_details(entry)
         if details:
-            details_label = QLabel(" | ".join(details))
-            details_label.setStyleSheet("font-size: 9pt;")
-            info_layout.addWidget(details_label)
-        
-        info_layout.addStretch()
-        
-        layout.addLayout(info_layout, 1)
-        
-        # Actions
-        actions_layout = QVBoxLayout()
-        
-        open_btn = QPushButton("📂 Open")
-        open_btn.setMaximumWidth(100)
-        open_btn.clicked.connect(self.open_file)
-        actions_layout.addWidget(open_btn)
-        
-        open_folder_btn = QPushButton("📁 Folder")
-        open_folder_btn.setMaximumWidth(100)
-        open_folder_btn.clicked.connect(self.open_folder)
-        actions_layout.addWidget(open_folder_btn)
-        
-        actions_layout.addStretch()
-        
-        layout.addLayout(actions_layout)
-    
-    def load_thumbnail(self, url):
-        """Load thumbnail dari URL"""
-        request = QNetworkRequest(QUrl(url))
-        reply = self.network_manager.get(request)
-        reply.finished.connect(lambda: self.on_thumbnail_loaded(reply))
-    
-    def on_thumbnail_loaded(self, reply):
-        """Handler ketika thumbnail selesai diload"""
-        if reply.error() == reply.NoError:
-            pixmap = QPixmap()
-            pixmap.loadFromData(reply.readAll())
-            scaled_pixmap = pixmap.scaled(120, 90, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            self.thumbnail_label.setPixmap(scaled_pixmap)
-        reply.deleteLater()
-    
-    def open_file(self):
-        """Buka file yang didownload"""
-        file_path = self.entry.get('file_path', '')
-        if file_path and os.path.exists(file_path):
-            os.startfile(file_path) if os.name == 'nt' else os.system(f'xdg-open "{file_path}"')
-        else:
-            QMessageBox.warning(self, "Error", "File tidak ditemukan")
-    
-    def open_folder(self):
-        """Buka folder tempat file disimpan"""
-        file_path = self.entry.get('file_path', '')
-        if file_path:
-            folder = os.path.dirname(file_path)
-            if os.path.exists(folder):
-                os.startfile(folder) if os.name == 'nt' else os.system(f'xdg-open "{folder}"')
-            else:
-                QMessageBox.warning(self, "Error", "Folder tidak ditemukan")
+            painter.setPen(text_color)
+            painter.drawText(QRect(text_rect.left(), top, text_rect.width(), small_height),
+                             Qt.AlignLeft | Qt.AlignVCenter, details)
+        painter.restore()
 
 
 class HistoryWidget(QWidget):
     """Widget utama untuk history"""
-    
-    def __init__(self):
+
+    def __init__(self, history=None, thumbnails=None):
         super().__init__()
-        self.history = HistoryManager()
+        self.history = history if history is not None else HistoryService()
+        self.thumbnails = thumbnails if thumbnails is not None else ThumbnailService(parent=self)
+        self.model = HistoryModel(self.history, self.thumbnails, self)
         self.init_ui()
         self.load_history()
-    
+
     def init_ui(self):
         """Inisialisasi UI"""
         layout = QVBoxLayout(self)
         layout.setSpacing(15)
-        
+
         # Header
         header_layout = QHBoxLayout()
-        
+
         title_label = QLabel("📜 Download History")
         title_label.setStyleSheet("font-size: 16pt; font-weight: bold;")
         header_layout.addWidget(title_label)
-        
+
         header_layout.addStretch()
-        
+
+        self.open_btn = QPushButton("📂 Open")
+        self.open_btn.setMaximumWidth(100)
+        self.open_btn.clicked.connect(lambda: self._with_current(open_file))
+        header_layout.addWidget(self.open_btn)
+
+        self.folder_btn = QPushButton("📁 Folder")
+        self.folder_btn.setMaximumWidth(100)
+        self.folder_btn.clicked.connect(lambda: self._with_current(open_folder))
+        header_layout.addWidget(self.folder_btn)
+
         self.refresh_btn = QPushButton("🔄 Refresh")
         self.refresh_btn.setMaximumWidth(120)
         self.refresh_btn.clicked.connect(self.refresh_history)
         header_layout.addWidget(self.refresh_btn)
-        
+
         self.clear_btn = QPushButton("🗑️ Clear All")
         self.clear_btn.setObjectName("dangerButton")
         self.clear_btn.setMaximumWidth(120)
         self.clear_btn.clicked.connect(self.clear_history)
         header_layout.addWidget(self.clear_btn)
-        
+
         layout.addLayout(header_layout)
-        
-        # Scroll area untuk history items
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        
-        self.history_container = QWidget()
-        self.history_layout = QVBoxLayout(self.history_container)
-        self.history_layout.setSpacing(10)
-        self.history_layout.setAlignment(Qt.AlignTop)
-        
-        scroll.setWidget(self.history_container)
-        layout.addWidget(scroll)
-    
+
+        # Search & filter
+        filter_layout = QHBoxLayout()
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("🔍 Cari judul, URL, platform, kualitas, tanggal...")
+        self.search_input.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.search_input, 1)
+
+        self.platform_filter = QComboBox()
+        self.platform_filter.addItem("Semua platform", None)
+        filter_layout.addWidget(self.platform_filter)
+
+        self.date_filter = QComboBox()
+        for label, days in DATE_RANGES:
+            self.date_filter.addItem(label, days)
+        filter_layout.addWidget(self.date_filter)
+
+        layout.addLayout(filter_layout)
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self.apply_filters)
+        self.search_input.textChanged.connect(self._search_timer.start)
+        self.search_input.returnPressed.connect(self.apply_filters)
+        self.platform_filter.currentIndexChanged.connect(self.apply_filters)
+        self.date_filter.currentIndexChanged.connect(self.apply_filters)
+        self.history.entries_added.connect(self._on_entries_added)
+
+        # List history: baris di-paint delegate, tinggi seragam (layout tanpa ukur per item)
+        self.list_view = QListView()
+        self.list_view.setModel(self.model)
+        self.list_view.setItemDelegate(HistoryDelegate(self.list_view))
+        self.list_view.setUniformItemSizes(True)
+        self.list_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.list_view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.list_view.setSelectionMode(QListView.SingleSelection)
+        self.list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.list_view.customContextMenuRequested.connect(self._show_context_menu)
+        self.list_view.doubleClicked.connect(lambda index: open_file(index.data(EntryRole), self))
+        self.list_view.selectionModel().currentChanged.connect(self._update_buttons)
+        layout.addWidget(self.list_view)
+
+        self.empty_label = QLabel("Belum ada riwayat download")
+        self.empty_label.setAlignment(Qt.AlignCenter)
+        self.empty_label.setStyleSheet("font-size: 12pt; color: gray; padding: 50px;")
+        layout.addWidget(self.empty_label)
+
+        self.model.modelReset.connect(self._update_empty)
+        self.model.rowsInserted.connect(self._update_empty)
+        self.model.rowsRemoved.connect(self._update_empty)
+        self._update_buttons()
+
+    def _update_empty(self):
+        empty = self.model.rowCount() == 0
+        self.empty_label.setText("Tidak ada hasil" if self.model.filters else "Belum ada riwayat download")
+        self.list_view.setVisible(not empty)
+        self.empty_label.setVisible(empty)
+        self._update_buttons()
+
+    def _update_buttons(self):
+        has_current = self.list_view.currentIndex().isValid()
+        self.open_btn.setEnabled(has_current)
+        self.folder_btn.setEnabled(has_current)
+
+    def _with_current(self, action):
+        index = self.list_view.currentIndex()
+        if index.isValid():
+            action(index.data(EntryRole), self)
+
+    def _show_context_menu(self, pos):
+        index = self.list_view.indexAt(pos)
+        if not index.isValid():
+            return
+        entry = index.data(EntryRole)
+        menu = QMenu(self)
+        menu.addAction("📂 Open", lambda: open_file(entry, self))
+        menu.addAction("📁 Folder", lambda: open_folder(entry, self))
+        menu.addSeparator()
+        menu.addAction("🗑️ Remove", lambda: self.history.delete_entries([entry['id']]))
+        menu.exec_(self.list_view.viewport().mapToGlobal(pos))
+
+    def _refresh_platforms(self):
+        current = self.platform_filter.currentData()
+        self.platform_filter.blockSignals(True)
+        self.platform_filter.clear()
+        self.platform_filter.addItem("Semua platform", None)
+        for platform in self.history.platforms():
+            self.platform_filter.addItem(platform, platform)
+        index = self.platform_filter.findData(current)
+        self.platform_filter.setCurrentIndex(max(index, 0))
+        self.platform_filter.blockSignals(False)
+
+    def _on_entries_added(self, entries):
+        if any(self.platform_filter.findData(e.get('platform')) < 0 for e in entries if e.get('platform')):
+            self._refresh_platforms()
+
+    def apply_filters(self):
+        """Jalankan search dengan isi search box + filter platform/tanggal"""
+        self._search_timer.stop()
+        days = self.date_filter.currentData()
+        self.model.set_filters(
+            query=self.search_input.text().strip(),
+            platform=self.platform_filter.currentData(),
+            date_from=date.today() - timedelta(days=days) if days is not None else None,
+        )
+
     def load_history(self):
-        """Load dan tampilkan history"""
-        # Clear existing items
-        while self.history_layout.count():
-            child = self.history_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
-        
-        # Get history
-        entries = self.history.get_history(50)  # Limit 50 items
-        
-        if not entries:
-            empty_label = QLabel("Belum ada riwayat download")
-            empty_label.setAlignment(Qt.AlignCenter)
-            empty_label.setStyleSheet("font-size: 12pt; color: gray; padding: 50px;")
-            self.history_layout.addWidget(empty_label)
-        else:
-            for entry in entries:
-                item_widget = HistoryItemWidget(entry)
-                self.history_layout.addWidget(item_widget)
-        
-        self.history_layout.addStretch()
-    
+        """Load dan tampilkan history (halaman pertama; sisanya saat di-scroll)"""
+        self._refresh_platforms()
+        self.apply_filters()
+
     def refresh_history(self):
-        """Refresh history display"""
-        self.history = HistoryManager()  # Reload from file
+        """Baca ulang dari database (perubahan biasa sudah masuk lewat delta)"""
         self.load_history()
-    
+
     def clear_history(self):
         """Clear semua history"""
         reply = QMessageBox.question(
@@ -231,7 +473,6 @@ class HistoryWidget(QWidget):
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
         )
-        
+
         if reply == QMessageBox.Yes:
             self.history.clear_history()
-            self.load_history()
\ No newline at end of file
@@ -9,19 +9,79 @@ from PyQt5.QtWidgets import (
     QPushButton, QLabel, QStackedWidget, QTabWidget,
     QGridLayout, QScrollArea, QSizePolicy
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QThread, QTimer, pyqtSignal
 
 from .platform_widget import PlatformWidget
 from .history_widget import HistoryWidget
+from .history_service import HistoryService
+from .thumbnail_service import ThumbnailService
 from .settings_dialog import SettingsDialog
 from .styles import get_theme
-from utils import ConfigManager
+from utils import ConfigManager, DownloadArchive, JobQueue, SubscriptionStore
+from utils.subscriptions import sync_subscription
+from utils.config import DEFAULT_STALL_MIN_SPEED, DEFAULT_STALL_WINDOW
+from backend import watchdog
+
+
+# Interval cek subscription yang sudah jatuh tempo (ms)
+SUBSCRIPTION_CHECK_MS = 60 * 1000
+
+
+class SubscriptionSyncThread(QThread):
+    """Sync subscription yang jatuh tempo; item baru masuk job queue"""
+    synced = pyqtSignal(dict)  # platform -> jumlah job baru
+
+    def __init__(self, subscriptions, due, downloaders, job_queue, archive):
+        super().__init__()
+        self.subscriptions = subscriptions
+        self.due = due
+        self.downloaders = downloaders
+        self.job_queue = job_queue
+        self.archive = archive
+
+    def run(self):
+        counts = {}
+        for sub in self.due:
+            downloader = self.downloaders.get(sub['platform'])
+            if downloader is None:
+                continue
+            try:
+                new = sync_subscription(self.subscriptions, sub, downloader, self.job_queue, self.archive)
+            except Exception as e:
+                print(f"Subscription sync error ({sub['platform']} {sub['source']}): {e}")
+                self.subscriptions.mark_failed(sub['id'], str(e))
+                continue
+            if new:
+                counts[sub['platform']] = counts.get(sub['platform'], 0) + new
+        self.synced.emit(counts)
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config = ConfigManager()
+        self.apply_transfer_settings()
+
+        # Queue download bersama; job yang terputus (crash/ditutup) dilanjutkan,
+        # job yang sudah selesai/gagal dari sesi sebelumnya dibuang
+        self.job_queue = JobQueue()
+        self.job_queue.requeue_interrupted()
+        self.job_queue.clear_finished()
+
+        # Histori bersama; perubahan dikirim ke tab History sebagai delta (signal)
+        self.history = HistoryService()
+
+        # Thumbnail (preview + history) dari cache memory/disk bersama
+        self.thumbnails = ThumbnailService(parent=self)
+
+        # Index item yang sudah didownload (skip saat sync ulang playlist/profil)
+        self.archive = DownloadArchive()
+        if not self.archive.count():
+            self.archive.import_history(self.history.get_history())
+
+        # Watch list channel/profil/playlist
+        self.subscriptions = SubscriptionStore()
+        self._sync_thread = None
 
         self._platform_cols = None
         self._platform_order = []
@@ -30,6 +90,11 @@ class MainWindow(QMainWindow):
         self.init_ui()
         self.apply_theme()
 
+        self._sync_timer = QTimer(self)
+        self._sync_timer.timeout.connect(self.check_subscriptions)
+        self._sync_timer.start(SUBSCRIPTION_CHECK_MS)
+        QTimer.singleShot(5000, self.check_subscriptions)
+
     def init_ui(self):
         self.setWindowTitle("Media Downloader - Multi Platform")
         self.setMinimumSize(900, 700)
@@ -119,7 +184,8 @@ class MainWindow(QMainWindow):
         self.platform_pages = {}
 
         for platform_name, _ in platforms:
-            widget = PlatformWidget(platform_name, self.config)
+            widget = PlatformWidget(platform_name, self.config, self.job_queue, self.archive,
+                                    self.subscriptions, self.history, self.thumbnails)
             widget.download_complete.connect(self.on_download_complete)
             self.platform_widgets[platform_name] = widget
 
@@ -139,7 +205,7 @@ class MainWindow(QMainWindow):
         # ----------------------------
         # History tab
         # ----------------------------
-        self.history_widget = HistoryWidget()
+        self.history_widget = HistoryWidget(self.history, self.thumbnails)
         self.tab_widget.addTab(self.history_widget, "📜 History")
 
         main_layout.addWidget(self.tab_widget, 1)
@@ -217,6 +283,13 @@ class MainWindow(QMainWindow):
         dialog = SettingsDialog(self.config, self)
         if dialog.exec_():
             self.apply_theme()
+            self.apply_transfer_settings()
+
+    def apply_transfer_settings(self):
+        watchdog.configure(
+            min_speed=self.config.get('stall_min_speed_kbps', DEFAULT_STALL_MIN_SPEED) * 1024,
+            window=self.config.get('stall_window', DEFAULT_STALL_WINDOW),
+        )
 
     def apply_theme(self):
         theme = self.config.get("theme", "dark")
@@ -229,4 +302,31 @@ class MainWindow(QMainWindow):
         else:
             self.statusBar().showMessage("Download selesai", 5000)
 
-        self.history_widget.refresh_history()
+    def check_subscriptions(self):
+        if self._sync_thread is not None and self._sync_thread.isRunning():
+            return
+        due = self.subscriptions.due()
+        if not due:
+            return
+
+        downloaders = {name: widget.downloader for name, widget in self.platform_widgets.items()}
+        t = SubscriptionSyncThread(self.subscriptions, due, downloaders, self.job_queue, self.archive)
+        t.synced.connect(self.on_subscriptions_synced)
+        t.finished.connect(t.deleteLater)
+        self._sync_thread = t
+        t.start()
+
+    def on_subscriptions_synced(self, counts):
+        self._sync_thread = None
+        for platform in counts:
+            self.platform_widgets[platform].resume_jobs()
+        if counts:
+            total = sum(counts.values())
+            self.statusBar().showMessage(f"Subscription: {total} item baru masuk antrian", 5000)
+
+    def closeEvent(self, event):
+        self._sync_timer.stop()
+        for widget in self.platform_widgets.values():
+            widget.abort_downloads()
+        self.thumbnails.shutdown()
+        super().closeEvent(event)
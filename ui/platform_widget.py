@@ -3,13 +3,14 @@ Platform Widget - Widget untuk handle download per platform
 UPDATED (Crash-safe + Responsive + Race-safe):
 - Fix RuntimeError: wrapped C/C++ object ... has been deleted (ThumbThread)
 - Avoid overriding QThread.finished (no custom signal named "finished")
-- Thumbnail loader uses urllib thread, safe cleanup + late-signal ignore
+- Thumbnail lewat ThumbnailService bersama (cache memory + disk), late-signal ignore
 - Multi-download threaded to avoid UI freeze
 - Responsive thumbnail scaling and layout reflow
 """
 
-import ssl
-import urllib.request
+import bisect
+import inspect
+import time
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
@@ -18,11 +19,17 @@ from PyQt5.QtWidgets import (
     QCheckBox, QGridLayout, QMessageBox, QSpinBox,
     QBoxLayout, QSizePolicy
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QThread, pyqtSlot
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, pyqtSlot, QTimer
+from PyQt5.QtGui import QImage, QPixmap
 
 from backend import YouTubeDownloader, InstagramDownloader, TikTokDownloader, FacebookDownloader
-from utils import HistoryManager
+from backend.formats import format_size
+from utils import DownloadArchive, JobQueue, JobScheduler, SubscriptionStore
+from utils.history import quality_label
+from utils.job_queue import PRIORITY_SINGLE, PRIORITY_BATCH
+from utils.subscriptions import LISTING, PLAYLIST, PROFILE
+from .history_service import HistoryService
+from .thumbnail_service import ThumbnailService
 
 
 def _shorten(text: str, n: int = 80) -> str:
@@ -38,6 +45,19 @@ class CallThread(QThread):
     """Generic thread for calling a method on target (downloader/widget)."""
     result = pyqtSignal(dict)
     failed = pyqtSignal(str)
+    batch = pyqtSignal(list)  # partial results (via on_batch callback)
+
+    def stream_batches(self):
+        """Pass on_batch=self.batch.emit if the target method supports it."""
+        method = getattr(self.target, self.method_name)
+        try:
+            params = inspect.signature(method).parameters
+        except (TypeError, ValueError):
+            return False
+        if "on_batch" not in params:
+            return False
+        self.kwargs["on_batch"] = self.batch.emit
+        return True
 
     def __init__(self, target, method_name: str, *args, **kwargs):
         super().__init__()
@@ -55,97 +75,40 @@ class CallThread(QThread):
             self.failed.emit(str(e))
 
 
-class ThumbThread(QThread):
-    """Download thumbnail bytes via urllib (no QtNetwork)."""
-    data_ready = pyqtSignal(bytes)
-    failed = pyqtSignal(str)
-
-    def __init__(self, url: str):
-        super().__init__()
-        self.url = url
-        self._abort = False
-
-    def abort(self):
-        self._abort = True
-
-    def run(self):
-        try:
-            if not self.url:
-                self.failed.emit("Thumbnail URL kosong")
-                return
-
-            req = urllib.request.Request(
-                self.url,
-                headers={
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                                  "AppleWebKit/537.36 (KHTML, like Gecko) "
-                                  "Chrome/120.0 Safari/537.36"
-                }
-            )
-            ctx = ssl.create_default_context()
-
-            with urllib.request.urlopen(req, context=ctx, timeout=15) as resp:
-                data = resp.read()
-
-            if self._abort:
-                return
-
-            self.data_ready.emit(data)
-        except Exception as e:
-            if not self._abort:
-                self.failed.emit(str(e))
-
-
 class MultiDownloadThread(QThread):
-    """Thread download multiple urls with progress."""
+    """Thread yang menjalankan job queue satu platform (bounded worker pool)."""
     progress = pyqtSignal(int, int, str)   # done, total, text
     done = pyqtSignal(dict)
     failed = pyqtSignal(str)
 
-    def __init__(self, downloader, urls, output_path, quality=None, download_type=None):
+    def __init__(self, job_queue, platform, run_job, max_workers=1):
         super().__init__()
-        self.downloader = downloader
-        self.urls = urls or []
-        self.output_path = output_path
-        self.quality = quality
-        self.download_type = download_type
+        self.job_queue = job_queue
+        self.platform = platform
+        self.run_job = run_job
+        self.max_workers = max(1, max_workers)
+        self.scheduler = None
         self._abort = False
 
     def abort(self):
+        # Job yang belum selesai tetap di queue dan dilanjutkan saat startup berikutnya
         self._abort = True
+        if self.scheduler:
+            self.scheduler.stop()
 
-    def _call_download_with_fallback(self, url):
-        attempts = [
-            (url, self.output_path, self.quality, self.download_type, None, None, None),
-            (url, self.output_path, self.quality, self.download_type),
-            (url, self.output_path, self.quality),
-            (url, self.output_path),
-        ]
-        last_err = None
-        for args in attempts:
-            try:
-                return self.downloader.download(*args)
-            except TypeError as e:
-                last_err = e
-        raise last_err if last_err else TypeError("Signature downloader.download tidak cocok.")
+    def _on_progress(self, done, total):
+        self.progress.emit(done, total, f"Downloaded {done}/{total}")
 
     def run(self):
         try:
-            total = len(self.urls)
-            results = []
+            total = self.job_queue.pending_count(self.platform)
+            self.progress.emit(0, total, f"Downloading {total} item ({self.max_workers} paralel)...")
 
-            for i, url in enumerate(self.urls, start=1):
-                if self._abort:
-                    break
-
-                self.progress.emit(i - 1, total, f"Downloading {i}/{total}...")
-                try:
-                    res = self._call_download_with_fallback(url)
-                    results.append(res if isinstance(res, dict) else {"result": res, "success": True})
-                except Exception as e:
-                    results.append({"success": False, "error": str(e), "url": url})
-
-                self.progress.emit(i, total, f"Downloaded {i}/{total}")
+            self.scheduler = JobScheduler(self.job_queue, self.platform, self.run_job,
+                                          max_workers=self.max_workers, on_progress=self._on_progress)
+            if self._abort:
+                self.scheduler.stop()
+            results = self.scheduler.run()
 
             ok_count = len([r for r in results if r.get("success")])
             self.done.emit({"results": results, "count": ok_count})
@@ -163,19 +126,31 @@ class PlatformWidget(QWidget):
     THUMB_MIN_W = 180
     THUMB_MAX_W = 520
 
-    def __init__(self, platform, config):
+    def __init__(self, platform, config, job_queue=None, archive=None, subscriptions=None, history=None,
+                 thumbnails=None):
         super().__init__()
         self.platform = platform
         self.config = config
-        self.history = HistoryManager()
+        self.history = history if history is not None else HistoryService()
+        self.job_queue = job_queue if job_queue is not None else JobQueue()
+        self.archive = archive if archive is not None else DownloadArchive()
+        self.subscriptions = subscriptions if subscriptions is not None else SubscriptionStore()
         self.current_info = None
-
-        self._thumb_thread = None
+        self._fetched_input = None  # input yang menghasilkan current_info
+        self._job_infos = {}  # job id -> metadata Fetch Info (hanya sesi ini)
+        self.multi_thread = None
+
+        self.thumbnails = thumbnails if thumbnails is not None else ThumbnailService(parent=self)
+        self.thumbnails.ready.connect(self._on_thumbnail_ready)
+        self.thumbnails.failed.connect(self._on_thumbnail_error)
+        self._thumb_url = None  # thumbnail preview yang sedang ditunggu
         self._thumb_pixmap_original = None
         self._threads = []  # keep refs
 
         if platform == "YouTube":
             self.downloader = YouTubeDownloader()
+            # Semua download lewat JobScheduler: ffmpeg item ini tidak menahan download berikutnya
+            self.downloader.defer_postprocess = True
         elif platform == "Instagram":
             self.downloader = InstagramDownloader()
         elif platform == "TikTok":
@@ -188,22 +163,20 @@ class PlatformWidget(QWidget):
         self.init_ui()
         self._apply_responsive_rules()
 
+        # Lanjutkan job yang belum selesai dari sesi sebelumnya
+        if self.job_queue.pending_count(self.platform):
+            QTimer.singleShot(0, self.resume_jobs)
+
     # -----------------------------
     # Thread helper (FIXED)
     # -----------------------------
     def _keep_thread(self, t: QThread):
         """
         Keep reference; cleanup on QThread.finished (built-in).
-        PENTING: kalau thread yg selesai adalah thumb thread yg sedang aktif,
-        set self._thumb_thread = None sebelum deleteLater.
         """
         self._threads.append(t)
 
         def _cleanup():
-            # null-kan thumb ref kalau itu thread yg aktif
-            if getattr(self, "_thumb_thread", None) is t:
-                self._thumb_thread = None
-
             try:
                 self._threads.remove(t)
             except ValueError:
@@ -386,6 +359,12 @@ class PlatformWidget(QWidget):
         self.download_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
         layout.addWidget(self.download_btn)
 
+        self.subscribe_btn = QPushButton()
+        self.subscribe_btn.setVisible(False)
+        self.subscribe_btn.clicked.connect(self.toggle_subscription)
+        self.subscribe_btn.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        layout.addWidget(self.subscribe_btn)
+
         # Progress
         self.progress_group = QGroupBox("Progress")
         self.progress_group.setVisible(False)
@@ -446,14 +425,18 @@ class PlatformWidget(QWidget):
     # -----------------------------
     def reset_state(self):
         self.current_info = None
+        self._fetched_input = None
 
         for attr in ("video_checkboxes", "post_checkboxes", "story_checkboxes"):
             if hasattr(self, attr):
                 delattr(self, attr)
+        self._playlist_layout = None
+        self._posts_layout = None
 
         self.preview_group.setVisible(False)
         self.options_group.setVisible(False)
         self.download_btn.setVisible(False)
+        self.subscribe_btn.setVisible(False)
 
         self.channel_label.setVisible(False)
         self.duration_label.setVisible(False)
@@ -475,19 +458,8 @@ class PlatformWidget(QWidget):
             self.start_time_spin.setValue(0)
             self.end_time_spin.setValue(0)
 
-        # cancel old thumbnail safely (guard RuntimeError)
-        t = getattr(self, "_thumb_thread", None)
-        if t is not None:
-            try:
-                if t.isRunning():
-                    try:
-                        t.abort()
-                    except Exception:
-                        pass
-            except RuntimeError:
-                # object already deleted
-                pass
-        self._thumb_thread = None
+        # Hasil thumbnail lama yang datang belakangan diabaikan
+        self._thumb_url = None
 
         self._apply_responsive_rules()
 
@@ -505,21 +477,31 @@ class PlatformWidget(QWidget):
     def toggle_download_type(self):
         info = self.current_info or {}
 
+        formats = info.get("formats") if isinstance(info, dict) else None
         if hasattr(self, "audio_radio") and self.audio_radio.isChecked():
-            self.quality_combo.clear()
-            self.quality_combo.addItems(["320kbps", "192kbps", "128kbps", "64kbps"])
+            self._set_quality_items(formats, "audio", ["320kbps", "192kbps", "128kbps", "64kbps"])
             if hasattr(self, "trim_group"):
                 self.trim_group.setVisible(False)
                 self.trim_group.setChecked(False)
         else:
-            self.quality_combo.clear()
-            formats = None
-            if isinstance(info, dict) and "formats" in info:
-                formats = info["formats"].get("video")
-            self.quality_combo.addItems(formats if formats else ["1080p", "720p", "480p", "360p"])
+            self._set_quality_items(formats, "video", ["1080p", "720p", "480p", "360p"])
             if hasattr(self, "trim_group"):
                 self.trim_group.setVisible(True)
 
+    def _set_quality_items(self, formats, kind, defaults):
+        """Isi combo quality dari info['formats'][kind]; label + estimasi ukuran, nilai asli di userData"""
+        labels = (formats or {}).get(kind) or defaults
+        sizes = ((formats or {}).get("sizes") or {}).get(kind) or {}
+        self.quality_combo.clear()
+        for label in labels:
+            size = format_size(sizes.get(label))
+            self.quality_combo.addItem(f"{label}  ({size})" if size else label, label)
+
+    def _selected_quality(self):
+        if not self.quality_combo.count():
+            return "Best Quality"
+        return self.quality_combo.currentData() or self.quality_combo.currentText()
+
     # -----------------------------
     # Fetch info
     # -----------------------------
@@ -552,14 +534,38 @@ class PlatformWidget(QWidget):
             else:
                 method = "extract_post_info"
 
+        self.downloader.hedged = bool(self.config.get("hedged_fetch", False))
+
         t = CallThread(self.downloader, method, input_text)
+        t.input_text = input_text
+        t.listing_kind = "posts" if method == "extract_user_posts" else "playlist"
         self._keep_thread(t)
         self.fetch_thread = t
 
+        if t.stream_batches():
+            t.batch.connect(self.on_info_batch)
         t.result.connect(self.on_info_fetched)
         t.failed.connect(self.on_error)
         t.start()
 
+    @pyqtSlot(list)
+    def on_info_batch(self, entries):
+        """Batch entry playlist/post yang masuk sebelum fetch selesai."""
+        sender = self.sender()
+        if sender is not getattr(self, "fetch_thread", None):
+            return
+
+        self.preview_group.setVisible(True)
+        if getattr(sender, "listing_kind", "playlist") == "posts":
+            self._ensure_posts_area()
+            self._add_posts(entries)
+            count = len(self.post_checkboxes)
+        else:
+            self._ensure_playlist_area()
+            self._add_playlist_videos(entries)
+            count = len(self.video_checkboxes)
+        self.status_label.setText(f"Fetching info... ({count} item)")
+
     @pyqtSlot(dict)
     def on_info_fetched(self, info):
         if self.sender() is not getattr(self, "fetch_thread", None):
@@ -568,6 +574,7 @@ class PlatformWidget(QWidget):
         self.fetch_btn.setEnabled(True)
 
         self.current_info = info or {}
+        self._fetched_input = getattr(self.sender(), "input_text", None)
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(100)
         self.status_label.setText("Info fetched successfully!")
@@ -616,6 +623,7 @@ class PlatformWidget(QWidget):
         if hasattr(self, "video_radio"):
             self.toggle_download_type()
 
+        self._update_subscribe_button()
         self.download_btn.setEnabled(True)
         self._apply_responsive_rules()
 
@@ -623,40 +631,22 @@ class PlatformWidget(QWidget):
     # Thumbnail (FIXED)
     # -----------------------------
     def load_thumbnail(self, url: str):
-        # cancel old safely (guard RuntimeError)
-        old = getattr(self, "_thumb_thread", None)
-        if old is not None:
-            try:
-                if old.isRunning():
-                    try:
-                        old.abort()
-                    except Exception:
-                        pass
-            except RuntimeError:
-                pass
-        self._thumb_thread = None
-
-        t = ThumbThread(url)
-        self._keep_thread(t)
-        self._thumb_thread = t
-
-        t.data_ready.connect(self.on_thumbnail_data)
-        t.failed.connect(self._on_thumbnail_error)
-        t.start()
-
-    @pyqtSlot(bytes)
-    def on_thumbnail_data(self, data: bytes):
-        if self.sender() is not getattr(self, "_thumb_thread", None):
+        self._thumb_url = url
+        image = self.thumbnails.request(url)
+        if image is not None:
+            self._on_thumbnail_ready(url, image)
+
+    @pyqtSlot(str, QImage)
+    def _on_thumbnail_ready(self, url: str, image: QImage):
+        # Service dipakai bersama: abaikan thumbnail milik view/fetch lain
+        if url != self._thumb_url:
             return
+        self._thumb_pixmap_original = QPixmap.fromImage(image)
+        self._apply_responsive_rules()
 
-        pixmap = QPixmap()
-        if pixmap.loadFromData(data):
-            self._thumb_pixmap_original = pixmap
-            self._apply_responsive_rules()
-
-    @pyqtSlot(str)
-    def _on_thumbnail_error(self, msg: str):
-        if self.sender() is not getattr(self, "_thumb_thread", None):
+    @pyqtSlot(str, str)
+    def _on_thumbnail_error(self, url: str, msg: str):
+        if url != self._thumb_url:
             return
         print(f"[Thumbnail] {msg}")
 
@@ -664,16 +654,38 @@ class PlatformWidget(QWidget):
     # Content displays
     # -----------------------------
     def show_playlist(self, info):
-        videos = info.get("videos", [])
+        self._ensure_playlist_area()
+        self._add_playlist_videos(info.get("videos", []))
 
-        content_widget = QWidget()
-        content_layout = QVBoxLayout(content_widget)
+        self.show_download_options(info)
+        self._apply_responsive_rules()
+
+    def _ensure_playlist_area(self):
+        if getattr(self, "_playlist_layout", None) is not None:
+            return
 
+        content_widget = QWidget()
+        self._playlist_layout = QVBoxLayout(content_widget)
+        self._playlist_layout.addStretch()
+        self._playlist_keys = set()
+        self._playlist_order = []  # index playlist per baris (sorted)
         self.video_checkboxes = []
+
+        self.content_scroll.setWidget(content_widget)
+        self.content_scroll.setVisible(True)
+
+    def _add_playlist_videos(self, videos):
+        """Tambah baris video; urut berdasarkan 'index' dan skip duplikat."""
+        archived = self.archive.archived(self.platform, [v.get("url") for v in videos if v.get("url")])
         for video in videos:
+            key = video.get("url") or video.get("id")
+            if key in self._playlist_keys:
+                continue
+            self._playlist_keys.add(key)
+
             checkbox = QCheckBox()
-            checkbox.setChecked(True)
             checkbox.video_data = video
+            self._mark_archived(checkbox, video.get("url") in archived)
 
             item_layout = QHBoxLayout()
             item_layout.addWidget(checkbox)
@@ -682,53 +694,79 @@ class PlatformWidget(QWidget):
             mins = duration // 60
             secs = duration % 60
             label_text = f"{_shorten(video.get('title', 'Unknown'), 60)} ({mins}:{secs:02d})"
+            if checkbox.archived:
+                label_text = "✓ " + label_text
 
             label = QLabel(label_text)
             label.setWordWrap(True)
             item_layout.addWidget(label, 1)
 
-            content_layout.addLayout(item_layout)
-            self.video_checkboxes.append(checkbox)
+            index = video.get("index")
+            if index is None:
+                index = (self._playlist_order[-1] + 1) if self._playlist_order else 0
+            pos = bisect.bisect(self._playlist_order, index)
+            self._playlist_order.insert(pos, index)
 
-        content_layout.addStretch()
-        self.content_scroll.setWidget(content_widget)
-        self.content_scroll.setVisible(True)
+            self._playlist_layout.insertLayout(pos, item_layout)
+            self.video_checkboxes.insert(pos, checkbox)
 
-        self.show_download_options(info)
+    def show_posts(self, info):
+        self._ensure_posts_area()
+        self._add_posts(info.get("posts", []))
+
+        self.download_btn.setVisible(True)
+        self.options_group.setVisible(False)
         self._apply_responsive_rules()
 
-    def show_posts(self, info):
-        posts = info.get("posts", [])
+    def _ensure_posts_area(self):
+        if getattr(self, "_posts_layout", None) is not None:
+            return
 
         content_widget = QWidget()
-        content_layout = QGridLayout(content_widget)
-        content_layout.setHorizontalSpacing(12)
-        content_layout.setVerticalSpacing(8)
-
+        self._posts_layout = QGridLayout(content_widget)
+        self._posts_layout.setHorizontalSpacing(12)
+        self._posts_layout.setVerticalSpacing(8)
+        self._posts_layout.setAlignment(Qt.AlignTop)
+        self._post_keys = set()
         self.post_checkboxes = []
-        for i, post in enumerate(posts):
+
+        self.content_scroll.setWidget(content_widget)
+        self.content_scroll.setVisible(True)
+
+    def _add_posts(self, posts):
+        """Tambah post ke grid (2 kolom), skip duplikat."""
+        archived = self.archive.archived(self.platform, [p.get("url") for p in posts if p.get("url")])
+        for post in posts:
+            key = post.get("url") or post.get("id")
+            if key in self._post_keys:
+                continue
+            self._post_keys.add(key)
+
             checkbox = QCheckBox()
-            checkbox.setChecked(True)
             checkbox.post_data = post
+            self._mark_archived(checkbox, post.get("url") in archived)
 
             title = _shorten(post.get("title", "Post"), 40)
+            if checkbox.archived:
+                title = "✓ " + title
             label = QLabel(title)
             label.setWordWrap(True)
 
+            i = len(self.post_checkboxes)
             row = i // 2
             col = (i % 2) * 2
 
-            content_layout.addWidget(checkbox, row, col)
-            content_layout.addWidget(label, row, col + 1)
+            self._posts_layout.addWidget(checkbox, row, col)
+            self._posts_layout.addWidget(label, row, col + 1)
 
             self.post_checkboxes.append(checkbox)
 
-        self.content_scroll.setWidget(content_widget)
-        self.content_scroll.setVisible(True)
-
-        self.download_btn.setVisible(True)
-        self.options_group.setVisible(False)
-        self._apply_responsive_rules()
+    def _mark_archived(self, checkbox, archived):
+        # Item yang sudah pernah didownload tidak dicentang (centang manual = download ulang)
+        checkbox.archived = archived
+        checkbox.setChecked(not archived)
+        if archived:
+            checkbox.setToolTip("Sudah pernah didownload")
 
     def show_stories(self, info):
         stories = info.get("stories", [])
@@ -759,53 +797,90 @@ class PlatformWidget(QWidget):
     def show_download_options(self, info):
         self.options_group.setVisible(True)
 
-        self.quality_combo.clear()
-        if isinstance(info, dict) and "formats" in info:
-            if hasattr(self, "audio_radio") and self.audio_radio.isChecked():
-                formats = info["formats"].get("audio", ["192kbps"])
-            else:
-                formats = info["formats"].get("video", ["720p"])
-            self.quality_combo.addItems(formats if formats else ["Best Quality"])
+        formats = info.get("formats") if isinstance(info, dict) else None
+        if hasattr(self, "audio_radio") and self.audio_radio.isChecked():
+            self._set_quality_items(formats, "audio", ["Best Quality"] if formats else ["320kbps", "192kbps", "128kbps"])
         else:
-            if hasattr(self, "audio_radio") and self.audio_radio.isChecked():
-                self.quality_combo.addItems(["320kbps", "192kbps", "128kbps"])
-            else:
-                self.quality_combo.addItems(["1080p", "720p", "480p", "360p"])
+            self._set_quality_items(formats, "video", ["Best Quality"] if formats else ["1080p", "720p", "480p", "360p"])
 
         self.download_btn.setVisible(True)
         self._apply_responsive_rules()
 
+    # -----------------------------
+    # Subscription
+    # -----------------------------
+    def _subscription_kind(self):
+        """Jenis sumber yang sedang ditampilkan (None jika bukan listing)"""
+        if hasattr(self, "post_checkboxes") and self.platform in ("Instagram", "TikTok"):
+            return PROFILE
+        if hasattr(self, "video_checkboxes"):
+            source = self._fetched_input or ""
+            if self.platform == "YouTube" and "list=" in source and "/@" not in source:
+                return PLAYLIST
+            return LISTING
+        return None
+
+    def _update_subscribe_button(self):
+        if not self._fetched_input or self._subscription_kind() is None:
+            self.subscribe_btn.setVisible(False)
+            return
+        subscribed = self.subscriptions.get(self.platform, self._fetched_input) is not None
+        self.subscribe_btn.setText("🔕 Unsubscribe" if subscribed else "🔔 Subscribe (download item baru otomatis)")
+        self.subscribe_btn.setVisible(True)
+
+    def toggle_subscription(self):
+        source = self._fetched_input
+        if not source:
+            return
+        if self.subscriptions.get(self.platform, source) is not None:
+            self.subscriptions.unsubscribe(self.platform, source)
+            self._update_subscribe_button()
+            return
+
+        kind = self._subscription_kind()
+        if kind == PROFILE:
+            items = [cb.post_data for cb in self.post_checkboxes]
+        else:
+            # Urut posisi di playlist
+            items = sorted((cb.video_data for cb in self.video_checkboxes), key=lambda v: v.get("index") or 0)
+
+        # Cursor = item terakhir (playlist) / semua id yang sudah terlihat (listing terbaru dulu;
+        # item pertama bisa post yang di-pin)
+        cursor_id, cursor_count, known_ids = None, 0, None
+        if items:
+            cursor_id = items[-1].get("id") if kind == PLAYLIST else items[0].get("id")
+            cursor_count = len(items)
+            if kind != PLAYLIST:
+                known_ids = [item.get("id") for item in items if item.get("id") is not None]
+
+        download_type = "audio" if hasattr(self, "audio_radio") and self.audio_radio.isChecked() else "video"
+        quality = self._selected_quality()
+        title = (self.current_info or {}).get("title") or (self.current_info or {}).get("username") or source
+        self.subscriptions.subscribe(
+            self.platform, source, kind, title=title,
+            output_path=self.config.get_download_folder(), quality=quality, download_type=download_type,
+            cursor_id=cursor_id, cursor_count=cursor_count, known_ids=known_ids
+        )
+        self._update_subscribe_button()
+        QMessageBox.information(self, "Subscribe",
+                                "Sumber ini akan dicek berkala; item baru otomatis masuk antrian download.")
+
     # -----------------------------
     # Download helpers
     # -----------------------------
-    def _call_playlist_with_fallback(self, urls, output_path, quality, download_type):
-        attempts = [
-            (urls, output_path, quality, download_type),
-            (urls, output_path, quality),
-            (urls, output_path),
-        ]
-        last_err = None
-        for args in attempts:
-            try:
-                return self.downloader.download_playlist(*args)
-            except TypeError as e:
-                last_err = e
-        raise last_err if last_err else TypeError("Signature downloader.download_playlist tidak cocok.")
-
-    def _call_single_with_fallback(self, url, output_path, quality, download_type, start_time=None, end_time=None):
-        attempts = [
-            (url, output_path, quality, download_type, None, start_time, end_time),
-            (url, output_path, quality, download_type),
-            (url, output_path, quality),
-            (url, output_path),
-        ]
-        last_err = None
-        for args in attempts:
-            try:
-                return self.downloader.download(*args)
-            except TypeError as e:
-                last_err = e
-        raise last_err if last_err else TypeError("Signature downloader.download tidak cocok.")
+    def _call_download(self, url, output_path, quality, download_type, start_time=None, end_time=None,
+                       info=None, progress_callback=None):
+        """downloader.download() dengan keyword yang diterima backend (signature tiap backend berbeda)
+
+        Dipilih dari signature, bukan dengan menangkap TypeError: TypeError dari
+        dalam download tetap diteruskan, bukan diulang tanpa info/trim/progress.
+        """
+        kwargs = {"quality": quality, "download_type": download_type, "start_time": start_time,
+                  "end_time": end_time, "info": info, "progress_callback": progress_callback}
+        params = inspect.signature(self.downloader.download).parameters
+        if not any(p.kind == inspect.Parameter.VAR_KEYWORD for p in params.values()):
+            kwargs = {key: value for key, value in kwargs.items() if key in params}
+        return self.downloader.download(url, output_path, **kwargs)
 
     def start_download(self):
         output_path = self.config.get_download_folder()
@@ -814,7 +889,7 @@ class PlatformWidget(QWidget):
         if hasattr(self, "audio_radio") and self.audio_radio.isChecked():
             download_type = "audio"
 
-        quality = self.quality_combo.currentText() if self.quality_combo.count() else "Best Quality"
+        quality = self._selected_quality()
 
         start_time = None
         end_time = None
@@ -837,24 +912,22 @@ class PlatformWidget(QWidget):
 
         if hasattr(self, "video_checkboxes"):
             urls = []
+            redownload = set()
             for cb in self.video_checkboxes:
                 if cb.isChecked() and getattr(cb, "video_data", None):
                     u = cb.video_data.get("url")
                     if u:
                         urls.append(u)
-
-            t = CallThread(self, "_download_playlist_wrapper", urls, output_path, quality, download_type)
-            self._keep_thread(t)
-            self.download_thread = t
-            t.result.connect(self.on_download_complete)
-            t.failed.connect(self.on_error)
-            t.start()
+                        if getattr(cb, "archived", False):
+                            redownload.add(u)
+            self._start_multi_download(urls, output_path, quality, download_type, redownload)
             return
 
         if hasattr(self, "post_checkboxes"):
-            urls = [cb.post_data.get("url") for cb in self.post_checkboxes if cb.isChecked() and getattr(cb, "post_data", None)]
-            urls = [u for u in urls if u]
-            self._start_multi_download(urls, output_path, quality, download_type)
+            checked = [cb for cb in self.post_checkboxes if cb.isChecked() and getattr(cb, "post_data", None)]
+            urls = [u for u in (cb.post_data.get("url") for cb in checked) if u]
+            redownload = {cb.post_data.get("url") for cb in checked if getattr(cb, "archived", False)}
+            self._start_multi_download(urls, output_path, quality, download_type, redownload)
             return
 
         if hasattr(self, "story_checkboxes"):
@@ -864,37 +937,118 @@ class PlatformWidget(QWidget):
             return
 
         url = self.url_input.text().strip()
-        t = CallThread(self, "_download_single_wrapper", url, output_path, quality, download_type, start_time, end_time)
-        self._keep_thread(t)
-        self.download_thread = t
-        t.result.connect(self.on_download_complete)
-        t.failed.connect(self.on_error)
-        t.start()
-
-    def _download_single_wrapper(self, url, output_path, quality, download_type, start_time, end_time):
-        return self._call_single_with_fallback(url, output_path, quality, download_type, start_time, end_time)
-
-    def _download_playlist_wrapper(self, urls, output_path, quality, download_type):
-        return self._call_playlist_with_fallback(urls, output_path, quality, download_type)
+        job_id = self.job_queue.enqueue(self.platform, url, output_path, quality, download_type,
+                                        start_time, end_time, priority=PRIORITY_SINGLE)
+        # Pakai ulang metadata dari Fetch Info jika URL belum diganti
+        if url == self._fetched_input and self.current_info:
+            self._job_infos[job_id] = self.current_info
+        self._start_queue_runner()
+
+    def _run_job(self, job):
+        """Dipanggil JobScheduler (worker thread) untuk satu job"""
+        last_saved = [0.0]
+
+        def on_progress(d):
+            # Simpan byte yang sudah didownload (maks. 1x per detik)
+            if not isinstance(d, dict) or not d.get("downloaded_bytes"):
+                return
+            now = time.monotonic()
+            if now - last_saved[0] < 1.0 and d.get("status") != "finished":
+                return
+            last_saved[0] = now
+            total = d.get("total_bytes") or d.get("total_bytes_estimate")
+            try:
+                self.job_queue.update_progress(job["id"], d["downloaded_bytes"], int(total) if total else None)
+            except Exception as e:
+                print(f"Job progress error: {e}")
+
+        result = self._call_download(
+            job["url"], job["output_path"], job["quality"], job["download_type"],
+            job["start_time"], job["end_time"],
+            info=self._job_infos.pop(job["id"], None), progress_callback=on_progress
+        )
+        if isinstance(result, dict) and result.get("postprocess") is not None:
+            # Dicatat setelah post-processing selesai (file final)
+            result["postprocess"].add_done_callback(lambda f: self._archive_result(job, f))
+        elif isinstance(result, dict) and result.get("success"):
+            self.archive.add(self.platform, job["url"], result.get("file_path"), result.get("title"))
+        return result
+
+    def _archive_result(self, job, future):
+        try:
+            result = future.result()
+        except Exception:
+            return
+        if isinstance(result, dict) and result.get("success"):
+            self.archive.add(self.platform, job["url"], result.get("file_path"), result.get("title"))
 
-    def _start_multi_download(self, urls, output_path, quality, download_type):
+    def _start_multi_download(self, urls, output_path, quality, download_type, redownload=()):
+        """Enqueue batch; item yang sudah ada di archive di-skip kecuali dipilih ulang (redownload)"""
         if not urls:
             self.on_error("Tidak ada item yang dipilih untuk di-download.")
             return
 
+        new = set(self.archive.filter_new(self.platform, [u for u in urls if u not in redownload]))
+        skipped = [u for u in urls if u not in redownload and u not in new]
+        urls = [u for u in urls if u in redownload or u in new]
+        if not urls:
+            self.progress_group.setVisible(False)
+            self.download_btn.setEnabled(True)
+            self.fetch_btn.setEnabled(True)
+            QMessageBox.information(self, "Info", f"Semua {len(skipped)} item sudah pernah didownload.")
+            return
+
         self.progress_bar.setRange(0, len(urls))
         self.progress_bar.setValue(0)
-        self.status_label.setText("Preparing multiple download...")
+        self.status_label.setText("Preparing multiple download..." if not skipped else
+                                  f"Preparing multiple download... ({len(skipped)} sudah didownload, di-skip)")
+
+        self.job_queue.enqueue_many(self.platform, urls, output_path, quality, download_type,
+                                    priority=PRIORITY_BATCH)
+        self._start_queue_runner()
 
-        t = MultiDownloadThread(self.downloader, urls, output_path, quality=quality, download_type=download_type)
+    def _start_queue_runner(self):
+        # Runner yang masih berjalan akan mengambil job baru dari queue
+        t = self.multi_thread
+        try:
+            if t is not None and t.isRunning():
+                return
+        except RuntimeError:
+            pass
+
+        # mp3 (re-encode) atau audio asli tanpa transcode, sesuai Settings
+        self.downloader.audio_format = self.config.get("audio_format", "mp3")
+
+        t = MultiDownloadThread(self.job_queue, self.platform, self._run_job,
+                                max_workers=self.config.get_concurrency(self.platform))
         self._keep_thread(t)
         self.multi_thread = t
+        self.download_thread = t
 
         t.progress.connect(self.on_multi_progress)
         t.done.connect(self.on_download_complete)
         t.failed.connect(self.on_error)
+        t.finished.connect(lambda: self._on_runner_finished(t))
         t.start()
 
+    def _on_runner_finished(self, t):
+        # Job yang masuk saat runner hampir selesai
+        if not t._abort and self.job_queue.pending_count(self.platform):
+            self.resume_jobs()
+
+    def resume_jobs(self):
+        """Jalankan lagi job pending (mis. dari sesi sebelumnya)"""
+        pending = self.job_queue.pending_count(self.platform)
+        if not pending:
+            return
+        self.progress_group.setVisible(True)
+        self.progress_bar.setRange(0, pending)
+        self.progress_bar.setValue(0)
+        self.status_label.setText(f"Melanjutkan {pending} download tertunda...")
+        self.download_btn.setEnabled(False)
+        self.fetch_btn.setEnabled(False)
+        self._start_queue_runner()
+
     @pyqtSlot(int, int, str)
     def on_multi_progress(self, done, total, text):
         self.progress_bar.setRange(0, total)
@@ -912,29 +1066,35 @@ class PlatformWidget(QWidget):
         self.download_btn.setEnabled(True)
         self.fetch_btn.setEnabled(True)
 
-        if isinstance(result, dict) and "results" in result:
-            for r in result["results"]:
-                if r.get("success"):
-                    self.history.add_entry(
-                        platform=self.platform,
-                        title=r.get("title", "Unknown"),
-                        url=r.get("url", ""),
-                        file_path=r.get("file_path", ""),
-                        thumbnail=r.get("thumbnail"),
-                        item_count=1
-                    )
-        else:
-            self.history.add_entry(
-                platform=self.platform,
-                title=(result.get("title", "Unknown") if isinstance(result, dict) else "Unknown"),
-                url=self.url_input.text(),
-                file_path=(result.get("file_path", "") if isinstance(result, dict) else ""),
-                thumbnail=(result.get("thumbnail") if isinstance(result, dict) else None),
-                item_count=(result.get("count", 1) if isinstance(result, dict) else 1)
-            )
-
+        results = result.get("results", []) if isinstance(result, dict) else []
+        # Satu transaksi untuk seluruh batch
+        self.history.add_entries([
+            {
+                "platform": self.platform,
+                "title": r.get("title", "Unknown"),
+                "url": r.get("url", ""),
+                "file_path": r.get("file_path", ""),
+                "thumbnail": r.get("thumbnail"),
+                "item_count": r.get("count", 1),
+                "quality": quality_label(r.get("quality"), r.get("download_type")),
+            }
+            for r in results if r.get("success")
+        ])
+
+        failed = [r for r in results if not r.get("success")]
+        if len(results) == 1:
+            # Satu item: tampilkan seperti download tunggal
+            result = results[0]
         self.download_complete.emit(result if isinstance(result, dict) else {"result": result})
-        QMessageBox.information(self, "Success", "Download selesai!")
+
+        if failed:
+            QMessageBox.warning(
+                self, "Selesai",
+                f"{len(results) - len(failed)}/{len(results)} download berhasil.\n"
+                f"Error: {_shorten(failed[0].get('error', ''), 200)}"
+            )
+        else:
+            QMessageBox.information(self, "Success", "Download selesai!")
 
     @pyqtSlot(str)
     def on_error(self, error_msg):
@@ -948,27 +1108,20 @@ class PlatformWidget(QWidget):
     # -----------------------------
     # Cleanup (guard RuntimeError)
     # -----------------------------
-    def closeEvent(self, event):
-        try:
-            t = getattr(self, "_thumb_thread", None)
-            if t is not None:
+    def abort_downloads(self):
+        """Hentikan runner; job yang belum selesai tetap tersimpan di queue"""
+        for t in list(self._threads):
+            if isinstance(t, MultiDownloadThread):
                 try:
                     if t.isRunning():
-                        try:
-                            t.abort()
-                        except Exception:
-                            pass
+                        t.abort()
                 except RuntimeError:
                     pass
-            self._thumb_thread = None
-
-            for t in list(self._threads):
-                if isinstance(t, MultiDownloadThread):
-                    try:
-                        if t.isRunning():
-                            t.abort()
-                    except RuntimeError:
-                        pass
+
+    def closeEvent(self, event):
+        try:
+            self._thumb_url = None
+            self.abort_downloads()
         except Exception:
             pass
         super().closeEvent(event)
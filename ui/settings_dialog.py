@@ -3,9 +3,12 @@ Settings Dialog - Dialog untuk pengaturan aplikasi
 """
 from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QLineEdit, QFileDialog, QComboBox,
-                             QGroupBox, QMessageBox)
+                             QGroupBox, QMessageBox, QSpinBox, QGridLayout, QCheckBox)
 from PyQt5.QtCore import Qt
 
+from utils.config import (DEFAULT_CONCURRENCY, MAX_CONCURRENCY,
+                          DEFAULT_STALL_MIN_SPEED, DEFAULT_STALL_WINDOW)
+
 
 class SettingsDialog(QDialog):
     """Dialog untuk settings aplikasi"""
@@ -99,8 +102,71 @@ class SettingsDialog(QDialog):
         audio_layout.addStretch()
         quality_layout.addLayout(audio_layout)
         
+        format_layout = QHBoxLayout()
+        format_layout.addWidget(QLabel("Audio Format:"))
+        
+        self.audio_format_combo = QComboBox()
+        self.audio_format_combo.addItem("MP3 (re-encode)", 'mp3')
+        self.audio_format_combo.addItem("Original (m4a/opus, tanpa re-encode)", 'original')
+        self.audio_format_combo.setMinimumWidth(150)
+        format_layout.addWidget(self.audio_format_combo)
+        
+        format_layout.addStretch()
+        quality_layout.addLayout(format_layout)
+        
         layout.addWidget(quality_group)
         
+        # Concurrent downloads section
+        concurrency_group = QGroupBox("Concurrent Downloads")
+        concurrency_layout = QGridLayout(concurrency_group)
+        
+        concurrency_desc = QLabel("Jumlah item yang di-download bersamaan (playlist / banyak post):")
+        concurrency_desc.setWordWrap(True)
+        concurrency_layout.addWidget(concurrency_desc, 0, 0, 1, 4)
+        
+        self.concurrency_spins = {}
+        for i, platform in enumerate(DEFAULT_CONCURRENCY):
+            spin = QSpinBox()
+            spin.setRange(1, MAX_CONCURRENCY)
+            row = 1 + i // 2
+            col = (i % 2) * 2
+            concurrency_layout.addWidget(QLabel(f"{platform}:"), row, col)
+            concurrency_layout.addWidget(spin, row, col + 1)
+            self.concurrency_spins[platform] = spin
+        
+        layout.addWidget(concurrency_group)
+        
+        # Fetch info section
+        fetch_group = QGroupBox("Fetch Info")
+        fetch_layout = QVBoxLayout(fetch_group)
+        
+        self.hedged_check = QCheckBox("Hedged fetch: jalankan sumber cadangan paralel jika sumber utama lambat")
+        fetch_layout.addWidget(self.hedged_check)
+        
+        layout.addWidget(fetch_group)
+        
+        # Stall watchdog section
+        stall_group = QGroupBox("Transfer Macet")
+        stall_layout = QGridLayout(stall_group)
+        
+        stall_desc = QLabel("Download di-restart (dilanjutkan) jika kecepatannya di bawah batas selama window:")
+        stall_desc.setWordWrap(True)
+        stall_layout.addWidget(stall_desc, 0, 0, 1, 4)
+        
+        self.stall_speed_spin = QSpinBox()
+        self.stall_speed_spin.setRange(1, 10000)
+        self.stall_speed_spin.setSuffix(" KB/s")
+        stall_layout.addWidget(QLabel("Batas:"), 1, 0)
+        stall_layout.addWidget(self.stall_speed_spin, 1, 1)
+        
+        self.stall_window_spin = QSpinBox()
+        self.stall_window_spin.setRange(10, 600)
+        self.stall_window_spin.setSuffix(" detik")
+        stall_layout.addWidget(QLabel("Window:"), 1, 2)
+        stall_layout.addWidget(self.stall_window_spin, 1, 3)
+        
+        layout.addWidget(stall_group)
+        
         layout.addStretch()
         
         # Buttons
@@ -133,6 +199,16 @@ class SettingsDialog(QDialog):
         
         self.video_quality_combo.setCurrentText(video_quality)
         self.audio_quality_combo.setCurrentText(audio_quality)
+        
+        index = self.audio_format_combo.findData(self.config.get('audio_format', 'mp3'))
+        self.audio_format_combo.setCurrentIndex(max(index, 0))
+        
+        for platform, spin in self.concurrency_spins.items():
+            spin.setValue(self.config.get_concurrency(platform))
+        
+        self.hedged_check.setChecked(bool(self.config.get('hedged_fetch', False)))
+        self.stall_speed_spin.setValue(int(self.config.get('stall_min_speed_kbps', DEFAULT_STALL_MIN_SPEED)))
+        self.stall_window_spin.setValue(int(self.config.get('stall_window', DEFAULT_STALL_WINDOW)))
     
     def browse_folder(self):
         """Browse folder untuk download"""
@@ -161,6 +237,12 @@ class SettingsDialog(QDialog):
         
         self.config.set('default_quality', self.video_quality_combo.currentText())
         self.config.set('default_audio_quality', self.audio_quality_combo.currentText())
+        self.config.set('audio_format', self.audio_format_combo.currentData())
+        self.config.set('max_concurrent_downloads',
+                        {platform: spin.value() for platform, spin in self.concurrency_spins.items()})
+        self.config.set('hedged_fetch', self.hedged_check.isChecked())
+        self.config.set('stall_min_speed_kbps', self.stall_speed_spin.value())
+        self.config.set('stall_window', self.stall_window_spin.value())
         
         QMessageBox.information(self, "Success", "Settings berhasil disimpan!")
         self.accept()
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Thumbnail Service
+Satu loader thumbnail bersama untuk preview (PlatformWidget) dan tab History.
+- Memory: LRU QImage hasil decode, dibatasi jumlah byte (MEMORY_BYTES)
+- Disk: ThumbnailCache (file per URL + revalidasi ETag/Last-Modified);
+  thumbnail yang sudah pernah dilihat tidak di-download lagi
+- Request untuk URL yang sama selagi masih diproses digabung (satu fetch)
+- Worker sendiri yang kecil (THUMB_WORKERS), terpisah dari pool download;
+  antrean LIFO terbatas: yang terakhir diminta (baris yang terlihat) dulu
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QImage
+
+from utils import ThumbnailCache
+
+
+MEMORY_BYTES = 32 * 1024 * 1024
+THUMB_WORKERS = 2
+# URL yang menunggu worker; yang terlama dibuang (diminta lagi saat di-paint ulang)
+QUEUE_SIZE = 64
+
+# Gambar di-decode paling besar ukuran ini (preview maksimal ~520 px)
+MAX_WIDTH = 640
+MAX_HEIGHT = 480
+
+
+def _decode(data):
+    image = QImage()
+    if not image.loadFromData(data):
+        return None
+    if image.width() > MAX_WIDTH or image.height() > MAX_HEIGHT:
+        image = image.scaled(MAX_WIDTH, MAX_HEIGHT, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return image
+
+
+class ThumbnailService(QObject):
+    ready = pyqtSignal(str, QImage)   # url, gambar (bisa dikirim ulang jika berubah saat revalidasi)
+    failed = pyqtSignal(str, str)     # url, pesan error
+    _loaded = pyqtSignal(str, object, str)  # dari worker: url, QImage/None, error
+    _done = pyqtSignal(str)
+
+    def __init__(self, cache=None, parent=None):
+        super().__init__(parent)
+        self.cache = cache if cache is not None else ThumbnailCache()
+        self._images = OrderedDict()  # url -> QImage (LRU)
+        self._bytes = 0
+        self._queue = OrderedDict()   # url menunggu worker, terbaru di akhir
+        self._inflight = set()        # url di queue atau sedang diproses worker
+        self._running = 0
+        self._pool = ThreadPoolExecutor(max_workers=THUMB_WORKERS, thread_name_prefix='thumbnail')
+        self._loaded.connect(self._on_loaded)
+        self._done.connect(self._on_done)
+
+    def request(self, url):
+        """QImage jika ada di memory; jika belum, dijadwalkan (hasil lewat ready/failed)"""
+        if not url:
+            return None
+        image = self._images.get(url)
+        if image is not None:
+            self._images.move_to_end(url)
+            return image
+
+        if url in self._queue:
+            self._queue.move_to_end(url)
+        elif url not in self._inflight:
+            self._inflight.add(url)
+            self._queue[url] = True
+            while len(self._queue) > QUEUE_SIZE:
+                dropped, _ = self._queue.popitem(last=False)
+                self._inflight.discard(dropped)
+        self._start_workers()
+        return None
+
+    def _start_workers(self):
+        while self._queue and self._running < THUMB_WORKERS:
+            url, _ = self._queue.popitem(last=True)
+            self._running += 1
+            self._pool.submit(self._load, url)
+
+    def _load(self, url):
+        """Worker: disk dulu, network hanya jika belum ada / sudah waktunya revalidasi"""
+        try:
+            data, stale = self.cache.load(url)
+            if data is not None:
+                self._emit_image(url, data)
+                if stale:
+                    self._revalidate(url)
+                return
+            self._emit_image(url, self.cache.fetch(url))
+        except Exception as e:
+            self._loaded.emit(url, None, str(e) or type(e).__name__)
+        finally:
+            self._done.emit(url)
+
+    def _emit_image(self, url, data):
+        image = _decode(data or b'')
+        self._loaded.emit(url, image, '' if image is not None else "Thumbnail tidak valid")
+
+    def _revalidate(self, url):
+        # Data lama sudah tampil; hanya dikirim ulang jika server memberi versi baru
+        try:
+            data = self.cache.fetch(url)
+        except Exception as e:
+            print(f"Thumbnail revalidate error: {e}")
+            return
+        image = _decode(data) if data is not None else None
+        if image is not None:
+            self._loaded.emit(url, image, '')
+
+    @pyqtSlot(str)
+    def _on_done(self, url):
+        self._running -= 1
+        self._inflight.discard(url)
+        self._start_workers()
+
+    @pyqtSlot(str, object, str)
+    def _on_loaded(self, url, image, error):
+        if image is None:
+            self.failed.emit(url, error)
+            return
+
+        old = self._images.pop(url, None)
+        if old is not None:
+            self._bytes -= old.sizeInBytes()
+        self._images[url] = image
+        self._bytes += image.sizeInBytes()
+        while self._bytes > MEMORY_BYTES and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self._bytes -= evicted.sizeInBytes()
+        self.ready.emit(url, image)
+
+    def shutdown(self):
+        self._queue.clear()
+        self._pool.shutdown(wait=False)
@@ -1,4 +1,9 @@
+from .archive import DownloadArchive
 from .config import ConfigManager
 from .history import HistoryManager
+from .job_queue import JobQueue, JobScheduler
+from .subscriptions import SubscriptionStore
+from .thumb_cache import ThumbnailCache
 
-__all__ = ['ConfigManager', 'HistoryManager']
\ No newline at end of file
+__all__ = ['ConfigManager', 'DownloadArchive', 'HistoryManager', 'JobQueue', 'JobScheduler', 'SubscriptionStore',
+           'ThumbnailCache']
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Download Archive
+Index item yang sudah pernah didownload: (platform, media id) -> file.
+- Diisi dari setiap download yang berhasil
+- Dicek sebelum item playlist/profil masuk queue, jadi sync ulang hanya mengambil item baru
+- Lookup O(1) lewat set di memori (dimuat sekali per platform dari SQLite)
+"""
+import re
+import threading
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from .db import connect
+
+
+# Pola media id per platform (group 1); URL lain memakai URL yang dinormalisasi
+ID_PATTERNS = {
+    'YouTube': [r'[?&]v=([\w-]{11})', r'youtu\.be/([\w-]{11})', r'/(?:shorts|embed|live)/([\w-]{11})'],
+    'Instagram': [r'/(?:p|reel|reels|tv)/([\w-]+)'],
+    'TikTok': [r'/(?:video|photo)/(\d+)'],
+    'Facebook': [r'[?&](?:v|story_fbid)=(\d+)', r'/(?:videos|reel|watch)/(?:[^/?#]+/)?(\d+)'],
+}
+
+# Parameter query tracking/share (tidak menentukan media); selain ini (dan utm_*) ikut jadi id
+IGNORED_PARAMS = {'si', 'feature', 'fbclid', 'igshid', 'igsh', 'mibextid', 'ref',
+                  'is_from_webapp', 'sender_device'}
+
+
+def _significant_query(query):
+    """Query string yang menentukan media, urut supaya urutan parameter tidak berpengaruh"""
+    params = [(key, value) for key, value in parse_qsl(query, keep_blank_values=True)
+              if key.lower() not in IGNORED_PARAMS and not key.lower().startswith('utm_')]
+    return urlencode(sorted(params))
+
+
+def media_id_from_url(platform, url):
+    """Media id dari URL (mis. video id YouTube, shortcode Instagram)"""
+    url = (url or '').strip()
+    for pattern in ID_PATTERNS.get(platform, []):
+        match = re.search(pattern, url)
+        if match:
+            return match.group(1)
+
+    if '://' not in url:
+        return url.lstrip('@').lower()
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    # Mis. playlist?list=...: id ada di query
+    query = _significant_query(parts.query)
+    return f"{host}{parts.path.rstrip('/')}" + (f"?{query}" if query else '')
+
+
+class DownloadArchive:
+    def __init__(self, db_file="archive.db"):
+        self.conn = connect(db_file)
+        self._lock = threading.Lock()
+        self._ids = {}  # platform -> set media id
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS archive (
+                    platform TEXT NOT NULL,
+                    media_id TEXT NOT NULL,
+                    url TEXT,
+                    file_path TEXT,
+                    title TEXT,
+                    downloaded_at TEXT NOT NULL,
+                    PRIMARY KEY (platform, media_id)
+                ) WITHOUT ROWID
+            """)
+
+    def _platform_ids(self, platform):
+        # Dipanggil dengan lock
+        ids = self._ids.get(platform)
+        if ids is None:
+            rows = self.conn.execute("SELECT media_id FROM archive WHERE platform = ?", (platform,))
+            ids = self._ids[platform] = {row[0] for row in rows}
+        return ids
+
+    def contains(self, platform, url):
+        with self._lock:
+            return media_id_from_url(platform, url) in self._platform_ids(platform)
+
+    def archived(self, platform, urls):
+        """Subset urls yang sudah ada di archive"""
+        with self._lock:
+            ids = self._platform_ids(platform)
+            return {url for url in urls if media_id_from_url(platform, url) in ids}
+
+    def filter_new(self, platform, urls):
+        """urls yang belum pernah didownload (urutan dipertahankan)"""
+        done = self.archived(platform, urls)
+        return [url for url in urls if url not in done]
+
+    def add(self, platform, url, file_path=None, title=None):
+        self.add_many(platform, [(url, file_path, title)])
+
+    def add_many(self, platform, items):
+        """Catat banyak item (url, file_path, title) dalam satu transaksi"""
+        now = datetime.now().isoformat()
+        rows = [(platform, media_id_from_url(platform, url), url, file_path, title, now)
+                for url, file_path, title in items if url]
+        if not rows:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO archive (platform, media_id, url, file_path, title, downloaded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._platform_ids(platform).update(row[1] for row in rows)
+
+    def remove(self, platform, url):
+        media_id = media_id_from_url(platform, url)
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM archive WHERE platform = ? AND media_id = ?", (platform, media_id))
+            self._platform_ids(platform).discard(media_id)
+
+    def count(self, platform=None):
+        query = "SELECT COUNT(*) FROM archive"
+        params = []
+        if platform:
+            query += " WHERE platform = ?"
+            params.append(platform)
+        with self._lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def import_history(self, entries):
+        """Isi archive dari entry histori lama (dipanggil saat archive masih kosong)"""
+        by_platform = {}
+        for entry in entries:
+            if entry.get('platform') and entry.get('url'):
+                by_platform.setdefault(entry['platform'], []).append(
+                    (entry['url'], entry.get('file_path'), entry.get('title')))
+        for platform, items in by_platform.items():
+            self.add_many(platform, items)
@@ -7,6 +7,20 @@ import os
 from pathlib import Path
 
 
+# Default jumlah download paralel per platform
+DEFAULT_CONCURRENCY = {
+    'YouTube': 3,
+    'Instagram': 2,
+    'TikTok': 3,
+    'Facebook': 2,
+}
+MAX_CONCURRENCY = 8
+
+# Watchdog transfer: macet jika di bawah N KB/s selama window detik
+DEFAULT_STALL_WINDOW = 60
+DEFAULT_STALL_MIN_SPEED = 10
+
+
 class ConfigManager:
     def __init__(self):
         self.config_file = Path.home() / ".media_downloader" / "config.json"
@@ -27,7 +41,12 @@ class ConfigManager:
             'download_folder': str(Path.home() / "Downloads" / "MediaDownloader"),
             'theme': 'dark',
             'default_quality': '720p',
-            'default_audio_quality': '192kbps'
+            'default_audio_quality': '192kbps',
+            'audio_format': 'mp3',
+            'max_concurrent_downloads': dict(DEFAULT_CONCURRENCY),
+            'hedged_fetch': False,
+            'stall_window': DEFAULT_STALL_WINDOW,
+            'stall_min_speed_kbps': DEFAULT_STALL_MIN_SPEED
         }
     
     def save_config(self):
@@ -49,6 +68,15 @@ class ConfigManager:
         self.config[key] = value
         self.save_config()
     
+    def get_concurrency(self, platform):
+        """Jumlah download paralel untuk platform (1..MAX_CONCURRENCY)"""
+        values = self.config.get('max_concurrent_downloads') or {}
+        try:
+            value = int(values.get(platform, DEFAULT_CONCURRENCY.get(platform, 1)))
+        except (TypeError, ValueError):
+            value = DEFAULT_CONCURRENCY.get(platform, 1)
+        return max(1, min(MAX_CONCURRENCY, value))
+    
     def get_download_folder(self):
         """Ambil folder download dan buat jika belum ada"""
         folder = self.config.get('download_folder')
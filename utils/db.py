@@ -0,0 +1,21 @@
+"""
+SQLite Helper
+Koneksi SQLite (WAL) untuk data aplikasi di ~/.media_downloader
+"""
+import sqlite3
+from pathlib import Path
+
+
+DATA_DIR = Path.home() / ".media_downloader"
+
+
+def connect(filename):
+    """Buka database di DATA_DIR (bisa dipakai dari beberapa thread, gunakan lock)"""
+    path = DATA_DIR / filename
+    path.parent.mkdir(exist_ok=True)
+
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
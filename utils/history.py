@@ -1,42 +1,159 @@
 """
 History Manager
-Mengelola riwayat download
+Mengelola riwayat download (SQLite, WAL)
+- Index timestamp / platform / url: get_history(limit) = query ber-index, bukan baca seluruh file
+- Insert batch dalam satu transaksi (satu commit per batch download)
+- Tanpa batas jumlah entry
+- history.json lama dimigrasikan sekali saat pertama dijalankan
+- add_entries / delete_entries mengembalikan delta (entry baru / id terhapus)
+  untuk update UI incremental
+- search(): full-text (FTS5) atas judul, URL, platform, kualitas dan tanggal,
+  plus filter platform / rentang tanggal; fallback LIKE jika SQLite tanpa FTS5
+- Urutan id = urutan waktu (entry baru selalu di-insert paling akhir, migrasi
+  urut timestamp): semua query "terbaru dulu" memakai id DESC
 """
 import json
-from pathlib import Path
-from datetime import datetime
+import re
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+from .db import DATA_DIR, connect
+
+
+COLUMNS = ('timestamp', 'platform', 'title', 'url', 'file_path', 'thumbnail',
+           'duration', 'item_count', 'quality')
+
+# Kolom yang dicari; 'date' = bagian tanggal timestamp (YYYY-MM-DD)
+SEARCH_COLUMNS = ('title', 'url', 'platform', 'quality', 'date')
+
+
+def search_terms(query):
+    """Kata dalam query pencarian (lowercase, tanpa tanda baca)"""
+    return re.findall(r'\w+', (query or '').lower())
+
+
+def quality_label(quality, download_type=None):
+    """Nilai kolom quality: '720p' (video) / 'audio 128kbps' (audio); None jika tidak diketahui"""
+    parts = ['audio'] if download_type == 'audio' else []
+    if quality:
+        parts.append(str(quality))
+    return ' '.join(parts) or None
+
+
+def _day(value):
+    """date / 'YYYY-MM-DD' / ISO datetime -> date (None jika kosong)"""
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
 
 
 class HistoryManager:
-    def __init__(self):
-        self.history_file = Path.home() / ".media_downloader" / "history.json"
-        self.history_file.parent.mkdir(exist_ok=True)
-        self.history = self.load_history()
-    
-    def load_history(self):
-        """Load histori dari file"""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
-        return []
-    
-    def save_history(self):
-        """Simpan histori ke file"""
+    def __init__(self, db_file="history.db"):
+        self.history_file = DATA_DIR / "history.json"  # format lama (migrasi)
+        self.conn = connect(db_file)
+        self._lock = threading.Lock()
+        self.fts = False
+        self._create_tables()
+        self._create_search_index()
+        self._migrate_json()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    platform TEXT,
+                    title TEXT,
+                    url TEXT,
+                    file_path TEXT,
+                    thumbnail TEXT,
+                    duration INTEGER,
+                    item_count INTEGER NOT NULL DEFAULT 1,
+                    quality TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_platform ON history (platform, timestamp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_url ON history (url)")
+
+    def _create_search_index(self):
+        """Tabel FTS5 yang diisi trigger; dibangun sekali dari data lama saat baru dibuat"""
+        columns = ', '.join(SEARCH_COLUMNS)
+        values = "new.id, new.title, new.url, new.platform, new.quality, substr(new.timestamp, 1, 10)"
         try:
-            with open(self.history_file, 'w') as f:
-                json.dump(self.history, f, indent=4)
-            return True
+            with self._lock, self.conn:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_fts'"
+                ).fetchone()
+                # Index prefix 2/3 huruf: kata yang baru diketik sebagian tetap cepat
+                self.conn.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5({columns}, prefix='2 3')"
+                )
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+                        INSERT INTO history_fts (rowid, {columns}) VALUES ({values});
+                    END
+                """)
+                self.conn.execute("""
+                    CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+                        DELETE FROM history_fts WHERE rowid = old.id;
+                    END
+                """)
+                self.conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS history_fts_update AFTER UPDATE ON history BEGIN
+                        DELETE FROM history_fts WHERE rowid = old.id;
+                        INSERT INTO history_fts (rowid, {columns}) VALUES ({values});
+                    END
+                """)
+                if not exists:
+                    self.conn.execute(
+                        f"INSERT INTO history_fts (rowid, {columns}) SELECT id, title, url, platform, quality,"
+                        " substr(timestamp, 1, 10) FROM history"
+                    )
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            # SQLite tanpa FTS5: search() memakai LIKE
+            print(f"History search index error: {e}")
+
+    def _migrate_json(self):
+        """Pindahkan history.json ke database (sekali; file lama di-rename)"""
+        if not self.history_file.exists():
+            return
+        try:
+            with open(self.history_file, 'r') as f:
+                entries = json.load(f)
         except Exception as e:
-            print(f"Error saving history: {e}")
-            return False
-    
-    def add_entry(self, platform, title, url, file_path, thumbnail=None, 
+            print(f"History migration error: {e}")
+            entries = []
+
+        if isinstance(entries, list) and entries:
+            # Insert dari yang terlama (urut timestamp, bukan urutan file) supaya id = urutan waktu;
+            # entry tanpa timestamp mendapat waktu sekarang -> paling akhir
+            entries = [e for e in reversed(entries) if isinstance(e, dict)]
+            entries.sort(key=lambda e: str(e.get('timestamp') or '\uffff'))
+            self.add_entries(entries)
+        try:
+            self.history_file.replace(self.history_file.with_suffix('.json.migrated'))
+        except OSError as e:
+            print(f"History migration error: {e}")
+
+    @staticmethod
+    def _row(entry):
+        row = {key: entry.get(key) for key in COLUMNS}
+        row['timestamp'] = row['timestamp'] or datetime.now().isoformat()
+        row['item_count'] = row['item_count'] or 1
+        return tuple(row[key] for key in COLUMNS)
+
+    def add_entry(self, platform, title, url, file_path, thumbnail=None,
                   duration=None, item_count=1, quality=None):
         """Tambah entry baru ke histori"""
-        entry = {
+        self.add_entries([{
             'timestamp': datetime.now().isoformat(),
             'platform': platform,
             'title': title,
@@ -46,22 +163,129 @@ class HistoryManager:
             'duration': duration,
             'item_count': item_count,
             'quality': quality
-        }
-        self.history.insert(0, entry)  # Tambah di awal
-        
-        # Batasi histori maksimal 100 item
-        if len(self.history) > 100:
-            self.history = self.history[:100]
-        
-        self.save_history()
-    
-    def get_history(self, limit=None):
-        """Ambil histori"""
+        }])
+
+    def add_entries(self, entries):
+        """Tambah banyak entry (dict seperti add_entry) dalam satu transaksi
+
+        Return entry yang disimpan (dengan id), urutan sesuai input.
+        """
+        rows = [self._row(entry) for entry in entries]
+        if not rows:
+            return []
+        query = f"INSERT INTO history ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        added = []
+        with self._lock, self.conn:
+            for row in rows:
+                cursor = self.conn.execute(query, row)
+                added.append({'id': cursor.lastrowid, **dict(zip(COLUMNS, row))})
+        return added
+
+    def get_history(self, limit=None, offset=0):
+        """Ambil histori, terbaru dulu"""
+        query = "SELECT * FROM history ORDER BY id DESC"
+        params = []
         if limit:
-            return self.history[:limit]
-        return self.history
-    
+            query += " LIMIT ? OFFSET ?"
+            params = [limit, offset]
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def search(self, query=None, platform=None, date_from=None, date_to=None, limit=None, offset=0,
+               ids=None):
+        """Cari histori, terbaru dulu
+
+        query: kata-kata yang harus ada di judul/URL/platform/kualitas/tanggal;
+        kata terakhir cukup awalannya (search-as-you-type).
+        date_from / date_to: date atau 'YYYY-MM-DD', inklusif. Tanpa query sama
+        dengan get_history() yang difilter platform/tanggal.
+        ids: batasi ke entry ini (cek entry baru terhadap filter yang aktif).
+        """
+        where = []
+        params = []
+        if ids is not None:
+            ids = list(ids)
+            if not ids:
+                return []
+            where.append(f"h.id IN ({', '.join('?' * len(ids))})")
+            params.extend(ids)
+        if platform:
+            where.append("h.platform = ?")
+            params.append(platform)
+        day_from, day_to = _day(date_from), _day(date_to)
+        if day_from:
+            where.append("h.timestamp >= ?")
+            params.append(day_from.isoformat())
+        if day_to:
+            where.append("h.timestamp < ?")
+            params.append((day_to + timedelta(days=1)).isoformat())
+
+        terms = search_terms(query)
+        with self._lock:
+            if terms and self.fts:
+                # Urut rowid (= id) agar FTS5 bisa berhenti setelah LIMIT tanpa sort
+                match = ' AND '.join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+                if platform:
+                    # Facet platform ikut di MATCH: FTS5 hanya membaca entry platform itu,
+                    # bukan semua hasil teks lalu difilter (platform jarang = scan panjang)
+                    match += ' AND platform : "{}"'.format(platform.replace('"', '""'))
+                where.insert(0, "history_fts MATCH ?")
+                params.insert(0, match)
+                if day_from or day_to:
+                    # Rentang tanggal -> rentang id (dari index timestamp), dipakai FTS5 langsung
+                    date_where = [w for w in where if w.startswith("h.timestamp")]
+                    low, high = self.conn.execute(
+                        f"SELECT MIN(h.id), MAX(h.id) FROM history h WHERE {' AND '.join(date_where)}",
+                        params[-len(date_where):]
+                    ).fetchone()
+                    where.append("history_fts.rowid BETWEEN ? AND ?")
+                    params.extend([low or 0, high or 0])
+                sql = "SELECT h.* FROM history_fts JOIN history h ON h.id = history_fts.rowid"
+                order = " ORDER BY history_fts.rowid DESC"
+            else:
+                for term in terms:
+                    where.append("(" + " OR ".join(
+                        f"{column} LIKE ?" for column in
+                        ('h.title', 'h.url', 'h.platform', 'h.quality', 'substr(h.timestamp, 1, 10)')
+                    ) + ")")
+                    params.extend([f"%{term}%"] * 5)
+                sql = "SELECT h.* FROM history h"
+                order = " ORDER BY h.id DESC"
+
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += order
+            if limit:
+                sql += " LIMIT ? OFFSET ?"
+                params.extend([limit, offset])
+            rows = self.conn.execute(sql, params).fetchall()
+        return [dict(r) for r in rows]
+
+    def platforms(self):
+        """Platform yang ada di histori (untuk filter)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT DISTINCT platform FROM history WHERE platform IS NOT NULL ORDER BY platform"
+            ).fetchall()
+        return [r['platform'] for r in rows]
+
+    def count(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def delete_entries(self, entry_ids):
+        """Hapus entry berdasarkan id; return id yang benar-benar terhapus"""
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return []
+        placeholders = ', '.join('?' * len(entry_ids))
+        with self._lock, self.conn:
+            rows = self.conn.execute(f"SELECT id FROM history WHERE id IN ({placeholders})", entry_ids).fetchall()
+            self.conn.execute(f"DELETE FROM history WHERE id IN ({placeholders})", entry_ids)
+        return [r['id'] for r in rows]
+
     def clear_history(self):
         """Hapus semua histori"""
-        self.history = []
-        self.save_history()
\ No newline at end of file
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM history")
@@ -0,0 +1,321 @@
+"""
+Job Queue
+Antrian download persisten (SQLite) + scheduler yang menjalankan job per platform.
+- Job tetap ada walau aplikasi ditutup/crash; job 'running' dikembalikan ke 'pending' saat startup
+- Job 'done' tidak dijalankan ulang
+- Job gagal dicoba lagi setelah jeda yang makin panjang (not_before, exponential backoff)
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .db import connect
+
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+# Prioritas bawaan (lebih besar = lebih dulu)
+PRIORITY_SINGLE = 10
+PRIORITY_BATCH = 0
+
+MAX_ATTEMPTS = 3
+
+# Jeda sebelum percobaan ulang: RETRY_DELAY * 2^(attempt-1), maksimal RETRY_DELAY_MAX (detik)
+RETRY_DELAY = 10
+RETRY_DELAY_MAX = 600
+
+
+def retry_delay(attempts):
+    """Jeda sebelum percobaan berikutnya setelah attempts kali gagal"""
+    return min(RETRY_DELAY * 2 ** max(0, attempts - 1), RETRY_DELAY_MAX)
+
+
+class JobQueue:
+    def __init__(self, db_file="jobs.db"):
+        self.conn = connect(db_file)
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    output_path TEXT,
+                    quality TEXT,
+                    download_type TEXT,
+                    start_time INTEGER,
+                    end_time INTEGER,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    bytes_done INTEGER NOT NULL DEFAULT 0,
+                    bytes_total INTEGER,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    not_before REAL NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs (platform, state, priority DESC, id)"
+            )
+            columns = {r['name'] for r in self.conn.execute("PRAGMA table_info(jobs)")}
+            if 'not_before' not in columns:
+                self.conn.execute("ALTER TABLE jobs ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+
+    def _now(self):
+        return datetime.now().isoformat()
+
+    def _row(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        if job.get('result'):
+            try:
+                job['result'] = json.loads(job['result'])
+            except ValueError:
+                job['result'] = None
+        return job
+
+    def enqueue(self, platform, url, output_path, quality=None, download_type=None,
+                start_time=None, end_time=None, priority=PRIORITY_BATCH):
+        """Tambah satu job, return id job"""
+        return self.enqueue_many(platform, [url], output_path, quality, download_type,
+                                 start_time, end_time, priority)[0]
+
+    def enqueue_many(self, platform, urls, output_path, quality=None, download_type=None,
+                     start_time=None, end_time=None, priority=PRIORITY_BATCH):
+        """Tambah banyak job dalam satu transaksi, return list id job"""
+        now = self._now()
+        ids = []
+        with self._lock, self.conn:
+            for url in urls:
+                cur = self.conn.execute(
+                    "INSERT INTO jobs (platform, url, output_path, quality, download_type, start_time, end_time,"
+                    " priority, state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (platform, url, output_path, quality, download_type, start_time, end_time,
+                     priority, PENDING, now, now)
+                )
+                ids.append(cur.lastrowid)
+        return ids
+
+    def claim_next(self, platform):
+        """Ambil job pending (yang jeda retry-nya sudah lewat) dengan prioritas tertinggi, tandai 'running'"""
+        with self._lock, self.conn:
+            row = self.conn.execute(
+                "SELECT * FROM jobs WHERE platform = ? AND state = ? AND not_before <= ?"
+                " ORDER BY priority DESC, id LIMIT 1",
+                (platform, PENDING, time.time())
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (RUNNING, self._now(), row['id'])
+            )
+        job = self._row(row)
+        job['state'] = RUNNING
+        job['attempts'] += 1
+        return job
+
+    def update_progress(self, job_id, bytes_done, bytes_total=None):
+        """Simpan jumlah byte yang sudah didownload"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET bytes_done = ?, bytes_total = COALESCE(?, bytes_total), updated_at = ? WHERE id = ?",
+                (int(bytes_done), bytes_total, self._now(), job_id)
+            )
+
+    def mark_done(self, job_id, result=None):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, result = ?, error = NULL, updated_at = ? WHERE id = ?",
+                (DONE, json.dumps(result, default=str) if result is not None else None, self._now(), job_id)
+            )
+
+    def mark_failed(self, job_id, error, retry=False, delay=0):
+        """Tandai gagal; jika retry, job dikembalikan ke pending dan baru diambil lagi setelah delay detik"""
+        state = PENDING if retry else FAILED
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, error = ?, not_before = ?, updated_at = ? WHERE id = ?",
+                (state, error, time.time() + delay if retry else 0, self._now(), job_id)
+            )
+
+    def next_retry_in(self, platform):
+        """Detik sampai job pending berikutnya boleh diambil; None jika tidak ada job pending"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MIN(not_before) FROM jobs WHERE platform = ? AND state = ?", (platform, PENDING)
+            ).fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    def requeue(self, job_id):
+        """Kembalikan job ke pending (mis. dihentikan sebelum selesai)"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ? AND state = ?",
+                (PENDING, self._now(), job_id, RUNNING)
+            )
+
+    def requeue_interrupted(self):
+        """Dipanggil saat startup: job 'running' dari sesi sebelumnya -> pending"""
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "UPDATE jobs SET state = ?, updated_at = ? WHERE state = ?",
+                (PENDING, self._now(), RUNNING)
+            )
+            return cur.rowcount
+
+    def cancel_pending(self, platform=None):
+        with self._lock, self.conn:
+            if platform:
+                self.conn.execute("UPDATE jobs SET state = ? WHERE state = ? AND platform = ?",
+                                  (CANCELLED, PENDING, platform))
+            else:
+                self.conn.execute("UPDATE jobs SET state = ? WHERE state = ?", (CANCELLED, PENDING))
+
+    def pending_count(self, platform=None):
+        """Jumlah job yang belum selesai (pending + running)"""
+        query = "SELECT COUNT(*) FROM jobs WHERE state IN (?, ?)"
+        params = [PENDING, RUNNING]
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        with self._lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def get_jobs(self, platform=None, states=None, limit=100):
+        query = "SELECT * FROM jobs WHERE 1 = 1"
+        params = []
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        if states:
+            query += f" AND state IN ({', '.join('?' * len(states))})"
+            params.extend(states)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [self._row(r) for r in rows]
+
+    def clear_finished(self):
+        """Hapus job yang sudah selesai/gagal/dibatalkan (dipanggil saat startup), return jumlahnya"""
+        with self._lock, self.conn:
+            cur = self.conn.execute("DELETE FROM jobs WHERE state IN (?, ?, ?)", (DONE, FAILED, CANCELLED))
+            return cur.rowcount
+
+
+class JobScheduler:
+    """Menjalankan job pending satu platform dengan worker pool sampai queue kosong
+
+    run_job(job) -> dict hasil download (key 'success').
+    Jika hasil berisi 'postprocess' (Future hasil akhir, mis. ffmpeg yang masih
+    berjalan), worker langsung mengambil job berikutnya; job ditandai selesai
+    setelah Future tersebut selesai.
+    on_progress(finished, total) dipanggil setiap job selesai.
+    Job gagal dicoba lagi (maks. max_attempts) setelah jeda retry_delay; worker
+    menunggu jeda itu selama masih ada job pending.
+    """
+
+    def __init__(self, queue, platform, run_job, max_workers=1, on_progress=None,
+                 max_attempts=MAX_ATTEMPTS):
+        self.queue = queue
+        self.platform = platform
+        self.run_job = run_job
+        self.max_workers = max(1, max_workers)
+        self.on_progress = on_progress
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._finished = 0
+        self._results = []
+        self._finisher = None
+
+    def stop(self):
+        """Hentikan setelah job yang sedang berjalan; sisanya tetap pending"""
+        self._stop.set()
+
+    def run(self):
+        """Blocking: drain queue, return list hasil (urut sesuai id job)"""
+        # Finisher menunggu post-processing yang tertunda (dishutdown setelah pool worker)
+        with ThreadPoolExecutor(max_workers=1) as self._finisher, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for _ in range(self.max_workers):
+                pool.submit(self._worker)
+
+        return [result for _, result in sorted(self._results, key=lambda x: x[0])]
+
+    def _worker(self):
+        while not self._stop.is_set():
+            job = self.queue.claim_next(self.platform)
+            if job is None:
+                # Sisa job masih dalam jeda retry -> tunggu (bisa dihentikan lewat stop())
+                wait = self.queue.next_retry_in(self.platform)
+                if wait is None:
+                    return
+                self._stop.wait(min(max(wait, 0.1), RETRY_DELAY_MAX))
+                continue
+
+            try:
+                result = self.run_job(job)
+                result = result if isinstance(result, dict) else {"result": result, "success": True}
+            except Exception as e:
+                result = {"success": False, "error": str(e)}
+
+            pending = result.pop("postprocess", None)
+            if pending is not None:
+                self._finisher.submit(self._finish_deferred, job, pending)
+            else:
+                self._finish(job, result)
+
+    def _finish_deferred(self, job, pending):
+        try:
+            result = pending.result()
+            result = result if isinstance(result, dict) else {"result": result, "success": True}
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        self._finish(job, result)
+
+    def _finish(self, job, result):
+        result.setdefault("url", job["url"])
+        result.setdefault("quality", job.get("quality"))
+        result.setdefault("download_type", job.get("download_type"))
+
+        if result.get("success"):
+            self.queue.mark_done(job["id"], result)
+        elif self._stop.is_set():
+            # Dihentikan di tengah jalan -> lanjutkan di sesi berikutnya
+            self.queue.requeue(job["id"])
+            return
+        elif job["attempts"] < self.max_attempts:
+            self.queue.mark_failed(job["id"], result.get("error"), retry=True,
+                                   delay=retry_delay(job["attempts"]))
+            return
+        else:
+            self.queue.mark_failed(job["id"], result.get("error"))
+
+        with self._lock:
+            self._results.append((job["id"], result))
+            self._finished += 1
+            if self.on_progress:
+                total = self._finished + self.queue.pending_count(self.platform)
+                self.on_progress(self._finished, total)
@@ -0,0 +1,285 @@
+"""
+Subscriptions
+Watch list channel/profil/playlist yang di-poll berkala; item baru masuk job queue.
+- Cursor per sumber:
+  - profil/listing (terbaru dulu): daftar id terbaru yang sudah diketahui (known_ids),
+    bukan satu id: post yang di-pin di atas profil dilewati, dan post lama yang
+    dihapus creator tidak membuat sync membaca ulang seluruh profil
+  - playlist: id item terakhir + jumlah item
+- Listing dibaca per halaman kecil dan berhenti begitu id yang diketahui ditemukan,
+  jadi satu sync biasanya cukup satu request halaman per sumber
+- Cursor, interval poll dan jadwal sync berikutnya disimpan di SQLite
+"""
+import json
+import threading
+import time
+from datetime import datetime
+
+from .db import connect
+from .job_queue import PRIORITY_BATCH
+
+
+# Jenis sumber:
+# - 'profile'  : username Instagram/TikTok (terbaru dulu)
+# - 'listing'  : channel YouTube / tab videos Facebook (terbaru dulu)
+# - 'playlist' : playlist YouTube (item baru ditambahkan di akhir)
+PROFILE = 'profile'
+LISTING = 'listing'
+PLAYLIST = 'playlist'
+
+DEFAULT_INTERVAL = 6 * 3600
+
+# Item per halaman saat sync (kecil: biasanya cursor ada di halaman pertama)
+SYNC_PAGE_SIZE = 10
+
+# Batas item yang diperiksa jika cursor tidak ditemukan (mis. item terbaru dihapus)
+MAX_SCAN = 200
+
+# Jumlah id terbaru yang diingat per sumber terbaru-dulu
+KNOWN_IDS = 50
+
+# Post yang bisa di-pin di atas profil (TikTok/Instagram maks. 3): id yang sudah
+# diketahui di posisi ini belum berarti sync sampai di post lama
+MAX_PINNED = 3
+
+
+class SubscriptionStore:
+    def __init__(self, db_file="subscriptions.db"):
+        self.conn = connect(db_file)
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS subscriptions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    platform TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    title TEXT,
+                    output_path TEXT,
+                    quality TEXT,
+                    download_type TEXT,
+                    interval INTEGER NOT NULL,
+                    cursor_id TEXT,
+                    cursor_count INTEGER NOT NULL DEFAULT 0,
+                    known_ids TEXT,
+                    next_check REAL NOT NULL DEFAULT 0,
+                    last_checked TEXT,
+                    last_new INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    enabled INTEGER NOT NULL DEFAULT 1,
+                    created_at TEXT NOT NULL,
+                    UNIQUE (platform, source)
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_subscriptions_due ON subscriptions (enabled, next_check)"
+            )
+            columns = {r['name'] for r in self.conn.execute("PRAGMA table_info(subscriptions)")}
+            if 'known_ids' not in columns:
+                self.conn.execute("ALTER TABLE subscriptions ADD COLUMN known_ids TEXT")
+
+    @staticmethod
+    def _sub(row):
+        if row is None:
+            return None
+        sub = dict(row)
+        sub['known_ids'] = json.loads(sub['known_ids']) if sub.get('known_ids') else []
+        return sub
+
+    def subscribe(self, platform, source, kind, title=None, output_path=None, quality=None,
+                  download_type=None, interval=DEFAULT_INTERVAL, cursor_id=None, cursor_count=0,
+                  known_ids=None):
+        """Tambah (atau perbarui) sumber; return id subscription
+
+        known_ids: id item yang sudah terlihat (sumber terbaru-dulu), urut listing.
+        """
+        now = datetime.now().isoformat()
+        known = json.dumps(list(known_ids)[:KNOWN_IDS]) if known_ids else None
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO subscriptions (platform, source, kind, title, output_path, quality, download_type,"
+                " interval, cursor_id, cursor_count, known_ids, next_check, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (platform, source) DO UPDATE SET kind = excluded.kind, title = excluded.title,"
+                " output_path = excluded.output_path, quality = excluded.quality,"
+                " download_type = excluded.download_type, interval = excluded.interval,"
+                " cursor_id = excluded.cursor_id, cursor_count = excluded.cursor_count,"
+                " known_ids = excluded.known_ids, next_check = excluded.next_check, enabled = 1",
+                (platform, source, kind, title, output_path, quality, download_type,
+                 int(interval), cursor_id, cursor_count, known, time.time() + interval, now)
+            )
+            row = self.conn.execute(
+                "SELECT id FROM subscriptions WHERE platform = ? AND source = ?", (platform, source)
+            ).fetchone()
+        return row['id']
+
+    def unsubscribe(self, platform, source):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM subscriptions WHERE platform = ? AND source = ?", (platform, source))
+
+    def get(self, platform, source):
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT * FROM subscriptions WHERE platform = ? AND source = ?", (platform, source)
+            ).fetchone()
+        return self._sub(row)
+
+    def get_all(self, platform=None):
+        query = "SELECT * FROM subscriptions"
+        params = []
+        if platform:
+            query += " WHERE platform = ?"
+            params.append(platform)
+        with self._lock:
+            rows = self.conn.execute(query + " ORDER BY id", params).fetchall()
+        return [self._sub(r) for r in rows]
+
+    def due(self, now=None):
+        """Subscription aktif yang jadwal sync-nya sudah lewat"""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT * FROM subscriptions WHERE enabled = 1 AND next_check <= ? ORDER BY next_check",
+                (now,)
+            ).fetchall()
+        return [self._sub(r) for r in rows]
+
+    def set_interval(self, sub_id, interval):
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE subscriptions SET interval = ? WHERE id = ?", (int(interval), sub_id))
+
+    def mark_synced(self, sub_id, cursor_id, cursor_count, new_count, known_ids=None):
+        known = json.dumps(list(known_ids)[:KNOWN_IDS]) if known_ids else None
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE subscriptions SET cursor_id = ?, cursor_count = ?, known_ids = COALESCE(?, known_ids),"
+                " last_new = ?, last_error = NULL, last_checked = ?, next_check = ? + interval WHERE id = ?",
+                (cursor_id, cursor_count, known, new_count, datetime.now().isoformat(), time.time(), sub_id)
+            )
+
+    def mark_failed(self, sub_id, error):
+        # Dicoba lagi pada jadwal berikutnya (cursor tidak berubah)
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE subscriptions SET last_error = ?, last_checked = ?, next_check = ? + interval WHERE id = ?",
+                (error, datetime.now().isoformat(), time.time(), sub_id)
+            )
+
+
+def iter_source_pages(downloader, sub, start=0, page_size=SYNC_PAGE_SIZE):
+    """Generator halaman listing sumber lewat downloader platform-nya"""
+    if sub['kind'] == PROFILE:
+        return downloader.iter_user_posts(sub['source'], page_size=page_size)
+    if sub['platform'] == 'Facebook':
+        return downloader.iter_videos(sub['source'], page_size=page_size)
+    if sub['kind'] == PLAYLIST:
+        return downloader.iter_playlist(sub['source'], page_size=page_size, start=start)
+    return downloader.iter_playlist(sub['source'], page_size=page_size)
+
+
+def _scan_newest_first(pages, known_ids, max_scan, max_pinned=MAX_PINNED):
+    """Item baru di listing terbaru-dulu, sampai id yang sudah diketahui
+
+    Id yang diketahui di max_pinned posisi teratas dilewati (bisa post yang di-pin,
+    bukan berarti sudah sampai post lama). Return (items baru, id yang terlihat
+    urut listing, found); found False jika berhenti karena max_scan tanpa
+    menemukan id yang diketahui.
+    """
+    known = set(known_ids)
+    items = []
+    seen = []
+    try:
+        position = 0
+        for page in pages:
+            for item in page:
+                item_id = item.get('id')
+                seen.append(item_id)
+                if item_id in known:
+                    if position >= max_pinned and not item.get('pinned'):
+                        return items, seen, True
+                elif not item.get('pinned'):
+                    items.append(item)
+                    if len(items) >= max_scan:
+                        return items, seen, False
+                position += 1
+    finally:
+        pages.close()
+    # Listing habis: semua item sudah diperiksa
+    return items, seen, True
+
+
+def _merge_known(seen, known_ids, limit=KNOWN_IDS):
+    """Id terlihat (terbaru dulu) + id lama, tanpa duplikat"""
+    merged = []
+    for item_id in list(seen) + list(known_ids):
+        if item_id is not None and item_id not in merged:
+            merged.append(item_id)
+    return merged[:limit]
+
+
+def _scan_appended(downloader, sub, cursor_id, cursor_count):
+    """Item setelah cursor (playlist, item baru di akhir); return (items, cursor_id, cursor_count)"""
+    start = max(cursor_count - 1, 0)
+    items = [item for page in iter_source_pages(downloader, sub, start) for item in page]
+    if not start or (items and items[0].get('id') == cursor_id):
+        new = items[1:] if start else items
+    else:
+        # Playlist berubah (item dihapus / urutan diganti) -> baca ulang dari awal;
+        # item baru = setelah posisi cursor (atau setelah jumlah item lama)
+        start = 0
+        items = [item for page in iter_source_pages(downloader, sub) for item in page]
+        ids = [item.get('id') for item in items]
+        position = ids.index(cursor_id) + 1 if cursor_id in ids else cursor_count
+        new = items[position:]
+    if not items:
+        return [], cursor_id, cursor_count
+    return new, items[-1].get('id'), start + len(items)
+
+
+def sync_subscription(store, sub, downloader, job_queue, archive=None, max_scan=MAX_SCAN):
+    """Poll satu subscription dan enqueue item baru; return jumlah job baru
+
+    Sync pertama (belum ada cursor) hanya menyimpan cursor, tanpa enqueue
+    seluruh isi channel/profil.
+    """
+    cursor_id = sub.get('cursor_id')
+    cursor_count = sub.get('cursor_count') or 0
+    known_ids = sub.get('known_ids') or []
+    baseline = cursor_id is None and not cursor_count
+
+    if sub['kind'] == PLAYLIST:
+        new, cursor_id, cursor_count = _scan_appended(downloader, sub, cursor_id, cursor_count)
+    else:
+        # Subscription lama (hanya cursor_id) diperlakukan seperti sync pertama:
+        # cursor_id bisa post yang di-pin, jadi tidak bisa dipakai sebagai batas
+        baseline = baseline or not known_ids
+        if baseline:
+            known_ids = []
+        # Sync pertama cukup satu halaman untuk mengisi known_ids
+        new, seen, found = _scan_newest_first(iter_source_pages(downloader, sub), known_ids,
+                                              SYNC_PAGE_SIZE if baseline else max_scan)
+        if not found and not baseline:
+            # Tidak satu pun id lama ditemukan dalam max_scan item: jangan antre
+            # ratusan post lama, mulai ulang dari posisi sekarang
+            print(f"Subscription {sub['platform']} {sub['source']}: cursor tidak ditemukan, reset")
+            new = []
+        known_ids = _merge_known(seen, known_ids)
+        cursor_id = known_ids[0] if known_ids else cursor_id
+        cursor_count = len(known_ids)
+        new.reverse()  # download dari yang terlama
+    if baseline:
+        new = []
+
+    urls = [item.get('url') for item in new if item.get('url')]
+    if archive is not None:
+        urls = archive.filter_new(sub['platform'], urls)
+    if urls:
+        job_queue.enqueue_many(sub['platform'], urls, sub['output_path'], sub.get('quality'),
+                               sub.get('download_type'), priority=PRIORITY_BATCH)
+
+    store.mark_synced(sub['id'], cursor_id, cursor_count, len(urls),
+                      known_ids if sub['kind'] != PLAYLIST else None)
+    return len(urls)
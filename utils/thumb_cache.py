@@ -0,0 +1,145 @@
+"""
+Thumbnail Cache
+Cache disk thumbnail: satu file per URL (nama = sha1 URL) di ~/.media_downloader/thumbs,
+metadata (ETag, Last-Modified, waktu cek/akses) di SQLite.
+- Data di disk dipakai langsung tanpa request; setelah REVALIDATE_AFTER baru
+  dicek ulang dengan request conditional (If-None-Match / If-Modified-Since),
+  304 cukup memperbarui waktu cek
+- Revalidasi gagal (offline, URL kedaluwarsa): data lama tetap dipakai
+- Total ukuran dibatasi MAX_DISK_BYTES; yang paling lama tidak diakses dihapus dulu
+"""
+import hashlib
+import os
+import ssl
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from .db import DATA_DIR, connect
+
+
+REVALIDATE_AFTER = 7 * 24 * 3600
+MAX_DISK_BYTES = 200 * 1024 * 1024
+FETCH_TIMEOUT = 10
+
+USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+              "AppleWebKit/537.36 (KHTML, like Gecko) "
+              "Chrome/120.0 Safari/537.36")
+
+
+def url_key(url):
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+
+class ThumbnailCache:
+    def __init__(self, db_file="thumbnails.db", cache_dir=None, max_bytes=MAX_DISK_BYTES):
+        self.cache_dir = cache_dir or DATA_DIR / "thumbs"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.conn = connect(db_file)
+        self._lock = threading.Lock()
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS thumbnails (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    size INTEGER NOT NULL,
+                    checked REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_thumbnails_accessed ON thumbnails (accessed)")
+
+    def _path(self, key):
+        return self.cache_dir / key
+
+    def load(self, url):
+        """Data dari disk: (bytes, stale) atau (None, True) jika belum ada"""
+        key = url_key(url)
+        with self._lock:
+            row = self.conn.execute("SELECT checked FROM thumbnails WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None, True
+        try:
+            data = self._path(key).read_bytes()
+        except OSError:
+            self._forget(key)
+            return None, True
+
+        with self._lock, self.conn:
+            self.conn.execute("UPDATE thumbnails SET accessed = ? WHERE key = ?", (time.time(), key))
+        return data, time.time() - row['checked'] > REVALIDATE_AFTER
+
+    def fetch(self, url):
+        """Download (conditional jika sudah ada di disk); return bytes baru, None jika tidak berubah (304)"""
+        key = url_key(url)
+        with self._lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM thumbnails WHERE key = ?", (key,)).fetchone()
+
+        headers = {"User-Agent": USER_AGENT}
+        if row is not None and self._path(key).exists():
+            if row['etag']:
+                headers["If-None-Match"] = row['etag']
+            if row['last_modified']:
+                headers["If-Modified-Since"] = row['last_modified']
+
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, context=ssl.create_default_context(), timeout=FETCH_TIMEOUT) as resp:
+                data = resp.read()
+                etag = resp.headers.get("ETag")
+                last_modified = resp.headers.get("Last-Modified")
+        except urllib.error.HTTPError as e:
+            if e.code != 304:
+                raise
+            with self._lock, self.conn:
+                self.conn.execute("UPDATE thumbnails SET checked = ? WHERE key = ?", (time.time(), key))
+            return None
+
+        self._store(key, url, data, etag, last_modified)
+        return data
+
+    def _store(self, key, url, data, etag, last_modified):
+        path = self._path(key)
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO thumbnails (key, url, etag, last_modified, size, checked, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, len(data), now, now)
+            )
+        self._evict()
+
+    def _evict(self):
+        """Hapus thumbnail yang paling lama tidak diakses sampai total <= max_bytes"""
+        with self._lock:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM thumbnails").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = []
+            for row in self.conn.execute("SELECT key, size FROM thumbnails ORDER BY accessed"):
+                if total <= self.max_bytes:
+                    break
+                evicted.append(row['key'])
+                total -= row['size']
+            with self.conn:
+                self.conn.executemany("DELETE FROM thumbnails WHERE key = ?", [(k,) for k in evicted])
+        for key in evicted:
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
+
+    def _forget(self, key):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM thumbnails WHERE key = ?", (key,))